@@ -0,0 +1,8 @@
+"""
+Offline benchmark harness.
+
+Runs the service against a local stand-in for YouTube (``fake_youtube``) reached
+through a local forwarding proxy (``forward_proxy``), so throughput and latency
+can be measured reproducibly without the live Fly app, Webshare or YouTube.
+Start it with ``python -m bench.run`` from the repository root.
+"""
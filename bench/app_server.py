@@ -0,0 +1,36 @@
+"""
+Run app.py with youtube-transcript-api pointed at the fake YouTube server.
+
+Started as a subprocess by ``bench.run`` so the service under test has its own
+processes, event loops and memory footprint:
+
+    BENCH_YOUTUBE_URL=http://127.0.0.1:PORT python -m bench.app_server --port 8090
+
+With WEB_CONCURRENCY > 1 each uvicorn worker imports this module, so every
+worker process is pointed at the fake server before it imports the app.
+"""
+import argparse
+import os
+
+import uvicorn
+
+from bench.fake_youtube import point_client_at
+
+point_client_at(os.environ["BENCH_YOUTUBE_URL"])
+
+from app import WEB_CONCURRENCY, app  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, required=True)
+    args = parser.parse_args()
+
+    target = "bench.app_server:app" if WEB_CONCURRENCY > 1 else app
+    uvicorn.run(
+        target, host="127.0.0.1", port=args.port, workers=WEB_CONCURRENCY, log_level="warning", access_log=False
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape
+
+import youtube_transcript_api._transcripts as ytt_transcripts
+
+# Video IDs with these prefixes exercise the not-found paths
+NO_CAPTIONS_PREFIX = "nocap"
+UNAVAILABLE_PREFIX = "gone"
+
+INNERTUBE_API_KEY = "bench-innertube-key"
+
+
+@dataclass(frozen=True)
+class FakeYouTubeConfig:
+    """Fault injection and payload size for the stand-in server."""
+    latency_ms: float = 50
+    jitter_ms: float = 0
+    error_rate: float = 0
+    throttle_rate: float = 0
+    segments: int = 200
+
+
+def transcript_xml(segments: int) -> bytes:
+    """A timedtext document with ``segments`` two-second captions."""
+    lines = [
+        f'<text start="{i * 2}.0" dur="2.0">{escape(f"caption line {i} of the benchmark transcript")}</text>'
+        for i in range(segments)
+    ]
+    return ("<transcript>" + "".join(lines) + "</transcript>").encode()
+
+
+class FakeYouTube:
+    """
+    Local stand-in for the three YouTube calls a transcript fetch makes: the watch
+    page, the innertube player API and the timedtext caption track.
+
+    Every request sleeps ``latency_ms`` (plus up to ``jitter_ms``) and then fails
+    with a 429 or a 500 at the configured rates. ``counts`` records requests per
+    route and injected failure, so cache and coalescing effects show up as fewer
+    upstream calls.
+    """
+
+    def __init__(self, config: FakeYouTubeConfig, host: str = "127.0.0.1", port: int = 0):
+        self.config = config
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._transcript = transcript_xml(config.segments)
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-youtube", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeYouTube":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.counts.clear()
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def player_response(self, video_id: str) -> Dict:
+        if video_id.startswith(UNAVAILABLE_PREFIX):
+            return {"playabilityStatus": {"status": "ERROR", "reason": "This video is unavailable"}}
+        response = {
+            "playabilityStatus": {"status": "OK"},
+            "videoDetails": {
+                "videoId": video_id,
+                "title": f"Benchmark video {video_id}",
+                "author": "Benchmark Channel",
+                "channelId": "UCbenchmark000000000000",
+                "lengthSeconds": str(self.config.segments * 2),
+            },
+        }
+        if not video_id.startswith(NO_CAPTIONS_PREFIX):
+            response["captions"] = {"playerCaptionsTracklistRenderer": {
+                "captionTracks": [{
+                    "baseUrl": f"{self.base_url}/api/timedtext?v={video_id}&lang=en",
+                    "name": {"runs": [{"text": "English"}]},
+                    "languageCode": "en",
+                    "isTranslatable": False,
+                }],
+                "translationLanguages": [],
+            }}
+        return response
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def send_body(self, status: int, body: bytes, content_type: str) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def injected_failure(self) -> bool:
+                config = fake.config
+                delay = config.latency_ms + random.uniform(0, config.jitter_ms)
+                if delay > 0:
+                    time.sleep(delay / 1000)
+                roll = random.random()
+                if roll < config.throttle_rate:
+                    fake.count("throttled")
+                    self.send_body(429, b"Too Many Requests", "text/plain")
+                    return True
+                if roll < config.throttle_rate + config.error_rate:
+                    fake.count("errors")
+                    self.send_body(500, b"Internal Server Error", "text/plain")
+                    return True
+                return False
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path == "/watch":
+                    fake.count("watch")
+                    if self.injected_failure():
+                        return
+                    body = f'<html><script>ytcfg.set({{"INNERTUBE_API_KEY": "{INNERTUBE_API_KEY}"}})</script></html>'
+                    self.send_body(200, body.encode(), "text/html; charset=utf-8")
+                elif url.path == "/api/timedtext":
+                    fake.count("timedtext")
+                    if self.injected_failure():
+                        return
+                    self.send_body(200, fake._transcript, "text/xml; charset=utf-8")
+                elif url.path == "/generate_204":
+                    # Startup warmup target (WARMUP_URL)
+                    fake.count("warmup")
+                    self.send_response(204)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                elif url.path == "/ip":
+                    # Proxy health probe target (PROXY_MONITOR_URL)
+                    self.send_body(200, json.dumps({"origin": self.client_address[0]}).encode(), "application/json")
+                else:
+                    self.send_body(404, b"Not Found", "text/plain")
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if urlsplit(self.path).path != "/youtubei/v1/player":
+                    self.send_body(404, b"Not Found", "text/plain")
+                    return
+                fake.count("player")
+                if self.injected_failure():
+                    return
+                video_id = json.loads(body or b"{}").get("videoId", "")
+                self.send_body(200, json.dumps(fake.player_response(video_id)).encode(), "application/json")
+
+        return Handler
+
+
+def point_client_at(base_url: str) -> None:
+    """
+    Send youtube-transcript-api's watch page and player requests to ``base_url``.
+
+    The library only talks HTTPS to www.youtube.com; over plain HTTP the local
+    forwarding proxy can relay requests without intercepting TLS. Caption track
+    URLs come from the player response, so they already point at ``base_url``.
+    """
+    ytt_transcripts.WATCH_URL = base_url + "/watch?v={video_id}"
+    ytt_transcripts.INNERTUBE_API_URL = base_url + "/youtubei/v1/player?key={api_key}"
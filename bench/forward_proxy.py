@@ -0,0 +1,121 @@
+import http.client
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import urlsplit
+
+# Headers that describe a single connection and are not forwarded
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "proxy-connection",
+    "te", "trailer", "transfer-encoding", "upgrade",
+}
+
+
+class ForwardingProxy:
+    """
+    Minimal HTTP forwarding proxy standing in for Webshare.
+
+    Accepts absolute-form requests (``GET http://host/path``) as sent by requests
+    through a proxy, adds ``latency_ms`` (plus up to ``jitter_ms``) per hop, and
+    relays them over a keep-alive connection per handler thread. CONNECT is not
+    supported; the benchmark only proxies plain HTTP to the local fake YouTube.
+    """
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, host: str = "127.0.0.1", port: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.counts: Dict[str, int] = {"requests": 0, "bytes": 0, "failures": 0}
+        self._lock = threading.Lock()
+        self._upstream = threading.local()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, name="forward-proxy", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ForwardingProxy":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.counts.update(requests=0, bytes=0, failures=0)
+
+    def record(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counts[key] += amount
+
+    def connection(self, netloc: str) -> http.client.HTTPConnection:
+        connections = getattr(self._upstream, "connections", None)
+        if connections is None:
+            connections = self._upstream.connections = {}
+        if netloc not in connections:
+            connections[netloc] = http.client.HTTPConnection(netloc, timeout=30)
+        return connections[netloc]
+
+    def forward(self, method: str, url: str, headers: Dict[str, str], body: bytes):
+        target = urlsplit(url)
+        path = target.path + (f"?{target.query}" if target.query else "")
+        # Retry once on a fresh connection if the pooled one was closed upstream
+        for attempt in range(2):
+            conn = self.connection(target.netloc)
+            try:
+                conn.request(method, path, body=body or None, headers=headers)
+                response = conn.getresponse()
+                return response.status, response.getheaders(), response.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                self._upstream.connections.pop(target.netloc, None)
+                if attempt:
+                    raise
+
+    def _handler(self):
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def relay(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if not self.path.startswith("http://"):
+                    self.send_error(400, "Absolute-form http:// request URI required")
+                    return
+                delay = proxy.latency_ms + random.uniform(0, proxy.jitter_ms)
+                if delay > 0:
+                    time.sleep(delay / 1000)
+                headers = {k: v for k, v in self.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+                proxy.record("requests")
+                try:
+                    status, response_headers, payload = proxy.forward(self.command, self.path, headers, body)
+                except (http.client.HTTPException, OSError):
+                    proxy.record("failures")
+                    self.send_error(502, "Upstream connection failed")
+                    return
+                proxy.record("bytes", len(payload))
+                self.send_response(status)
+                for key, value in response_headers:
+                    if key.lower() not in HOP_BY_HOP_HEADERS and key.lower() != "content-length":
+                        self.send_header(key, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = relay
+            do_POST = relay
+
+            def do_CONNECT(self):
+                self.send_error(501, "CONNECT tunnelling is not supported by the benchmark proxy")
+
+        return Handler
@@ -0,0 +1,572 @@
+"""
+Offline benchmark: drive the service against a local fake YouTube and proxy.
+
+Examples (from the repository root):
+
+    python -m bench.run --concurrency 16 --requests 2000 --videos 200
+    python -m bench.run --endpoint get_transcripts --batch-size 25 --concurrency 4
+    python -m bench.run --target engine --latency-ms 100 --throttle-rate 0.05
+    python -m bench.run --cold-starts 5 --env WARMUP_CONNECTIONS=2
+    python -m bench.run --workers 1,2,4 --concurrency 32 --requests 5000 --videos 100
+    python -m bench.run --machines 3 --peers --requests 3000 --videos 300 --check-fetches
+"""
+import argparse
+import http.client
+import itertools
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from bench.fake_youtube import NO_CAPTIONS_PREFIX, FakeYouTube, FakeYouTubeConfig, point_client_at
+from bench.forward_proxy import ForwardingProxy
+
+BENCH_API_KEY = "bench-api-key"
+
+# Service settings for benchmark runs; the shell environment and --env override them.
+# Logging is off by default because injected failures would flood the report.
+BENCH_ENV_DEFAULTS = {
+    "UPSTREAM_RATE_PER_SECOND": "1000",
+    "UPSTREAM_BURST": "1000",
+    "PROXY_MONITOR_INTERVAL_SECONDS": "0",
+    "LOG_LEVEL": "CRITICAL",
+}
+
+# Settings that would reach real infrastructure or persist between runs
+ISOLATED_ENV = (
+    "WEBSHARE_USERNAME", "WEBSHARE_PASSWORD", "TRANSCRIPT_STORE_PATH", "JOB_DB_PATH", "PEER_MODE", "PEERS", "PEER_SELF_URL"
+)
+
+ENDPOINTS = ("get_transcript", "get_transcripts")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def video_ids(count: int, missing_rate: float) -> List[str]:
+    """``count`` distinct 11-character IDs; roughly ``missing_rate`` of them have no captions."""
+    missing_every = round(1 / missing_rate) if missing_rate > 0 else 0
+    return [
+        f"{NO_CAPTIONS_PREFIX}{i:06d}" if missing_every and i % missing_every == 0 else f"bench{i:06d}"
+        for i in range(count)
+    ]
+
+
+def read_rss_kb(pid: int, field: str = "VmRSS") -> Optional[int]:
+    """Resident memory of ``pid`` in kB from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def child_pids(pid: int) -> List[int]:
+    """Direct children of ``pid``, found by scanning /proc."""
+    children = []
+    for entry in os.listdir("/proc") if os.path.isdir("/proc") else []:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat:
+                if int(stat.read().rsplit(")", 1)[1].split()[1]) == pid:
+                    children.append(int(entry))
+        except (OSError, ValueError, IndexError):
+            continue
+    return children
+
+
+def read_tree_rss_kb(pid: int, field: str = "VmRSS") -> Optional[int]:
+    """Summed memory of ``pid`` and its worker processes in kB, or None without /proc."""
+    values = [read_rss_kb(p, field) for p in [pid, *child_pids(pid)]]
+    values = [value for value in values if value is not None]
+    return sum(values) if values else None
+
+
+class MemorySampler:
+    """Samples the RSS of a process and its children in the background and keeps the peak."""
+
+    def __init__(self, pid: int, interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.start_kb = read_tree_rss_kb(pid)
+        self.peak_kb = self.start_kb
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memory-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            rss = read_tree_rss_kb(self.pid)
+            if rss is not None and (self.peak_kb is None or rss > self.peak_kb):
+                self.peak_kb = rss
+
+    def __enter__(self) -> "MemorySampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        to_mb = lambda kb: round(kb / 1024, 1) if kb is not None else None  # noqa: E731
+        end_kb = read_tree_rss_kb(self.pid)
+        peak_kb = max((kb for kb in (self.peak_kb, end_kb) if kb is not None), default=None)
+        return {
+            "startMb": to_mb(self.start_kb),
+            "endMb": to_mb(end_kb),
+            "peakMb": to_mb(peak_kb),
+            "highWaterMb": to_mb(read_tree_rss_kb(self.pid, "VmHWM")),
+        }
+
+
+def run_load(
+    send: Callable[[Any, List[str]], int],
+    connect: Callable[[], Any],
+    batches: List[List[str]],
+    concurrency: int
+) -> Tuple[List[float], Counter, float]:
+    """
+    Send every batch from ``concurrency`` workers, each with its own connection
+    (``connect`` may return None when there is nothing to connect to).
+
+    Returns per-request latencies in ms, a Counter of status codes and the wall
+    clock duration in seconds.
+    """
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+    next_index = itertools.count()
+
+    def worker() -> None:
+        conn = connect()
+        while True:
+            index = next(next_index)
+            if index >= len(batches):
+                break
+            started = time.perf_counter()
+            try:
+                status = send(conn, batches[index])
+            except (http.client.HTTPException, OSError):
+                status = 0
+                if conn is not None:
+                    conn.close()
+                conn = connect()
+            latency = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(latency)
+                statuses[status] += 1
+        if conn is not None:
+            conn.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, name=f"bench-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, statuses, time.perf_counter() - started
+
+
+def app_env(args: argparse.Namespace, proxy: ForwardingProxy, youtube: FakeYouTube, workers: int = 1) -> Dict[str, str]:
+    overrides = dict(item.split("=", 1) for item in args.env)
+    env = {**BENCH_ENV_DEFAULTS, **os.environ}
+    for key in ISOLATED_ENV:
+        env.pop(key, None)
+    env.update(overrides)
+    env.update({
+        "API_KEY": BENCH_API_KEY,
+        "PROXY_ENDPOINTS": proxy.url,
+        "PROXY_MONITOR_URL": youtube.base_url + "/ip",
+        "WARMUP_URL": youtube.base_url + "/generate_204",
+        "WEB_CONCURRENCY": str(workers),
+        "BENCH_YOUTUBE_URL": youtube.base_url,
+    })
+    return env
+
+
+@contextmanager
+def running_app(env: Dict[str, str], port: int) -> Iterator[subprocess.Popen]:
+    """
+    Run app.py in a subprocess until the block exits, yielding once /health answers.
+
+    Each run gets an empty SHARED_STATE_DIR, so multi-worker runs start with an
+    empty shared store and job database.
+    """
+    with tempfile.TemporaryDirectory(prefix="bench-state-") as state_dir:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "bench.app_server", "--port", str(port)],
+            env={**env, "SHARED_STATE_DIR": state_dir},
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        try:
+            wait_healthy(process, port)
+            yield process
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+def wait_healthy(process: subprocess.Popen, port: int, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"app exited during startup with code {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/health")
+            status = conn.getresponse().status
+            conn.close()
+            if status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.01)
+    raise RuntimeError(f"app did not become healthy within {timeout:.0f}s")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def bench_app(
+    args: argparse.Namespace, youtube: FakeYouTube, proxy: ForwardingProxy, batches: List[List[str]], workers: int
+):
+    """
+    Load test ``--machines`` app instances, each with its own state directory
+    like separate Fly machines. Client connections are spread round-robin over
+    them; with ``--peers`` the instances run in static peer mode.
+    """
+    ports = [free_port() for _ in range(args.machines)]
+    peers = [f"http://127.0.0.1:{port}" for port in ports]
+    next_port = itertools.count()
+    headers = {"Authorization": f"Bearer {BENCH_API_KEY}", "Accept-Encoding": args.accept_encoding}
+
+    def connect() -> http.client.HTTPConnection:
+        port = ports[next(next_port) % len(ports)]
+        return http.client.HTTPConnection("127.0.0.1", port, timeout=args.timeout)
+
+    def send(conn: http.client.HTTPConnection, ids: List[str]) -> int:
+        if args.endpoint == "get_transcript":
+            conn.request("GET", f"/get_transcript?videoId={ids[0]}&format={args.format}", headers=headers)
+        else:
+            body = json.dumps({"videoIds": ids, "format": args.format})
+            conn.request("POST", "/get_transcripts", body=body, headers={**headers, "Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        return response.status
+
+    env = app_env(args, proxy, youtube, workers)
+    with ExitStack() as machines:
+        processes = []
+        for port, url in zip(ports, peers):
+            peer_env = {"PEER_MODE": "static", "PEERS": ",".join(peers), "PEER_SELF_URL": url} if args.peers else {}
+            processes.append(machines.enter_context(running_app({**env, **peer_env}, port)))
+        # Memory is sampled on the first machine
+        with MemorySampler(processes[0].pid) as memory:
+            latencies, statuses, elapsed = run_load(send, connect, batches, args.concurrency)
+        return latencies, statuses, elapsed, memory.summary()
+
+
+def startup_phases(conn: http.client.HTTPConnection) -> Dict[str, float]:
+    """The app's own process_startup_seconds gauges from /metrics, by phase."""
+    conn.request("GET", "/metrics", headers={"Authorization": f"Bearer {BENCH_API_KEY}"})
+    response = conn.getresponse()
+    phases = {}
+    for line in response.read().decode().splitlines():
+        if line.startswith('process_startup_seconds{phase="'):
+            labels, value = line.rsplit(" ", 1)
+            phases[labels.split('"')[1]] = float(value)
+    return phases
+
+
+def bench_cold_start(args: argparse.Namespace, youtube: FakeYouTube, proxy: ForwardingProxy) -> Dict[str, Any]:
+    """
+    Start app.py ``--cold-starts`` times and time each one from spawn until
+    /health answers 200 (after warmup, if configured) and until the first
+    transcript arrives. Each start fetches a different video, so it is uncached.
+    """
+    env = app_env(args, proxy, youtube, args.workers[0])
+    healthy_ms: List[float] = []
+    first_ms: List[float] = []
+    phases: Dict[str, List[float]] = {}
+    for run in range(args.cold_starts):
+        port = free_port()
+        started = time.perf_counter()
+        with running_app(env, port):
+            healthy_ms.append((time.perf_counter() - started) * 1000)
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=args.timeout)
+            conn.request("GET", f"/get_transcript?videoId=bench{run:06d}", headers={
+                "Authorization": f"Bearer {BENCH_API_KEY}"
+            })
+            response = conn.getresponse()
+            response.read()
+            first_ms.append((time.perf_counter() - started) * 1000)
+            if response.status != 200:
+                raise RuntimeError(f"first transcript request failed with status {response.status}")
+            for phase, seconds in startup_phases(conn).items():
+                phases.setdefault(phase, []).append(seconds * 1000)
+            conn.close()
+
+    def summary(values: List[float]) -> Dict[str, float]:
+        values = sorted(values)
+        return {"p50": percentile(values, 50), "max": values[-1]}
+
+    return {
+        "target": "app",
+        "workers": args.workers[0],
+        "coldStarts": args.cold_starts,
+        "healthyMs": summary(healthy_ms),
+        "firstTranscriptMs": summary(first_ms),
+        "phasesMs": {phase: summary(values) for phase, values in phases.items()},
+        "upstream": dict(youtube.counts),
+        "proxy": dict(proxy.counts),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("json", "output")},
+    }
+
+
+def bench_engine(args: argparse.Namespace, youtube: FakeYouTube, proxy: ForwardingProxy, batches: List[List[str]]):
+    """
+    Resolve transcripts through TranscriptEngine in this process, the same call
+    path the Firebase function uses, without any web framework in front.
+    """
+    env = app_env(args, proxy, youtube)
+    for key in ISOLATED_ENV:
+        if key not in env:
+            os.environ.pop(key, None)
+    os.environ.update(env)
+    point_client_at(youtube.base_url)
+
+    from transcript_core import EngineSettings, TranscriptEngine, configure_logging, configured_proxy_endpoints
+    configure_logging("text", os.environ["LOG_LEVEL"], 0, ("transcript_core",))
+    settings = EngineSettings.from_env()
+    engine = TranscriptEngine(settings, configured_proxy_endpoints(settings))
+    engine.start()
+
+    def send(_conn: None, ids: List[str]) -> int:
+        try:
+            engine.resolve(ids[0], ("en",))
+            return 200
+        except Exception as e:
+            return engine.api_error(e, ids[0]).status_code
+
+    try:
+        with MemorySampler(os.getpid()) as memory:
+            latencies, statuses, elapsed = run_load(send, lambda: None, batches, args.concurrency)
+        return latencies, statuses, elapsed, memory.summary()
+    finally:
+        engine.close()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", choices=("app", "engine"), default="app",
+                        help="app: app.py over HTTP in a subprocess; engine: TranscriptEngine in-process")
+    parser.add_argument("--endpoint", choices=ENDPOINTS, default="get_transcript")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client connections")
+    parser.add_argument("--requests", type=int, default=500, help="Requests to send (batches for get_transcripts)")
+    parser.add_argument("--videos", type=int, default=100,
+                        help="Distinct video IDs cycled through; fewer videos means more cache hits")
+    parser.add_argument("--batch-size", type=int, default=10, help="videoIds per /get_transcripts request")
+    parser.add_argument("--format", default="text", help="Transcript format to request (text or segments)")
+    parser.add_argument("--accept-encoding", default="identity", help="Accept-Encoding sent to the app")
+    parser.add_argument("--missing-rate", type=float, default=0, help="Fraction of videos without captions")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Fake YouTube latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Extra random fake YouTube latency")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of upstream requests answered 500")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="Fraction of upstream requests answered 429")
+    parser.add_argument("--segments", type=int, default=200, help="Caption lines per transcript")
+    parser.add_argument("--proxy-latency-ms", type=float, default=0, help="Added latency per proxied request")
+    parser.add_argument("--timeout", type=float, default=120, help="Client timeout per request in seconds")
+    parser.add_argument("--workers", default="1",
+                        help="uvicorn worker processes (WEB_CONCURRENCY); a list such as 1,2,4 runs once per value")
+    parser.add_argument("--machines", type=int, default=1,
+                        help="Separate app instances to spread client connections over")
+    parser.add_argument("--peers", action="store_true",
+                        help="Run the --machines instances in peer mode (consistent-hash routing of videoIds)")
+    parser.add_argument("--check-fetches", action="store_true",
+                        help="Fail unless YouTube served exactly one transcript fetch per distinct captioned video "
+                             "(needs no injected errors and caches that hold every video)")
+    parser.add_argument("--cold-starts", type=int, default=0,
+                        help="Instead of a load test, start the app this many times and time its cold start")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra service setting, e.g. --env CACHE_MAX_BYTES=0 (repeatable)")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    parser.add_argument("--output", help="Append the JSON result to this file (e.g. bench_output.txt)")
+    args = parser.parse_args(argv)
+    if args.target == "engine" and args.endpoint != "get_transcript":
+        parser.error("--target engine only supports --endpoint get_transcript")
+    if args.target == "engine" and args.cold_starts:
+        parser.error("--cold-starts needs --target app")
+    if any("=" not in item for item in args.env):
+        parser.error("--env values must be KEY=VALUE")
+    try:
+        args.workers = [int(value) for value in args.workers.split(",")]
+    except ValueError:
+        parser.error("--workers must be a comma-separated list of worker counts")
+    if args.target == "engine" and args.workers != [1]:
+        parser.error("--workers needs --target app")
+    if args.machines < 1 or (args.target == "engine" and args.machines > 1):
+        parser.error("--machines must be 1 or more, and needs --target app above 1")
+    if args.peers and args.machines < 2:
+        parser.error("--peers needs --machines 2 or more")
+    if args.check_fetches and (args.cold_starts or args.error_rate or args.throttle_rate):
+        parser.error("--check-fetches needs a load test without --error-rate or --throttle-rate")
+    return args
+
+
+def report(args: argparse.Namespace, result: Dict[str, Any]) -> str:
+    latency = result["latencyMs"]
+    upstream = " ".join(f"{k}={v}" for k, v in sorted(result["upstream"].items())) or "none"
+    memory = result["memory"]
+    return "\n".join([
+        f"🏁 target={args.target} endpoint={args.endpoint} machines={result['machines']}{' (peers)' if result['peers'] else ''} "
+        f"workers={result['workers']} concurrency={args.concurrency} "
+        f"requests={result['requests']} items={result['items']} videos={args.videos}",
+        f"   throughput: {result['requestsPerSecond']:.1f} req/s, {result['itemsPerSecond']:.1f} items/s "
+        f"over {result['elapsedSeconds']:.2f}s",
+        f"   latency ms: p50={latency['p50']:.1f} p90={latency['p90']:.1f} "
+        f"p99={latency['p99']:.1f} max={latency['max']:.1f}",
+        "   status: " + " ".join(f"{code}={count}" for code, count in sorted(result["status"].items())),
+        f"   upstream: {upstream} (distinct captioned videos={result['distinctVideos']})",
+        f"   proxy: requests={result['proxy']['requests']} bytes={result['proxy']['bytes']} "
+        f"failures={result['proxy']['failures']}",
+        f"   memory MB: start={memory['startMb']} end={memory['endMb']} "
+        f"peak={memory['peakMb']} high-water={memory['highWaterMb']}",
+    ])
+
+
+def cold_start_report(result: Dict[str, Any]) -> str:
+    lines = [
+        f"🏁 cold starts={result['coldStarts']}",
+        f"   spawn to healthy ms: p50={result['healthyMs']['p50']:.0f} max={result['healthyMs']['max']:.0f}",
+        f"   spawn to first transcript ms: p50={result['firstTranscriptMs']['p50']:.0f} "
+        f"max={result['firstTranscriptMs']['max']:.0f}",
+    ]
+    for phase, values in result["phasesMs"].items():
+        lines.append(f"   app-reported {phase} ms: p50={values['p50']:.0f} max={values['max']:.0f}")
+    return "\n".join(lines)
+
+
+def scaling_report(results: List[Dict[str, Any]]) -> str:
+    """Throughput per worker process across runs, relative to the first run."""
+    baseline = results[0]["requestsPerSecond"] or 1.0
+    lines = ["📈 workers  req/s    req/s/worker  speedup  p50 ms  p99 ms  RSS MB"]
+    for result in results:
+        lines.append(
+            f"   {result['workers']:>7}  {result['requestsPerSecond']:>7.1f}  {result['requestsPerSecondPerWorker']:>12.1f}"
+            f"  {result['requestsPerSecond'] / baseline:>6.2f}x  {result['latencyMs']['p50']:>6.1f}"
+            f"  {result['latencyMs']['p99']:>6.1f}  {result['memory']['peakMb']}"
+        )
+    return "\n".join(lines)
+
+
+def load_test(args: argparse.Namespace, youtube: FakeYouTube, proxy: ForwardingProxy, workers: int) -> Dict[str, Any]:
+    youtube.reset_counts()
+    proxy.reset_counts()
+    ids = video_ids(args.videos, args.missing_rate)
+    batch_size = args.batch_size if args.endpoint == "get_transcripts" else 1
+    cycle = itertools.cycle(ids)
+    batches = [[next(cycle) for _ in range(batch_size)] for _ in range(args.requests)]
+
+    if args.target == "app":
+        latencies, statuses, elapsed, memory = bench_app(args, youtube, proxy, batches, workers)
+    else:
+        latencies, statuses, elapsed, memory = bench_engine(args, youtube, proxy, batches)
+
+    latencies.sort()
+    items = len(batches) * batch_size
+    requested = {video_id for batch in batches for video_id in batch}
+    result = {
+        "target": args.target,
+        "endpoint": args.endpoint,
+        "machines": args.machines,
+        "peers": args.peers,
+        "workers": workers,
+        "concurrency": args.concurrency,
+        "requests": len(latencies),
+        "items": items,
+        "elapsedSeconds": round(elapsed, 3),
+        "requestsPerSecond": len(latencies) / elapsed if elapsed else 0.0,
+        "requestsPerSecondPerWorker": len(latencies) / elapsed / workers if elapsed else 0.0,
+        "itemsPerSecond": items / elapsed if elapsed else 0.0,
+        "latencyMs": {
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else 0.0,
+        },
+        "status": {str(code): count for code, count in statuses.items()},
+        "upstream": dict(youtube.counts),
+        "distinctVideos": sum(1 for video_id in requested if not video_id.startswith(NO_CAPTIONS_PREFIX)),
+        "proxy": dict(proxy.counts),
+        "memory": memory,
+        "settings": {k: v for k, v in vars(args).items() if k not in ("json", "output")},
+    }
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    youtube = FakeYouTube(FakeYouTubeConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        segments=args.segments,
+    )).start()
+    proxy = ForwardingProxy(latency_ms=args.proxy_latency_ms).start()
+    try:
+        if args.cold_starts:
+            results = [bench_cold_start(args, youtube, proxy)]
+        else:
+            results = []
+            for workers in args.workers:
+                results.append(load_test(args, youtube, proxy, workers))
+                if not args.json:
+                    print(report(args, results[-1]), flush=True)
+    finally:
+        proxy.stop()
+        youtube.stop()
+
+    if args.json:
+        print(json.dumps(results if len(results) > 1 else results[0], indent=2))
+    elif args.cold_starts:
+        print(cold_start_report(results[0]))
+    elif len(results) > 1:
+        print(scaling_report(results))
+    if args.output:
+        with open(args.output, "a") as output:
+            for result in results:
+                output.write(json.dumps(result) + "\n")
+    if args.check_fetches:
+        for result in results:
+            fetches = result["upstream"].get("timedtext", 0)
+            if fetches != result["distinctVideos"]:
+                sys.exit(
+                    f"❌ {fetches} transcript fetches for {result['distinctVideos']} distinct videos "
+                    f"with {result['workers']} worker(s)"
+                )
+    return results if len(results) > 1 else results[0]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Shared pytest fixtures for the offline tests.
+
+``service`` imports app.py once per session with a test API key and a
+temporary state directory. Tests drive it in-process with ``client`` and fill
+the engine's cache directly, so nothing reaches YouTube or a proxy.
+"""
+
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from transcript_core.payload_encoding import build_segments
+
+# Scripts that call the deployed service or need the Firebase runtime, not pytest tests
+collect_ignore = ["test_function.py", "local_test.py"]
+
+API_KEY = "test-api-key"
+
+
+@pytest.fixture(scope="session")
+def service(tmp_path_factory):
+    env = pytest.MonkeyPatch()
+    env.setenv("API_KEY", API_KEY)
+    env.setenv("SHARED_STATE_DIR", str(tmp_path_factory.mktemp("state")))
+    yield importlib.import_module("app")
+    env.undo()
+
+
+@pytest.fixture
+def client(service):
+    service.engine.cache.clear()
+    yield TestClient(service.app, headers={"Authorization": f"Bearer {API_KEY}"})
+    for breaker in service.engine.breakers.values():
+        breaker.record_success()
+
+
+@pytest.fixture
+def cache_transcript(service):
+    """Put a result with ``count`` two-second captions into the app engine's cache, and return it."""
+    def cache(video_id: str = "abcdefghijk", title: str = "Test video", count: int = 30) -> dict:
+        texts = [f"caption {i}" for i in range(count)]
+        result = {
+            "transcript": " ".join(texts),
+            "language": "en",
+            "languageStrategy": "manual",
+            "title": title,
+            "channel": "Test channel",
+            "videoId": video_id,
+            "segments": build_segments(texts, [i * 2 for i in range(count)], [2] * count),
+        }
+        service.engine.cache_transcript((video_id, ("en",), False), result)
+        return result
+    return cache
@@ -11,7 +11,7 @@ cd functions
 source venv/bin/activate
 python3.12 -m pip install -r requirements.txt
 
-# Go back to root and deploy
+# Go back to root and deploy (firebase.json's predeploy step copies transcript_core into functions/)
 cd ..
 echo "Deploying to Firebase..."
 firebase deploy --only functions
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Request-level tests for the FastAPI app, served in-process with TestClient.
+
+Transcripts are put straight into the engine's cache, so no test reaches the
+network; the app runs without its lifespan, i.e. without a store or proxy
+(see the ``service`` and ``client`` fixtures in conftest.py).
+"""
+
+VIDEO_ID = "abcdefghijk"
+
+
+def get_transcript(client, headers=None, **params):
+    return client.get("/get_transcript", params={"videoId": VIDEO_ID, **params}, headers=headers)
+
+
+def test_open_circuit_fails_fast_with_saturated_pool(service, client, monkeypatch):
+    pool = service.transcript_pool
+    monkeypatch.setattr(pool, "_pending", pool.max_workers + pool.queue_limit)
+    breaker = service.engine.breakers["youtube"]
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    response = get_transcript(client)
+    # An open circuit answers before the worker pool is asked for a slot
+    assert response.status_code == 503
+    assert response.json()["detail"]["error"] == "UPSTREAM_UNAVAILABLE"
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_cache_hit_with_saturated_pool(service, client, cache_transcript, monkeypatch):
+    pool = service.transcript_pool
+    monkeypatch.setattr(pool, "_pending", pool.max_workers + pool.queue_limit)
+    cache_transcript()
+    response = get_transcript(client)
+    assert response.status_code == 200
+    assert response.json()["transcript"].startswith("caption 0")
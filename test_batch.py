@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the POST /get_transcripts batch endpoint: per-item status codes and
+errors, the summary, and the checks that reject a whole batch up front.
+"""
+
+CACHED_ID = "abcdefghijk"
+UNCACHED_ID = "zyxwvutsrqp"
+
+
+def get_transcripts(client, **body):
+    return client.post("/get_transcripts", json=body)
+
+
+def test_batch_reports_each_item(client, cache_transcript):
+    cache_transcript(CACHED_ID)
+    response = get_transcripts(client, videoIds=[CACHED_ID, "bad id!", UNCACHED_ID])
+    assert response.status_code == 200
+    body = response.json()
+    items = {item["videoId"]: item for item in body["results"]}
+    assert [item["videoId"] for item in body["results"]] == [CACHED_ID, "bad id!", UNCACHED_ID]
+
+    assert items[CACHED_ID]["status"] == 200
+    assert items[CACHED_ID]["transcript"]["transcript"].startswith("caption 0")
+    assert "error" not in items[CACHED_ID]
+    assert items["bad id!"]["status"] == 400
+    assert items["bad id!"]["error"]["error"] == "INVALID_VIDEO_ID"
+    # The test app has no proxy, so an uncached video fails without a fetch
+    assert items[UNCACHED_ID]["status"] == 500
+    assert items[UNCACHED_ID]["error"]["error"] == "CONFIGURATION_ERROR"
+
+    assert body["summary"] == {"total": 3, "succeeded": 1, "failed": 2}
+
+
+def test_batch_applies_format_and_window(client, cache_transcript):
+    cache_transcript(CACHED_ID)
+    body = get_transcripts(client, videoIds=[CACHED_ID], format="segments", start=4, end=8).json()
+    transcript = body["results"][0]["transcript"]
+    assert transcript["transcript"] == "caption 2 caption 3"
+    assert transcript["segments"]["start_ms"] == [4000, 6000]
+
+
+def test_batch_rejects_empty_and_oversized(service, client, monkeypatch):
+    response = get_transcripts(client, videoIds=[])
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "MISSING_VIDEO_ID"
+
+    monkeypatch.setattr(service, "BATCH_MAX_ITEMS", 2)
+    response = get_transcripts(client, videoIds=[CACHED_ID] * 3)
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "BATCH_TOO_LARGE"
+
+
+def test_batch_rejects_bad_options_before_fetching(client):
+    response = get_transcripts(client, videoIds=[CACHED_ID], format="xml")
+    assert response.status_code == 400
+    response = get_transcripts(client, videoIds=[CACHED_ID], start=8, end=4)
+    assert response.json()["detail"]["error"] == "INVALID_RANGE"
+
+
+def test_batch_requires_api_key(client):
+    response = client.post("/get_transcripts", json={"videoIds": [CACHED_ID]}, headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the upstream circuit breakers (transcript_core.circuit_breaker) and
+which breaker each kind of upstream failure counts against.
+"""
+
+import time
+
+import pytest
+import requests
+from youtube_transcript_api import RequestBlocked
+
+from transcript_core.circuit_breaker import CircuitBreaker, CircuitOpen
+from transcript_core.engine import upstream_failure_kind
+
+RESET_SECONDS = 0.05
+
+
+def open_breaker(threshold: int = 3) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", threshold, RESET_SECONDS)
+    for _ in range(threshold):
+        breaker.record_failure()
+    return breaker
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", 3, RESET_SECONDS)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.is_open() and breaker.allow()
+    breaker.record_failure()
+    assert breaker.is_open()
+    assert not breaker.allow()
+    with pytest.raises(CircuitOpen) as error:
+        breaker.check()
+    assert error.value.name == "test"
+    assert breaker.stats()["opened"] == 1
+
+
+def test_breaker_admits_one_probe_after_reset():
+    breaker = open_breaker()
+    time.sleep(RESET_SECONDS * 1.5)
+    # is_open does not start the probe, so checking it first never uses one up
+    assert not breaker.is_open()
+    assert breaker.allow()
+    assert breaker.is_open() and not breaker.allow()
+    breaker.record_success()
+    assert breaker.stats()["state"] == "closed"
+    assert breaker.allow()
+
+
+def test_breaker_failed_probe_reopens():
+    breaker = open_breaker()
+    time.sleep(RESET_SECONDS * 1.5)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.stats()["state"] == "open"
+    assert not breaker.allow()
+
+
+def test_breaker_disabled_with_zero_threshold():
+    breaker = CircuitBreaker("test", 0, RESET_SECONDS)
+    for _ in range(10):
+        breaker.record_failure()
+    assert breaker.allow() and not breaker.is_open()
+
+
+def test_retry_after_counts_down_while_open():
+    breaker = open_breaker()
+    assert 0 < breaker.retry_after() <= RESET_SECONDS
+    time.sleep(RESET_SECONDS * 1.5)
+    assert breaker.retry_after() == 0
+
+
+@pytest.mark.parametrize("error, kind", [
+    (RequestBlocked("abcdefghijk"), "youtube"),
+    (requests.exceptions.ProxyError("407"), "proxy"),
+    (requests.exceptions.ConnectionError("reset"), "network"),
+    (requests.exceptions.ReadTimeout("stalled"), "network"),
+])
+def test_upstream_failures_count_against_their_breaker(error, kind):
+    assert upstream_failure_kind(error) == kind
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled keep-alive YouTubeTranscriptApi clients
+(transcript_core.engine.TranscriptClientPool). Operations are plain functions,
+so no client ever sends a request.
+"""
+
+import pytest
+from youtube_transcript_api._errors import PoTokenRequired, TranscriptsDisabled
+
+from transcript_core.circuit_breaker import CircuitBreaker
+from transcript_core.engine import TimeoutSession, TranscriptClientPool
+from transcript_core.proxy_pool import ProxyPool, parse_proxy_endpoints
+from transcript_core.rate_limiter import AdaptiveRateLimiter
+
+
+def make_pool(size: int = 2) -> TranscriptClientPool:
+    proxy_pool = ProxyPool(parse_proxy_endpoints("http://proxy.invalid:3128"), 3, 60)
+    breakers = {name: CircuitBreaker(name, 3, 30) for name in ("proxy", "youtube", "network")}
+    return TranscriptClientPool(size, proxy_pool, breakers, AdaptiveRateLimiter(0, 0, 1), 0, 0, 0, 1, (3, 7))
+
+
+def test_clients_are_reused_between_calls():
+    pool = make_pool()
+    first = pool.run(lambda ytt_api: ytt_api)
+    second = pool.run(lambda ytt_api: ytt_api)
+    assert first is second
+    assert pool.stats() == {"size": 2, "idle": 1, "created": 1, "reused": 1, "discarded": 0, "retries": 0}
+
+
+def test_sessions_carry_the_default_timeout():
+    pool = make_pool()
+    client = pool._checkout(pool.proxy_pool.endpoints[0])
+    assert isinstance(client[1], TimeoutSession) and client[1].timeout == (3, 7)
+
+
+def test_video_verdict_keeps_the_client():
+    pool = make_pool()
+
+    def disabled(ytt_api):
+        raise TranscriptsDisabled("abcdefghijk")
+
+    with pytest.raises(TranscriptsDisabled):
+        pool.run(disabled)
+    assert pool.stats()["idle"] == 1 and pool.stats()["discarded"] == 0
+    assert pool.breakers["youtube"].stats()["consecutive_failures"] == 0
+
+
+def test_failed_youtube_answer_discards_the_client():
+    pool = make_pool()
+
+    def po_token(ytt_api):
+        raise PoTokenRequired("abcdefghijk")
+
+    with pytest.raises(PoTokenRequired):
+        pool.run(po_token)
+    assert pool.stats()["idle"] == 0 and pool.stats()["discarded"] == 1
+    assert pool.breakers["youtube"].stats()["consecutive_failures"] == 1
+    # Not the proxy's fault, so the endpoint keeps its score
+    assert pool.proxy_pool.stats()[0]["failures"] == 0
+
+
+def test_idle_clients_are_capped_per_endpoint():
+    pool = make_pool(size=1)
+    endpoint = pool.proxy_pool.endpoints[0]
+    clients = [pool._checkout(endpoint) for _ in range(3)]
+    for client in clients:
+        pool._checkin(endpoint, client)
+    assert pool.stats()["idle"] == 1
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the engine's cache-first resolution: the I/O-free ``cached()`` path,
+the fail-fast checks before a miss takes a worker, and ``resolve_uncached``
+answering from the store. No test reaches the network: engines have no proxy
+endpoints unless a test needs one, and then the store answers before any fetch.
+"""
+
+import pytest
+
+from transcript_core.circuit_breaker import CircuitOpen
+from transcript_core.engine import EngineSettings, TranscriptEngine
+from transcript_core.errors import CachedTranscriptMiss, ProxyNotConfigured
+from transcript_core.payload_encoding import build_segments, content_digest
+from transcript_core.proxy_pool import parse_proxy_endpoints
+
+VIDEO_ID = "abcdefghijk"
+LANGUAGES = ("en",)
+
+
+def make_result(video_id: str = VIDEO_ID) -> dict:
+    texts = ["first caption", "second caption"]
+    return {
+        "transcript": " ".join(texts),
+        "language": "en",
+        "languageStrategy": "manual",
+        "title": "Test video",
+        "videoId": video_id,
+        "segments": build_segments(texts, [0, 2], [2, 2]),
+    }
+
+
+def make_engine(tmp_path=None, proxy: str = "", **settings) -> TranscriptEngine:
+    if tmp_path is not None:
+        settings["transcript_store_path"] = str(tmp_path / "store.db")
+    engine = TranscriptEngine(
+        EngineSettings(proxy_monitor_interval_seconds=0, **settings), parse_proxy_endpoints(proxy)
+    )
+    engine.start()
+    return engine
+
+
+def trip(engine: TranscriptEngine, name: str = "youtube") -> None:
+    breaker = engine.breakers[name]
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+
+def test_cached_answers_hits_without_io():
+    engine = make_engine()
+    assert engine.cached(VIDEO_ID, LANGUAGES) is None
+    result = make_result()
+    engine.cache_transcript((VIDEO_ID, LANGUAGES, False), result)
+    assert engine.cached(VIDEO_ID, LANGUAGES) is result
+    assert engine.cached(VIDEO_ID, ("de",)) is None
+    assert engine.resolve(VIDEO_ID, LANGUAGES) is result
+
+
+def test_cached_rejects_bad_ids_and_replays_misses():
+    engine = make_engine()
+    with pytest.raises(ValueError):
+        engine.cached("not-an-id", LANGUAGES)
+    engine.cache.set_negative((VIDEO_ID, LANGUAGES, False), "TranscriptsDisabled")
+    with pytest.raises(CachedTranscriptMiss):
+        engine.cached(VIDEO_ID, LANGUAGES)
+
+
+def test_content_digest_computed_once_at_cache_time(monkeypatch):
+    engine = make_engine()
+    result = make_result()
+    engine.cache_transcript((VIDEO_ID, LANGUAGES, False), result)
+    monkeypatch.setattr("transcript_core.engine.content_digest", lambda result: pytest.fail("re-hashed"))
+    assert engine.content_digest(VIDEO_ID, LANGUAGES, False, result) == content_digest(result)
+
+
+def test_content_digest_of_uncached_result():
+    engine = make_engine(cache_max_bytes=0)
+    result = make_result()
+    engine.cache_transcript((VIDEO_ID, LANGUAGES, False), result)
+    assert engine.content_digest(VIDEO_ID, LANGUAGES, False, result) == content_digest(result)
+
+
+def test_check_upstream_without_proxy():
+    engine = make_engine()
+    with pytest.raises(ProxyNotConfigured):
+        engine.check_upstream(VIDEO_ID)
+    with pytest.raises(ProxyNotConfigured):
+        engine.resolve_uncached(VIDEO_ID, LANGUAGES)
+
+
+def test_open_circuit_fails_fast_without_store():
+    engine = make_engine()
+    trip(engine)
+    with pytest.raises(CircuitOpen) as error:
+        engine.check_upstream(VIDEO_ID)
+    assert error.value.name == "youtube"
+    with pytest.raises(CircuitOpen):
+        engine.resolve_uncached(VIDEO_ID, LANGUAGES)
+
+
+def test_open_circuit_serves_stored_copy(tmp_path):
+    engine = make_engine(tmp_path, transcript_store_ttl_seconds=0.01)
+    result = make_result()
+    engine.store.put(VIDEO_ID, LANGUAGES, False, result)
+    trip(engine, "proxy")
+    error = engine.check_upstream(VIDEO_ID)
+    assert isinstance(error, CircuitOpen) and error.name == "proxy"
+    # The stored row has expired, but is still better than failing
+    assert engine.stale_transcript(VIDEO_ID, LANGUAGES, False, error) == result
+    assert engine.resolve_uncached(VIDEO_ID, LANGUAGES) == result
+    with pytest.raises(CircuitOpen):
+        engine.stale_transcript("zyxwvutsrqp", LANGUAGES, False, error)
+
+
+def test_open_circuit_serves_expired_cache_entries():
+    engine = make_engine()
+    result = make_result()
+    engine.cache_transcript((VIDEO_ID, LANGUAGES, False), result)
+    trip(engine, "network")
+    engine.cache._entries[(VIDEO_ID, LANGUAGES, False)].expires_at = 0
+    assert engine.cached(VIDEO_ID, LANGUAGES) is result
+
+
+def test_resolve_uncached_fills_cache_from_store(tmp_path):
+    # The proxy is never contacted: the store answers before any fetch
+    engine = make_engine(tmp_path, proxy="http://proxy.invalid:3128")
+    result = make_result()
+    engine.store.put(VIDEO_ID, LANGUAGES, False, result)
+    assert engine.cached(VIDEO_ID, LANGUAGES) is None
+    assert engine.check_upstream(VIDEO_ID) is None
+    assert engine.resolve_uncached(VIDEO_ID, LANGUAGES) == result
+    assert engine.cached(VIDEO_ID, LANGUAGES) == result
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for ETags and HTTP caching: content digests kept with cache entries,
+the tags built from them (transcript_core.payload_encoding), and conditional
+``/get_transcript`` requests.
+"""
+
+import copy
+
+from transcript_core.payload_encoding import (
+    build_segments,
+    cache_control,
+    content_digest,
+    etag_matches,
+    transcript_etag,
+)
+from transcript_core.transcript_cache import TranscriptCache
+
+VIDEO_ID = "abcdefghijk"
+NO_SHAPE = {"start_ms": None, "end_ms": None, "chunk_chars": None}
+
+
+def get_transcript(client, headers=None, **params):
+    return client.get("/get_transcript", params={"videoId": VIDEO_ID, **params}, headers=headers)
+
+
+def make_result(count: int = 10, seconds: float = 2.0) -> dict:
+    """A result with ``count`` back-to-back captions of ``seconds`` each."""
+    texts = [f"caption {i}" for i in range(count)]
+    return {
+        "transcript": " ".join(texts),
+        "language": "en",
+        "title": "Test video",
+        "channel": "Test channel",
+        "durationSeconds": int(count * seconds),
+        "videoId": "abcdefghijk",
+        "segments": build_segments(texts, [i * seconds for i in range(count)], [seconds] * count),
+    }
+
+
+def test_cache_digest_follows_value():
+    cache = TranscriptCache(1000, 60, 10)
+    value = {"n": 1}
+    cache.set("a", value, 100, "digest")
+    assert cache.digest("a", value) == "digest"
+    assert cache.digest("a", {"n": 1}) is None
+    cache.set("a", {"n": 2}, 100)
+    assert cache.digest("a", value) is None
+
+
+
+
+def test_etag_changes_with_content_and_variant():
+    result = make_result()
+    base = transcript_etag(content_digest(result), "text", NO_SHAPE, "", "gzip", 1024)
+    assert base.startswith('"') and base.endswith('"')
+    assert transcript_etag(content_digest(make_result()), "text", NO_SHAPE, "", "gzip", 1024) == base
+
+    for change in (
+        lambda r: r.__setitem__("title", "Renamed"),
+        lambda r: r.__setitem__("durationSeconds", 1),
+        lambda r: r["segments"]["start_ms"].__setitem__(3, 6500),
+        lambda r: r["segments"]["duration_ms"].__setitem__(3, 1500),
+        lambda r: r.__setitem__("transcript", r["transcript"].upper()),
+    ):
+        changed = copy.deepcopy(result)
+        change(changed)
+        assert transcript_etag(content_digest(changed), "text", NO_SHAPE, "", "gzip", 1024) != base
+
+    digest = content_digest(result)
+    assert transcript_etag(digest, "segments", NO_SHAPE, "", "gzip", 1024) != base
+    assert transcript_etag(digest, "text", {**NO_SHAPE, "start_ms": 0}, "", "gzip", 1024) != base
+    assert transcript_etag(digest, "text", NO_SHAPE, "application/msgpack", "gzip", 1024) != base
+    assert transcript_etag(digest, "text", NO_SHAPE, "", "identity", 1024) != base
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches("", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+
+
+def test_cache_control():
+    assert cache_control(0) == "no-cache"
+    assert cache_control(60) == "private, max-age=60"
+    assert cache_control(60.5, public=True) == "public, max-age=60"
+
+
+def test_etag_revalidation(client, cache_transcript):
+    cache_transcript()
+    first = get_transcript(client)
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"].endswith("max-age=86400")
+
+    not_modified = get_transcript(client, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+
+    # Another window of the same transcript is a different response
+    assert get_transcript(client, start="4").headers["ETag"] != etag
+
+    # A metadata change alone changes the tag, so the stale copy is not revalidated
+    cache_transcript(title="Renamed video")
+    changed = get_transcript(client, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["title"] == "Renamed video"
+    assert changed.headers["ETag"] != etag
+
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent bulk job queue (transcript_core.job_queue): resuming
+after a restart, cancellation, retention and the scheduler.
+"""
+
+import asyncio
+
+import pytest
+
+from transcript_core.job_queue import JobScheduler, JobStore
+
+VIDEO_IDS = ["video000000", "video000001", "video000002"]
+LANGUAGES = ("en",)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.db")
+
+
+def age(store: JobStore, job_id: str, seconds: float) -> None:
+    """Move a job's timestamps ``seconds`` into the past."""
+    store._conn.execute("UPDATE jobs SET created_at = created_at - ? WHERE id = ?", (seconds, job_id))
+    store._conn.execute("UPDATE job_items SET updated_at = updated_at - ? WHERE job_id = ?", (seconds, job_id))
+
+
+def finish_all(store: JobStore) -> None:
+    for job_id, position, video_id, *_ in store.claim(100):
+        store.finish(job_id, position, 200, {"videoId": video_id})
+
+
+def test_resume_after_restart(db_path):
+    store = JobStore(db_path)
+    job_id = store.create(VIDEO_IDS, LANGUAGES, True)
+    first, _ = store.claim(2)
+    store.finish(*first[:2], 200, {"transcript": "done"})
+    store.close()  # the machine stops while the second item is running
+
+    # A worker without the scheduler lock leaves running items alone
+    store = JobStore(db_path, resume=False)
+    assert [item[2] for item in store.claim(10)] == [VIDEO_IDS[2]]
+    store.close()
+
+    store = JobStore(db_path)
+    assert store.claim(10) == [(job_id, position, VIDEO_IDS[position], LANGUAGES, True, 0) for position in (1, 2)]
+    progress = store.progress(job_id)
+    assert (progress["status"], progress["succeeded"], progress["pending"]) == ("running", 1, 2)
+    assert store.results(job_id, 0, 10) == [{"videoId": VIDEO_IDS[0], "status": 200, "transcript": {"transcript": "done"}}]
+
+
+def test_cancel_stops_pending_items(db_path):
+    store = JobStore(db_path)
+    job_id = store.create(VIDEO_IDS, LANGUAGES, False)
+    (running,) = store.claim(1)
+    assert store.cancel(job_id)
+    assert not store.cancel("missing")
+    assert store.claim(10) == []
+    progress = store.progress(job_id)
+    assert (progress["status"], progress["pending"], progress["cancelled"]) == ("cancelled", 1, 2)
+
+    # The item already running still records its result
+    store.finish(*running[:2], 404, {"error": "TRANSCRIPT_NOT_AVAILABLE"})
+    assert store.progress(job_id)["pending"] == 0
+    assert store.results(job_id, 0, 10)[0]["error"] == {"error": "TRANSCRIPT_NOT_AVAILABLE"}
+
+
+def test_prune_deletes_only_expired_finished_jobs(db_path):
+    store = JobStore(db_path)
+    finished = store.create(VIDEO_IDS[:1], LANGUAGES, False)
+    finish_all(store)
+    cancelled = store.create(VIDEO_IDS, LANGUAGES, False)
+    store.cancel(cancelled)
+    in_progress = store.create(VIDEO_IDS, LANGUAGES, False)
+    recent = store.create(VIDEO_IDS[:1], LANGUAGES, False)
+    for job_id in (finished, cancelled, in_progress, recent):
+        age(store, job_id, 7200)
+    finish_all(store)  # finishes in_progress and recent items now
+    store.create(VIDEO_IDS, LANGUAGES, False)  # stays pending, so in_progress keeps work left
+    in_progress_left = store.create(VIDEO_IDS[:1], LANGUAGES, False)
+    age(store, in_progress_left, 7200)
+
+    assert store.prune(3600) == 2
+    assert store.progress(finished) is None and store.progress(cancelled) is None
+    assert store.results(finished, 0, 10) == []
+    assert store.progress(recent)["status"] == "completed"
+    assert store.progress(in_progress_left)["status"] == "queued"
+    assert store.prune(3600) == 0
+
+
+def test_prune_skips_cancelled_job_with_running_item(db_path):
+    store = JobStore(db_path)
+    job_id = store.create(VIDEO_IDS, LANGUAGES, False)
+    store.claim(1)
+    store.cancel(job_id)
+    age(store, job_id, 7200)
+    assert store.prune(3600) == 0
+    store.close()
+    # After a restart the interrupted item is pending again, but the job is cancelled
+    store = JobStore(db_path)
+    assert store.prune(3600) == 1
+
+
+def test_scheduler_fetches_items_and_prunes(db_path):
+    store = JobStore(db_path)
+    expired = store.create(VIDEO_IDS[:1], LANGUAGES, False)
+    finish_all(store)
+    age(store, expired, 7200)
+    job_id = store.create(VIDEO_IDS, LANGUAGES, False)
+
+    async def fetch_item(video_id, languages, translate):
+        if video_id == VIDEO_IDS[1]:
+            return 503, {"error": "SERVER_BUSY"}
+        return 200, {"videoId": video_id, "languages": list(languages)}
+
+    async def scenario():
+        scheduler = JobScheduler(store, fetch_item, rate=0, concurrency=2, max_attempts=1, retention_seconds=3600)
+        scheduler.start()
+        for _ in range(100):
+            if store.progress(job_id)["pending"] == 0:
+                break
+            await asyncio.sleep(0.02)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+    assert store.progress(expired) is None
+    progress = store.progress(job_id)
+    assert (progress["status"], progress["succeeded"], progress["failed"]) == ("completed", 2, 1)
+    # With max_attempts reached, a retryable status is recorded as the item's result
+    assert [item["status"] for item in store.results(job_id, 0, 10)] == [200, 503, 200]
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus text-format registry (transcript_core.metrics) and
+the /metrics endpoint.
+"""
+
+import math
+
+from transcript_core.metrics import MetricsRegistry, stat_samples
+
+
+def test_counter_with_labels():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests by route", ("route",))
+    requests.inc(route="/a")
+    requests.inc(2, route="/a")
+    requests.inc(route="/b")
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests by route",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a"} 3',
+        'requests_total{route="/b"} 1',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.5, 0.1, 1))
+    for value in (0.05, 0.2, 0.3, 5):
+        latency.observe(value)
+    lines = registry.render().splitlines()
+    assert lines[1] == "# TYPE latency_seconds histogram"
+    assert lines[2:] == [
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="0.5"} 3',
+        'latency_seconds_bucket{le="1"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 5.55",
+        "latency_seconds_count 4",
+    ]
+
+
+def test_histogram_times_a_block():
+    registry = MetricsRegistry()
+    stage = registry.histogram("stage_seconds", "Stage latency", ("stage",), buckets=(60,))
+    with stage.time(stage="fetch"):
+        pass
+    assert 'stage_seconds_count{stage="fetch"} 1' in registry.render().splitlines()
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("errors_total", "Errors", ("message",)).inc(message='bad "quote" \\ and\nnewline')
+    assert registry.render().splitlines()[-1] == 'errors_total{message="bad \\"quote\\" \\\\ and\\nnewline"} 1'
+
+
+def test_collected_metrics_are_read_at_render_time():
+    registry = MetricsRegistry()
+    stats = {"hits": 1, "misses": 0, "hit_rate": 1.0, "state": "closed"}
+    registry.collect("cache_total", "counter", "Cache lookups", lambda: stat_samples(stats, ("hits", "misses", "state"), "kind"))
+    registry.collect("cache_ratio", "gauge", "Ratio", lambda: [({}, stats["hit_rate"]), ({"edge": "x"}, math.inf)])
+    stats["hits"] = 7
+    lines = registry.render().splitlines()
+    # Non-numeric stats are skipped
+    assert 'cache_total{kind="hits"} 7' in lines and 'cache_total{kind="misses"} 0' in lines
+    assert not any("state" in line for line in lines)
+    assert "cache_ratio 1" in lines and 'cache_ratio{edge="x"} +Inf' in lines
+
+
+def test_metrics_endpoint(client, cache_transcript):
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    cache_transcript()
+    client.get("/get_transcript", params={"videoId": "abcdefghijk"})
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert any(line.startswith('http_requests_total{method="GET",route="/get_transcript",status="200"} ') for line in lines)
+    assert any(line.startswith('http_request_duration_seconds_bucket{method="GET",route="/get_transcript",le="+Inf"} ') for line in lines)
+    assert any(line.startswith('transcript_results_total{code="OK"} ') for line in lines)
+    # Labels use the route template, so unknown paths share one series
+    client.get("/no/such/path")
+    assert 'route="unmatched"' in client.get("/metrics").text
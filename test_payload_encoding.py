@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for response serialization and compression
+(transcript_core.payload_encoding), plus the request parameters that select
+them (transcript_core.validation).
+"""
+
+import gzip
+import json
+
+import brotli
+import msgpack
+import pytest
+
+from transcript_core import payload_encoding, validation
+from transcript_core.errors import ApiError
+from transcript_core.payload_encoding import (
+    EncodingUnavailable,
+    build_segments,
+    encode_payload,
+    negotiate_content_encoding,
+    wants_msgpack,
+)
+from transcript_core.validation import validate_encoding
+
+def make_result(count: int = 10, seconds: float = 2.0) -> dict:
+    """A result with ``count`` back-to-back captions of ``seconds`` each."""
+    texts = [f"caption {i}" for i in range(count)]
+    return {
+        "transcript": " ".join(texts),
+        "language": "en",
+        "title": "Test video",
+        "channel": "Test channel",
+        "durationSeconds": int(count * seconds),
+        "videoId": "abcdefghijk",
+        "segments": build_segments(texts, [i * seconds for i in range(count)], [seconds] * count),
+    }
+
+
+def test_wants_msgpack():
+    assert wants_msgpack("application/msgpack")
+    assert wants_msgpack("application/json;q=0.5, application/x-msgpack")
+    assert not wants_msgpack("application/json")
+    assert not wants_msgpack("")
+
+
+@pytest.mark.parametrize("accept_encoding, coding", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("*", "br"),
+    ("*, br;q=0", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("", None),
+    ("br;q=bad, gzip", "gzip"),
+])
+def test_negotiate_content_encoding(accept_encoding, coding):
+    assert negotiate_content_encoding(accept_encoding) == coding
+
+
+def test_negotiate_without_brotli(monkeypatch):
+    monkeypatch.setattr(payload_encoding, "brotli", None)
+    assert negotiate_content_encoding("br, gzip") == "gzip"
+    assert negotiate_content_encoding("br") is None
+
+
+def test_encode_payload_json_and_compression():
+    payload = make_result(count=200)
+    body, headers = encode_payload(payload, "", "", 1024)
+    assert json.loads(body) == payload
+    assert headers == {"Content-Type": "application/json", "Vary": "Accept, Accept-Encoding"}
+
+    body, headers = encode_payload(payload, "", "gzip", 1024)
+    assert headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(body)) == payload
+
+    body, headers = encode_payload(payload, "", "br, gzip", 1024)
+    assert headers["Content-Encoding"] == "br"
+    assert json.loads(brotli.decompress(body)) == payload
+
+    # Small bodies, and a threshold of 0, are sent uncompressed
+    assert "Content-Encoding" not in encode_payload({"n": 1}, "", "gzip", 1024)[1]
+    assert "Content-Encoding" not in encode_payload(payload, "", "gzip", 0)[1]
+
+
+def test_encode_payload_msgpack():
+    payload = make_result(count=200)
+    body, headers = encode_payload(payload, "application/msgpack", "gzip", 1024)
+    assert headers["Content-Type"] == "application/msgpack" and headers["Content-Encoding"] == "gzip"
+    assert msgpack.unpackb(gzip.decompress(body), raw=False) == payload
+    # Timing arrays of integers are smaller as MessagePack than as JSON
+    assert len(encode_payload(payload, "application/msgpack", "", 0)[0]) < len(encode_payload(payload, "", "", 0)[0])
+
+
+def test_msgpack_unavailable(monkeypatch):
+    monkeypatch.setattr(payload_encoding, "msgpack", None)
+    monkeypatch.setattr(validation, "msgpack", None)
+    with pytest.raises(EncodingUnavailable):
+        encode_payload({}, "application/msgpack", "", 0)
+    with pytest.raises(ApiError) as error:
+        validate_encoding("application/msgpack")
+    assert error.value.status_code == 406
+    assert error.value.detail["error"] == "UNSUPPORTED_ENCODING"
+    validate_encoding("application/json")
+
+
+def test_transcript_response_negotiation(client, cache_transcript):
+    result = cache_transcript(count=200)
+    response = client.get(
+        "/get_transcript", params={"videoId": "abcdefghijk", "format": "segments"},
+        headers={"Accept": "application/msgpack", "Accept-Encoding": "br"},
+    )
+    assert response.headers["content-type"] == "application/msgpack"
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
+    # The test client decodes brotli itself
+    assert msgpack.unpackb(response.content, raw=False)["segments"] == result["segments"]
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Tests for peer routing (transcript_core.peers): the consistent hash ring,
+PeerRouter ownership, forwarding and fallback, and how forwarded requests
+coalesce with local ones in the app.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from transcript_core.errors import ApiError
+from transcript_core.peers import PEER_FAILURE_THRESHOLD, HashRing, PeerRouter, PeerUnavailable
+
+SELF_URL = "http://10.0.0.1:8080"
+OTHER_URL = "http://10.0.0.2:8080"
+LANGUAGES = ("en",)
+
+
+def video_owned_by(router: PeerRouter, owner: str) -> str:
+    return next(f"video{i:06d}" for i in range(1000) if router.owner(f"video{i:06d}") == owner)
+
+
+@pytest.fixture
+def peer():
+    """A peer answering /peer/transcript with the status and body set in ``peer.answer``."""
+    answers = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            status, body = answers["answer"]
+            answers.setdefault("paths", []).append(self.path)
+            payload = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.answers = answers
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_hash_ring_is_stable_and_balanced():
+    members = [f"http://10.0.0.{i}:8080" for i in range(4)]
+    ring = HashRing(members)
+    keys = [f"video{i:06d}" for i in range(4000)]
+    owners = {key: ring.owner(key) for key in keys}
+    assert HashRing(list(reversed(members))).owner(keys[0]) == owners[keys[0]]
+    counts = Counter(owners.values())
+    assert set(counts) == set(members)
+    assert min(counts.values()) > len(keys) / len(members) / 2
+
+
+def test_hash_ring_moves_only_removed_members_keys():
+    members = [f"http://10.0.0.{i}:8080" for i in range(4)]
+    before = HashRing(members)
+    after = HashRing(members[:-1])
+    for key in (f"video{i:06d}" for i in range(2000)):
+        if before.owner(key) != members[-1]:
+            assert after.owner(key) == before.owner(key)
+
+
+def test_hash_ring_empty():
+    assert HashRing([]).owner("video") is None
+
+
+def test_router_owns_and_routes():
+    router = PeerRouter(SELF_URL, [OTHER_URL])
+    mine, theirs = video_owned_by(router, SELF_URL), video_owned_by(router, OTHER_URL)
+    assert router.owns(mine) and not router.would_forward(mine)
+    assert router.route(mine) is None
+    assert not router.owns(theirs) and router.would_forward(theirs)
+    assert router.route(theirs) == OTHER_URL
+    # Alone on the ring, an instance owns everything
+    assert PeerRouter(SELF_URL).owns(theirs)
+
+
+def test_fetch_from_owner(peer):
+    router = PeerRouter(SELF_URL, [peer.url], api_key="secret")
+    result = {"transcript": "from the owner", "videoId": "abcdefghijk"}
+    peer.answers["answer"] = (200, result)
+    assert router.fetch(peer.url, "abcdefghijk", ("de", "en"), True) == result
+    assert peer.answers["paths"][0] == "/peer/transcript?videoId=abcdefghijk&languages=de%2Cen&translate=true"
+
+    # A verdict on the video is final; other errors fall back to a local fetch
+    peer.answers["answer"] = (404, {"detail": {"error": "TRANSCRIPT_NOT_AVAILABLE", "message": "none"}})
+    with pytest.raises(ApiError) as error:
+        router.fetch(peer.url, "abcdefghijk", LANGUAGES, False)
+    assert error.value.status_code == 404
+    peer.answers["answer"] = (503, {"detail": {"error": "SERVER_BUSY", "message": "busy"}})
+    with pytest.raises(PeerUnavailable):
+        router.fetch(peer.url, "abcdefghijk", LANGUAGES, False)
+
+
+def test_failing_owner_is_skipped(peer):
+    router = PeerRouter(SELF_URL, [peer.url], refresh_interval=60)
+    video_id = video_owned_by(router, peer.url)
+    # Something in between answers instead of the app
+    peer.answers["answer"] = (502, b"<html>Bad Gateway</html>")
+    for _ in range(PEER_FAILURE_THRESHOLD):
+        assert router.route(video_id) == peer.url
+        with pytest.raises(PeerUnavailable):
+            router.fetch(peer.url, video_id, LANGUAGES, False)
+    assert not router.would_forward(video_id)
+    assert router.route(video_id) is None
+
+
+@pytest.fixture
+def counted_fetches(service, monkeypatch):
+    """Route the app engine through a two-member ring and count its uncached resolutions."""
+    router = PeerRouter(SELF_URL, [OTHER_URL])
+    calls = []
+
+    def resolve_uncached(video_id, languages, translate=False, route=True):
+        calls.append((video_id, route))
+        time.sleep(0.1)
+        return {"transcript": "fetched", "videoId": video_id}
+
+    monkeypatch.setattr(service.engine, "peers", router)
+    monkeypatch.setattr(service.engine, "check_upstream", lambda video_id, route=True: None)
+    monkeypatch.setattr(service.engine, "resolve_uncached", resolve_uncached)
+    return router, calls
+
+
+def test_owner_coalesces_forwarded_and_local_requests(service, counted_fetches):
+    router, calls = counted_fetches
+    video_id = video_owned_by(router, SELF_URL)
+
+    async def scenario():
+        return await asyncio.gather(
+            service.resolve_transcript(video_id, LANGUAGES),
+            service.resolve_transcript(video_id, LANGUAGES, route=False),
+            service.resolve_transcript(video_id, LANGUAGES, route=False),
+        )
+
+    results = asyncio.run(scenario())
+    assert all(result is results[0] for result in results)
+    # One fetch per distinct video on its owner
+    assert len(calls) == 1
+
+
+def test_non_owner_keeps_forwarded_requests_apart(service, counted_fetches):
+    router, calls = counted_fetches
+    video_id = video_owned_by(router, OTHER_URL)
+
+    async def scenario():
+        await asyncio.gather(
+            service.resolve_transcript(video_id, LANGUAGES),
+            service.resolve_transcript(video_id, LANGUAGES, route=False),
+        )
+
+    asyncio.run(scenario())
+    # The local request may be forwarding to the owner, so the forwarded one never waits on it
+    assert sorted(calls) == [(video_id, False), (video_id, True)]
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the background proxy health monitor (transcript_core.proxy_pool.ProxyHealthMonitor)
+and the probe metrics the engine exports from it. Probes never leave the process:
+``requests.get`` is replaced for each test.
+"""
+
+import pytest
+import requests
+
+from transcript_core.engine import EngineSettings, TranscriptEngine
+from transcript_core.metrics import REGISTRY
+from transcript_core.proxy_pool import ProxyHealthMonitor, parse_proxy_endpoints
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, origin: str = "203.0.113.7"):
+        self.status_code = status_code
+        self._origin = origin
+
+    def json(self):
+        return {"origin": self._origin}
+
+
+@pytest.fixture
+def engine():
+    endpoints = parse_proxy_endpoints("http://good.invalid:3128,http://bad.invalid:3128")
+    engine = TranscriptEngine(EngineSettings(proxy_monitor_interval_seconds=0), endpoints)
+    # Built here rather than by start(), so no probe thread runs in the background
+    engine.proxy_monitor = ProxyHealthMonitor(engine.proxy_pool, 60, "https://probe.invalid/ip")
+    return engine
+
+
+def probe_everything(engine, monkeypatch):
+    def fake_get(url, proxies, timeout):
+        if "bad.invalid" in proxies["https"]:
+            raise requests.exceptions.ProxyError("tunnel refused")
+        return FakeResponse(200)
+
+    monkeypatch.setattr("transcript_core.proxy_pool.requests.get", fake_get)
+    engine.proxy_monitor.sample()
+
+
+def test_probe_records_status_and_scores_pool(engine, monkeypatch):
+    probe_everything(engine, monkeypatch)
+    probe_everything(engine, monkeypatch)
+    good = engine.proxy_monitor.status("good.invalid:3128")
+    bad = engine.proxy_monitor.status("bad.invalid:3128")
+    assert good["healthy"] and good["exit_ip"] == "203.0.113.7" and good["samples"] == 2
+    assert not bad["healthy"] and bad["consecutive_failures"] == 2 and "tunnel refused" in bad["last_error"]
+    scores = {endpoint["name"]: endpoint for endpoint in engine.proxy_pool.stats()}
+    assert scores["bad.invalid:3128"]["failures"] == 2
+    assert scores["good.invalid:3128"]["failures"] == 0
+
+
+def test_non_200_probe_is_a_failure(engine, monkeypatch):
+    monkeypatch.setattr("transcript_core.proxy_pool.requests.get", lambda url, proxies, timeout: FakeResponse(407))
+    engine.proxy_monitor.sample()
+    assert engine.proxy_monitor.status("good.invalid:3128")["last_error"] == "HTTP 407"
+
+
+def test_probe_results_are_exported_as_metrics(engine, monkeypatch):
+    probe_everything(engine, monkeypatch)
+    lines = REGISTRY.render().splitlines()
+    for expected in (
+        'proxy_probe_healthy{endpoint="good.invalid:3128"} 1',
+        'proxy_probe_healthy{endpoint="bad.invalid:3128"} 0',
+        'proxy_probe_consecutive_failures{endpoint="bad.invalid:3128"} 1',
+        'proxy_probes_total{endpoint="good.invalid:3128",result="ok"} 1',
+        'proxy_probes_total{endpoint="bad.invalid:3128",result="failed"} 1',
+        'proxy_probe_exit_ip_info{endpoint="good.invalid:3128",exit_ip="203.0.113.7"} 1',
+    ):
+        assert expected in lines
+    assert any(line.startswith('proxy_probe_latency_seconds{endpoint="bad.invalid:3128"}') for line in lines)
+    assert "# TYPE proxy_probes_total counter" in lines
+
+
+def test_no_probe_metrics_before_the_first_probe(engine):
+    assert engine._probes() == []
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for proxy endpoint parsing and health-scored routing
+(transcript_core.proxy_pool.ProxyPool): weighting, benching and recovery.
+"""
+
+import random
+import time
+from collections import Counter
+
+import pytest
+
+from transcript_core.proxy_pool import MIN_WEIGHT, ProxyPool, parse_proxy_endpoints
+
+
+def make_pool(bench_after: int = 3, bench_seconds: float = 60) -> ProxyPool:
+    return ProxyPool(parse_proxy_endpoints("http://good:3128,http://bad:3128"), bench_after, bench_seconds)
+
+
+def by_name(pool: ProxyPool) -> dict:
+    return {stats["name"]: stats for stats in pool.stats()}
+
+
+def test_parse_endpoints():
+    endpoints = parse_proxy_endpoints("alice:secret, http://bob:pw@proxy.example:8080 ,,http://plain.example")
+    assert [endpoint.name for endpoint in endpoints] == ["webshare-1", "proxy.example:8080", "plain.example"]
+    assert endpoints[0].is_webshare and endpoints[0].password == "secret"
+    assert endpoints[1].probe_proxies()["https"] == "http://bob:pw@proxy.example:8080"
+    # Names are used in logs and metrics, so they never carry credentials
+    assert all("pw" not in endpoint.name and "secret" not in endpoint.name for endpoint in endpoints)
+    assert parse_proxy_endpoints("") == []
+
+
+@pytest.mark.parametrize("spec", ["alice", "alice:", ":secret", "http://:3128"])
+def test_parse_rejects_bad_entries(spec):
+    with pytest.raises(ValueError):
+        parse_proxy_endpoints(spec)
+
+
+def test_failures_and_latency_lower_the_weight():
+    pool = make_pool(bench_after=100)
+    good, bad = pool.endpoints
+    assert by_name(pool)["good:3128"]["weight"] == by_name(pool)["bad:3128"]["weight"] == 1
+    pool.record(bad, False, 100)
+    pool.record(bad, True, 100)
+    pool.record(good, True, 2000)
+    stats = by_name(pool)
+    assert stats["bad:3128"]["success_rate"] == pytest.approx(0.84)
+    assert stats["bad:3128"]["weight"] == pytest.approx(0.84 ** 2 / 1.1, abs=1e-4)
+    assert stats["good:3128"]["weight"] == pytest.approx(1 / 3, abs=1e-4)
+
+    for _ in range(50):
+        pool.record(bad, False)
+    assert by_name(pool)["bad:3128"]["weight"] == MIN_WEIGHT
+
+
+def test_choose_prefers_the_healthy_endpoint():
+    random.seed(1)
+    pool = make_pool(bench_after=100)
+    good, bad = pool.endpoints
+    for _ in range(5):
+        pool.record(bad, False)
+    counts = Counter(pool.choose().name for _ in range(2000))
+    # Weights are 1 and 0.8**10; the failing endpoint still gets traffic to recover
+    assert 0.85 < counts["good:3128"] / 2000 < 0.95
+    assert counts["bad:3128"] > 0
+
+
+def test_bench_after_consecutive_failures_and_recover():
+    pool = make_pool(bench_after=3)
+    good, bad = pool.endpoints
+    pool.record(bad, False)
+    pool.record(bad, False)
+    pool.record(bad, True)
+    pool.record(bad, False)
+    pool.record(bad, False)
+    assert not by_name(pool)["bad:3128"]["benched"]
+    pool.record(bad, False)
+    stats = by_name(pool)["bad:3128"]
+    assert stats["benched"] and stats["benches"] == 1
+    assert all(pool.choose() is good for _ in range(50))
+
+    # A success (e.g. a background probe) puts it back into rotation
+    pool.record(bad, True)
+    assert not by_name(pool)["bad:3128"]["benched"]
+
+
+def test_all_benched_uses_the_one_back_soonest():
+    pool = make_pool(bench_after=1, bench_seconds=60)
+    good, bad = pool.endpoints
+    pool.record(bad, False)
+    time.sleep(0.01)
+    pool.record(good, False)
+    assert all(stats["benched"] for stats in pool.stats())
+    assert pool.choose() is bad
+
+
+def test_bench_expires():
+    pool = make_pool(bench_after=1, bench_seconds=0.05)
+    good, bad = pool.endpoints
+    pool.record(bad, False)
+    assert by_name(pool)["bad:3128"]["benched"]
+    time.sleep(0.06)
+    assert not by_name(pool)["bad:3128"]["benched"]
+    assert {pool.choose() for _ in range(200)} == {good, bad}
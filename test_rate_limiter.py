@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the adaptive upstream rate limiter (transcript_core.rate_limiter) and
+how long a fetch waits on it before giving up with UpstreamThrottled.
+"""
+
+import time
+
+import pytest
+
+from transcript_core.circuit_breaker import CircuitBreaker
+from transcript_core.engine import TranscriptClientPool, fetch_deadline
+from transcript_core.proxy_pool import ProxyPool, parse_proxy_endpoints
+from transcript_core.rate_limiter import AdaptiveRateLimiter, UpstreamThrottled
+
+
+def throttled_client_pool(acquire_timeout: float) -> TranscriptClientPool:
+    """A client pool whose limiter has no token for the next 10 seconds."""
+    limiter = AdaptiveRateLimiter(max_rate=0.1, min_rate=0.1, burst=1)
+    assert limiter.acquire(0)
+    proxy_pool = ProxyPool(parse_proxy_endpoints("http://proxy.invalid:3128"), 100, 60)
+    breakers = {name: CircuitBreaker(name, 100, 30) for name in ("proxy", "youtube", "network")}
+    return TranscriptClientPool(1, proxy_pool, breakers, limiter, 0, 0.2, 8, acquire_timeout)
+
+
+def test_limiter_burst_then_throttles():
+    limiter = AdaptiveRateLimiter(max_rate=1, min_rate=0.1, burst=3)
+    assert all(limiter.acquire(0) for _ in range(3))
+    assert not limiter.acquire(0)
+    assert limiter.stats()["throttled"] == 1
+
+
+def test_limiter_halves_on_block_and_recovers():
+    limiter = AdaptiveRateLimiter(max_rate=8, min_rate=1, burst=1)
+    limiter.record_block()
+    assert limiter.rate == 4
+    for _ in range(5):
+        limiter.record_block()
+    assert limiter.rate == 1
+    limiter.record_success()
+    assert limiter.rate == pytest.approx(1.4)
+    for _ in range(100):
+        limiter.record_success()
+    assert limiter.rate == 8
+
+
+def test_limiter_disabled_with_zero_rate():
+    limiter = AdaptiveRateLimiter(max_rate=0, min_rate=0, burst=1)
+    assert all(limiter.acquire(0) for _ in range(100))
+
+
+def test_fetch_gives_up_after_acquire_timeout():
+    client_pool = throttled_client_pool(acquire_timeout=0.1)
+    started = time.monotonic()
+    with pytest.raises(UpstreamThrottled):
+        client_pool.run(lambda ytt_api: pytest.fail("fetched without a token"))
+    assert time.monotonic() - started < 1
+
+
+def test_fetch_waits_no_longer_than_the_deadline():
+    client_pool = throttled_client_pool(acquire_timeout=60)
+    token = fetch_deadline.set(time.monotonic() + 0.1)
+    try:
+        started = time.monotonic()
+        # Throttled while the caller is still waiting, rather than a 504 after it gave up
+        with pytest.raises(UpstreamThrottled):
+            client_pool.run(lambda ytt_api: pytest.fail("fetched without a token"))
+    finally:
+        fetch_deadline.reset(token)
+    assert time.monotonic() - started < 1
+    assert client_pool.rate_limiter.stats()["throttled"] == 1
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for the full-text search index over cached transcripts
+(transcript_core.search_index).
+"""
+
+from transcript_core.payload_encoding import build_segments
+from transcript_core.search_index import SearchIndex
+
+
+def make_result(video_id: str, words: str = "hello world", language: str = "en") -> dict:
+    texts = [f"{words} {i}" for i in range(20)]
+    return {
+        "transcript": " ".join(texts),
+        "language": language,
+        "title": f"Video {video_id}",
+        "videoId": video_id,
+        "segments": build_segments(texts, list(range(20)), [1] * 20),
+    }
+
+
+def key(video_id: str, languages: tuple = ("en",)) -> tuple:
+    return (video_id, languages, False)
+
+
+def test_search_index_discard_and_compact():
+    index = SearchIndex(10 ** 6)
+    results = {key(f"video{i:06d}"): make_result(f"video{i:06d}", f"topic{i % 2} words") for i in range(10)}
+    for cache_key, result in results.items():
+        assert index.add(cache_key, result)
+    assert index.search("topic0", results.get)["total"] == 5
+
+    index.discard(key("video000000"))
+    found = index.search("topic0", results.get)
+    assert found["total"] == 4
+    assert "video000000" not in [item["videoId"] for item in found["results"]]
+
+    before = index.stats()["bytes"]
+    index.compact()
+    stats = index.stats()
+    assert stats["documents"] == 9 and stats["pending_removal"] == 0
+    assert stats["bytes"] < before
+    assert index.search("topic0", results.get)["total"] == 4
+    assert index.search("topic1", results.get)["total"] == 5
+
+    # A document whose transcript is gone is dropped when a query finds it
+    del results[key("video000001")]
+    assert index.search("topic1", results.get)["total"] == 4
+    assert index.stats()["documents"] == 8
+
+
+def test_keys_sharing_a_document_are_all_registered():
+    index = SearchIndex(10 ** 6)
+    result = make_result("video000000", "shared topic")
+    first, second = key("video000000"), key("video000000", ("de", "en"))
+    assert index.add(first, result)
+    before = index.stats()["bytes"]
+    # The same video in the same resulting language is indexed once
+    assert not index.add(second, result)
+    stats = index.stats()
+    assert stats["documents"] == 1 and stats["keys"] == 2
+    assert stats["bytes"] > before
+
+    # A query that finds the first key gone falls back to the second
+    results = {second: result}
+    found = index.search("shared", results.get)
+    assert found["total"] == 1 and found["results"][0]["videoId"] == "video000000"
+    stats = index.stats()
+    assert stats["documents"] == 1 and stats["keys"] == 1
+    assert stats["bytes"] == before
+
+    index.discard(second)
+    assert index.search("shared", results.get)["total"] == 0
+    assert index.stats()["documents"] == 0
+
+
+def test_key_moving_to_another_language():
+    index = SearchIndex(10 ** 6)
+    cache_key = key("video000000", ("de", "en"))
+    english, german = make_result("video000000", "english words"), make_result("video000000", "german words", "de")
+    assert index.add(key("video000000"), english)
+    assert not index.add(cache_key, english)
+    # The key now resolves to German; the English document keeps its other key
+    assert index.add(cache_key, german)
+    results = {key("video000000"): english, cache_key: german}
+    assert index.search("english", results.get)["total"] == 1
+    assert index.search("german", results.get)["total"] == 1
+    assert index.stats()["keys"] == 2
+
+    index.compact()
+    index.discard(key("video000000"))
+    assert index.search("english", results.get)["total"] == 0
+    assert index.search("german", results.get)["total"] == 1
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for picking a caption track from one listing (engine.select_transcript).
+Listings are built from youtube_transcript_api's own classes, without a fetch.
+"""
+
+import pytest
+from youtube_transcript_api import NoTranscriptFound
+from youtube_transcript_api._transcripts import Transcript, TranscriptList, _TranslationLanguage
+
+from transcript_core.engine import select_transcript
+
+VIDEO_ID = "abcdefghijk"
+TRANSLATIONS = [_TranslationLanguage("English", "en"), _TranslationLanguage("German", "de")]
+
+
+def track(language_code: str, is_generated: bool = False, translatable: bool = False) -> Transcript:
+    return Transcript(
+        None, VIDEO_ID, f"https://www.youtube.com/api/timedtext?lang={language_code}",
+        language_code.upper(), language_code, is_generated, TRANSLATIONS if translatable else [],
+    )
+
+
+def listing(*tracks: Transcript) -> TranscriptList:
+    manual = {t.language_code: t for t in tracks if not t.is_generated}
+    generated = {t.language_code: t for t in tracks if t.is_generated}
+    return TranscriptList(VIDEO_ID, manual, generated, TRANSLATIONS)
+
+
+def test_manual_track_preferred_over_generated():
+    transcripts = listing(track("en", is_generated=True), track("en"))
+    selected, strategy = select_transcript(transcripts, ("en",), False)
+    assert strategy == "manual" and not selected.is_generated
+
+
+def test_generated_track_of_preferred_language():
+    transcripts = listing(track("fr"), track("en", is_generated=True))
+    selected, strategy = select_transcript(transcripts, ("en",), False)
+    assert (selected.language_code, strategy) == ("en", "generated")
+
+
+def test_languages_tried_in_priority_order():
+    transcripts = listing(track("en"), track("de", is_generated=True))
+    selected, strategy = select_transcript(transcripts, ("de", "en"), False)
+    assert (selected.language_code, strategy) == ("de", "generated")
+
+
+def test_translation_into_first_offered_language():
+    transcripts = listing(track("fr", translatable=True))
+    selected, strategy = select_transcript(transcripts, ("es", "de"), True)
+    assert strategy == "translated"
+    assert selected.language_code == "de" and selected.language == "German"
+
+
+def test_fallback_without_translation():
+    transcripts = listing(track("fr", is_generated=True), track("ja"))
+    selected, strategy = select_transcript(transcripts, ("en",), False)
+    assert (selected.language_code, strategy) == ("ja", "fallback")
+    # Translation was asked for, but no track can be translated
+    selected, strategy = select_transcript(transcripts, ("en",), True)
+    assert (selected.language_code, strategy) == ("ja", "fallback")
+
+
+def test_no_tracks_at_all():
+    with pytest.raises(NoTranscriptFound):
+        select_transcript(listing(), ("en",), True)
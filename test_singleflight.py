@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for request coalescing (transcript_core.singleflight.SingleFlight) and the
+coalescing metrics the app exports.
+"""
+
+import asyncio
+
+import pytest
+
+from transcript_core.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"transcript": "shared"}
+
+    async def scenario():
+        results = await asyncio.gather(*(flights.run("video", fetch) for _ in range(5)))
+        assert all(result is results[0] for result in results)
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
+    stats = flights.stats()
+    assert stats["calls"] == 5 and stats["deduplicated"] == 4 and stats["max_waiters"] == 5
+    assert stats["in_flight"] == 0 and stats["waiters"] == 0
+
+
+def test_keys_are_separate_and_released_when_done():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return len(calls)
+
+    async def scenario():
+        assert await asyncio.gather(flights.run("a", fetch), flights.run("b", fetch)) == [2, 2]
+        # The next call after completion starts a fresh execution
+        assert await flights.run("a", fetch) == 3
+
+    asyncio.run(scenario())
+
+
+def test_exception_reaches_every_waiter():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream said no")
+
+    async def scenario():
+        results = await asyncio.gather(*(flights.run("video", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_cancel_the_fetch():
+    flights = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        impatient = asyncio.ensure_future(flights.run("video", fetch))
+        patient = asyncio.ensure_future(flights.run("video", fetch))
+        await asyncio.sleep(0.01)
+        assert flights.stats()["waiters"] == 2
+        impatient.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+        assert await patient == "done"
+
+    asyncio.run(scenario())
+
+
+def test_coalescing_metrics_are_exported(service):
+    lines = service.metrics.render().splitlines()
+    assert "# TYPE transcript_coalesced_waiters gauge" in lines
+    assert "# TYPE transcript_coalesced_max_waiters gauge" in lines
+    assert any(line.startswith("transcript_coalesced_waiters ") for line in lines)
+    assert any(line.startswith("transcript_coalesced_max_waiters ") for line in lines)
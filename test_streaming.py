@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for NDJSON and Server-Sent Events streaming on the single and batch
+transcript endpoints.
+"""
+
+import json
+
+import pytest
+
+VIDEO_ID = "abcdefghijk"
+
+
+def ndjson_events(response) -> list:
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def sse_events(response) -> list:
+    events = []
+    for frame in response.text.split("\n\n"):
+        if not frame:
+            continue
+        fields = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append({"type": fields["event"], **json.loads(fields["data"])})
+    return events
+
+
+@pytest.mark.parametrize("mode, parse, media_type", [
+    ("ndjson", ndjson_events, "application/x-ndjson"),
+    ("sse", sse_events, "text/event-stream"),
+])
+def test_stream_single_transcript(service, client, cache_transcript, monkeypatch, mode, parse, media_type):
+    monkeypatch.setattr(service, "STREAM_CHUNK_CHARS", 50)
+    result = cache_transcript(count=30)
+    response = client.get("/get_transcript", params={"videoId": VIDEO_ID, "stream": mode})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(media_type)
+    events = parse(response)
+
+    assert events[0]["type"] == "metadata"
+    assert events[0]["title"] == "Test video" and "transcript" not in events[0]
+    chunks = [event for event in events if event["type"] == "chunk"]
+    assert len(chunks) > 1
+    assert [chunk["index"] for chunk in chunks] == list(range(len(chunks)))
+    assert "".join(chunk["text"] for chunk in chunks) == result["transcript"]
+    assert events[-1] == {"type": "end", "videoId": VIDEO_ID, "chunks": len(chunks)}
+
+
+def test_stream_segments_and_window(client, cache_transcript):
+    cache_transcript()
+    params = {"videoId": VIDEO_ID, "stream": "ndjson", "format": "segments", "start": "4", "end": "8"}
+    events = ndjson_events(client.get("/get_transcript", params=params))
+    assert [event["type"] for event in events] == ["metadata", "chunk", "segments", "end"]
+    assert events[1]["text"] == "caption 2 caption 3"
+    assert events[2]["start_ms"] == [4000, 6000]
+
+
+def test_stream_timed_chunks(client, cache_transcript):
+    cache_transcript()
+    params = {"videoId": VIDEO_ID, "stream": "ndjson", "chunkChars": "100"}
+    chunks = [event for event in ndjson_events(client.get("/get_transcript", params=params)) if event["type"] == "chunk"]
+    assert all(len(chunk["text"]) <= 100 and "start_ms" in chunk for chunk in chunks)
+
+
+def test_stream_rejects_unknown_mode(client, cache_transcript):
+    cache_transcript()
+    response = client.get("/get_transcript", params={"videoId": VIDEO_ID, "stream": "websocket"})
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "INVALID_STREAM_MODE"
+
+
+def test_stream_errors_before_streaming(client):
+    # No transcript is cached and the test app has no proxy: a plain error, not a stream
+    response = client.get("/get_transcript", params={"videoId": VIDEO_ID, "stream": "ndjson"})
+    assert response.status_code == 500
+    assert response.json()["detail"]["error"] == "CONFIGURATION_ERROR"
+
+
+@pytest.mark.parametrize("mode, parse", [("ndjson", ndjson_events), ("sse", sse_events)])
+def test_stream_batch(client, cache_transcript, mode, parse):
+    cache_transcript(VIDEO_ID)
+    response = client.post("/get_transcripts", params={"stream": mode}, json={"videoIds": [VIDEO_ID, "bad id!"]})
+    assert response.status_code == 200
+    events = parse(response)
+    results = {event["videoId"]: event for event in events if event["type"] == "result"}
+    assert results[VIDEO_ID]["status"] == 200
+    assert results["bad id!"]["error"]["error"] == "INVALID_VIDEO_ID"
+    assert events[-1] == {"type": "summary", "total": 2, "succeeded": 1, "failed": 1}
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-memory transcript cache (transcript_core.transcript_cache):
+LRU eviction under the byte cap, TTL expiry, stale reads and negative entries.
+"""
+
+import time
+
+from transcript_core.transcript_cache import TranscriptCache
+
+
+def test_cache_evicts_least_recently_used():
+    removed = []
+    cache = TranscriptCache(300, 60, 10, on_remove=removed.append)
+    cache.set("a", {"n": 1}, 100)
+    cache.set("b", {"n": 2}, 100)
+    cache.set("c", {"n": 3}, 100)
+    assert cache.get("a").value == {"n": 1}
+    cache.set("d", {"n": 4}, 100)
+    assert cache.get("b") is None
+    assert removed == ["b"]
+    assert cache.stats()["bytes"] == 300
+    # A value larger than the whole cache is not cached at all
+    cache.set("e", {"n": 5}, 301)
+    assert cache.get("e") is None
+
+
+def test_cache_expiry_and_stale_reads():
+    removed = []
+    cache = TranscriptCache(1000, 0.05, 10, on_remove=removed.append)
+    cache.set("a", {"n": 1}, 100)
+    time.sleep(0.1)
+    assert cache.peek("a") is None
+    assert cache.get("a", allow_stale=True).value == {"n": 1}
+    assert cache.get("a") is None
+    assert removed == ["a"]
+    assert cache.stats()["expirations"] == 1
+
+
+def test_cache_negative_entries():
+    removed = []
+    cache = TranscriptCache(1000, 60, 10, on_remove=removed.append)
+    cache.set_negative("a", "TranscriptsDisabled")
+    entry = cache.get("a")
+    assert entry.negative and entry.reason == "TranscriptsDisabled"
+    assert cache.peek("a") is None
+    assert TranscriptCache(1000, 60, 0).get("a") is None
+    cache.set("b", {}, 1000)
+    # Evicting a negative entry is not reported as a removed transcript
+    assert removed == []
+
+
+def test_disabled_cache_stores_nothing():
+    cache = TranscriptCache(0, 60, 10)
+    cache.set("a", {"n": 1}, 1)
+    cache.set_negative("b", "TranscriptsDisabled")
+    assert cache.get("a") is None and cache.get("b") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_replacing_an_entry_keeps_the_byte_count():
+    cache = TranscriptCache(1000, 60, 10)
+    cache.set("a", {"n": 1}, 300)
+    cache.set("a", {"n": 2}, 200)
+    assert cache.get("a").value == {"n": 2}
+    assert cache.stats()["bytes"] == 200 and cache.stats()["entries"] == 1
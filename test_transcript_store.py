@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent SQLite transcript store (transcript_core.transcript_store):
+round trips, expiry, the size triggers shared by every connection, and compaction.
+"""
+
+import time
+
+from transcript_core.payload_encoding import build_segments
+from transcript_core.transcript_store import TranscriptStore
+
+
+def make_result(video_id: str, words: str = "hello world") -> dict:
+    texts = [f"{words} {i}" for i in range(20)]
+    return {
+        "transcript": " ".join(texts),
+        "language": "en",
+        "title": f"Video {video_id}",
+        "videoId": video_id,
+        "segments": build_segments(texts, list(range(20)), [1] * 20),
+    }
+
+
+def test_store_round_trip_and_language_keys(tmp_path):
+    store = TranscriptStore(str(tmp_path / "store.db"), 10 ** 6, 3600)
+    result = make_result("abcdefghijk")
+    store.put("abcdefghijk", ("de", "en"), True, result)
+    assert store.get("abcdefghijk", ("de", "en"), True) == result
+    assert store.get("abcdefghijk", ("de", "en"), False) is None
+    assert store.recent(10)[0][:3] == ("abcdefghijk", ("de", "en"), True)
+    store.close()
+
+
+def test_store_expiry(tmp_path):
+    store = TranscriptStore(str(tmp_path / "store.db"), 10 ** 6, 0.05)
+    store.put("abcdefghijk", ("en",), False, make_result("abcdefghijk"))
+    time.sleep(0.1)
+    assert store.get("abcdefghijk", ("en",)) is None
+    assert store.get("abcdefghijk", ("en",), allow_expired=True) is not None
+    store.close()
+
+
+def test_store_size_triggers(tmp_path):
+    path = str(tmp_path / "store.db")
+    store = TranscriptStore(path, 10 ** 6, 3600)
+
+    def row_bytes():
+        return store._conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0]
+
+    store.put("aaaaaaaaaaa", ("en",), False, make_result("aaaaaaaaaaa"))
+    store.put("bbbbbbbbbbb", ("en",), False, make_result("bbbbbbbbbbb"))
+    assert store.stats()["bytes"] == row_bytes() > 0
+    # Replacing a row updates the total rather than adding to it
+    store.put("aaaaaaaaaaa", ("en",), False, make_result("aaaaaaaaaaa", "a much longer replacement text"))
+    assert store.stats()["bytes"] == row_bytes()
+    store._conn.execute("DELETE FROM transcripts WHERE video_id = 'bbbbbbbbbbb'")
+    total = row_bytes()
+    assert store.stats()["bytes"] == total
+    # Another connection to the file, as in another worker process, sees the same total
+    other = TranscriptStore(path, 10 ** 6, 3600)
+    assert other.stats()["bytes"] == total
+    other.put("ccccccccccc", ("en",), False, make_result("ccccccccccc"))
+    assert store.stats()["bytes"] == row_bytes() > total
+    other.close()
+    store.close()
+
+
+def test_store_compacts_least_recently_read(tmp_path):
+    removed = []
+    probe = TranscriptStore(str(tmp_path / "probe.db"), 10 ** 6, 3600)
+    probe.put("aaaaaaaaaaa", ("en",), False, make_result("aaaaaaaaaaa"))
+    row_size = probe.stats()["bytes"]
+    probe.close()
+
+    store = TranscriptStore(str(tmp_path / "store.db"), int(row_size * 3.5), 3600, on_remove=removed.append)
+    for video_id in ("aaaaaaaaaaa", "bbbbbbbbbbb", "ccccccccccc"):
+        store.put(video_id, ("en",), False, make_result(video_id))
+        time.sleep(0.01)
+    assert store.get("aaaaaaaaaaa", ("en",)) is not None
+    store.put("ddddddddddd", ("en",), False, make_result("ddddddddddd"))
+    assert removed == [("bbbbbbbbbbb", ("en",), False)]
+    assert store.get("bbbbbbbbbbb", ("en",)) is None
+    assert store.get("aaaaaaaaaaa", ("en",)) is not None
+    stats = store.stats()
+    assert stats["bytes"] <= stats["max_bytes"] * 0.9
+    assert stats["compactions"] == 1
+    store.close()
+
+
+def test_store_compaction_drops_expired_rows(tmp_path):
+    removed = []
+    store = TranscriptStore(str(tmp_path / "store.db"), 10 ** 6, 0.05, on_remove=removed.append)
+    store.put("aaaaaaaaaaa", ("en",), True, make_result("aaaaaaaaaaa"))
+    time.sleep(0.1)
+    store.compact()
+    assert removed == [("aaaaaaaaaaa", ("en",), True)]
+    assert store.stats()["entries"] == 0 and store.stats()["bytes"] == 0
+    store.close()
+
+
+def test_store_survives_reopening(tmp_path):
+    path = str(tmp_path / "store.db")
+    store = TranscriptStore(path, 10 ** 6, 3600)
+    store.put("abcdefghijk", ("en",), False, make_result("abcdefghijk"))
+    store.close()
+    reopened = TranscriptStore(path, 10 ** 6, 3600)
+    assert reopened.get("abcdefghijk", ("en",)) == make_result("abcdefghijk")
+    reopened.close()
+
+
+def test_oversized_result_is_not_stored(tmp_path):
+    store = TranscriptStore(str(tmp_path / "store.db"), 100, 3600)
+    store.put("abcdefghijk", ("en",), False, make_result("abcdefghijk"))
+    assert store.stats()["entries"] == 0
+    store.close()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for transcript windows and chunks: segment slicing and chunking
+(transcript_core.payload_encoding), the parameters that select them
+(transcript_core.validation), and the windowed ``/get_transcript`` responses.
+"""
+
+import pytest
+
+from transcript_core.errors import ApiError
+from transcript_core.payload_encoding import build_segments, chunk_result, segment_span, shape_result, slice_result
+from transcript_core.validation import MAX_CHUNK_CHARS, MIN_CHUNK_CHARS, parse_window
+
+VIDEO_ID = "abcdefghijk"
+
+
+def get_transcript(client, **params):
+    return client.get("/get_transcript", params={"videoId": VIDEO_ID, **params})
+
+
+def make_result(count: int = 10, seconds: float = 2.0) -> dict:
+    """A result with ``count`` back-to-back captions of ``seconds`` each."""
+    texts = [f"caption {i}" for i in range(count)]
+    return {
+        "transcript": " ".join(texts),
+        "language": "en",
+        "title": "Test video",
+        "channel": "Test channel",
+        "durationSeconds": int(count * seconds),
+        "videoId": "abcdefghijk",
+        "segments": build_segments(texts, [i * seconds for i in range(count)], [seconds] * count),
+    }
+
+
+def caption_texts(result: dict) -> list:
+    """Split a result's transcript back into its captions using the segment offsets."""
+    transcript = result["transcript"]
+    offsets = result["segments"]["offset"]
+    ends = [offset - 1 for offset in offsets[1:]] + [len(transcript)]
+    return [transcript[start:end] for start, end in zip(offsets, ends)]
+
+
+def test_segment_span_bisects_window():
+    segments = make_result()["segments"]
+    assert segment_span(segments, None, None) == (0, 10)
+    # 3s falls inside caption 1 (2-4s); 7s is inside caption 3 (6-8s)
+    assert segment_span(segments, 3000, 7000) == (1, 4)
+    # A caption ending exactly at start is left out, one starting exactly at end too
+    assert segment_span(segments, 4000, 8000) == (2, 4)
+    assert segment_span(segments, 50000, None) == (10, 10)
+
+
+def test_slice_result_keeps_window_and_rebases_offsets():
+    result = make_result()
+    sliced = slice_result(result, 4000, 8000)
+    assert sliced["transcript"] == "caption 2 caption 3"
+    assert sliced["segments"]["start_ms"] == [4000, 6000]
+    assert sliced["segments"]["offset"] == [0, 10]
+    assert caption_texts(sliced) == ["caption 2", "caption 3"]
+    assert sliced["title"] == result["title"]
+    # The cached result is not modified, and no range returns it as is
+    assert result == make_result()
+    assert slice_result(result) is result
+
+
+def test_chunk_result_respects_budget_and_covers_transcript():
+    result = make_result(count=50)
+    chunks = chunk_result(result, 40, with_segments=True)
+    assert [chunk["index"] for chunk in chunks] == list(range(len(chunks)))
+    assert all(len(chunk["text"]) <= 40 for chunk in chunks)
+    assert " ".join(chunk["text"] for chunk in chunks) == result["transcript"]
+    assert chunks[0]["start_ms"] == 0 and chunks[-1]["end_ms"] == 100000
+    # Each chunk's own segments locate its captions within the chunk text
+    captions = [
+        caption for chunk in chunks
+        for caption in caption_texts({"transcript": chunk["text"], "segments": chunk["segments"]})
+    ]
+    assert captions == caption_texts(result)
+
+
+def test_chunk_result_keeps_long_caption_whole():
+    texts = ["x" * 30, "short"]
+    result = {"transcript": " ".join(texts), "segments": build_segments(texts, [0, 1], [1, 1])}
+    assert [chunk["text"] for chunk in chunk_result(result, 10)] == texts
+
+
+def test_shape_result_chunks_drop_transcript():
+    shaped = shape_result(make_result(), "text", chunk_chars=25)
+    assert "transcript" not in shaped and "segments" not in shaped
+    assert shaped["title"] == "Test video"
+    assert "segments" not in shaped["chunks"][0]
+    assert "segments" not in shape_result(make_result(), "text")
+    assert "segments" in shape_result(make_result(), "segments")
+
+
+def test_parse_window_converts_seconds_and_tokens():
+    assert parse_window() == {"start_ms": None, "end_ms": None, "chunk_chars": None}
+    assert parse_window(start=1.5, end=60, chunk_tokens=500) == {"start_ms": 1500, "end_ms": 60000, "chunk_chars": 2000}
+    assert parse_window(chunk_chars=MIN_CHUNK_CHARS)["chunk_chars"] == MIN_CHUNK_CHARS
+
+
+@pytest.mark.parametrize("window", [
+    {"start": -1},
+    {"end": 0},
+    {"start": 5, "end": 5},
+    {"start": float("nan")},
+    {"end": float("inf")},
+    {"start": 1e308},
+])
+def test_parse_window_rejects_bad_ranges(window):
+    with pytest.raises(ApiError) as error:
+        parse_window(**window)
+    assert error.value.status_code == 400
+    assert error.value.detail["error"] == "INVALID_RANGE"
+
+
+@pytest.mark.parametrize("window", [
+    {"chunk_chars": MIN_CHUNK_CHARS - 1},
+    {"chunk_chars": MAX_CHUNK_CHARS + 1},
+    {"chunk_tokens": 10 ** 12},
+    {"chunk_chars": 500, "chunk_tokens": 100},
+])
+def test_parse_window_rejects_bad_chunks(window):
+    with pytest.raises(ApiError) as error:
+        parse_window(**window)
+    assert error.value.detail["error"] == "INVALID_CHUNK"
+
+
+@pytest.mark.parametrize("params", [{"start": "nan"}, {"end": "inf"}, {"start": "10", "end": "5"}])
+def test_bad_window_is_rejected(client, cache_transcript, params):
+    cache_transcript()
+    response = get_transcript(client, **params)
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "INVALID_RANGE"
+
+
+def test_window_and_chunks(client, cache_transcript):
+    cache_transcript()
+    body = get_transcript(client, start="4", end="8").json()
+    assert body["transcript"] == "caption 2 caption 3"
+    body = get_transcript(client, chunkChars="100").json()
+    assert "transcript" not in body
+    assert " ".join(chunk["text"] for chunk in body["chunks"]).startswith("caption 0 caption 1")
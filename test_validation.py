@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for request input checks shared by both adapters (transcript_core.validation).
+"""
+
+import pytest
+
+from transcript_core.errors import ApiError
+from transcript_core.validation import (
+    DEFAULT_LANGUAGES,
+    parse_body_fields,
+    parse_languages,
+    validate_format,
+    validate_video_id,
+)
+
+
+def test_validate_video_id():
+    assert validate_video_id("dQw4w9WgXcQ")
+    assert validate_video_id("a-b_c-d_e-f")
+    for bad in ("", "short", "dQw4w9WgXcQx", "dQw4w9WgXc!", None, 12345678901):
+        assert not validate_video_id(bad)
+
+
+def test_parse_languages():
+    assert parse_languages(None) == DEFAULT_LANGUAGES
+    assert parse_languages([" ", ""]) == DEFAULT_LANGUAGES
+    assert parse_languages(["de", " pt-BR "]) == ("de", "pt-BR")
+    for bad in (["english"], ["en"] * 11, ["e"]):
+        with pytest.raises(ApiError) as error:
+            parse_languages(bad)
+        assert error.value.detail["error"] == "INVALID_LANGUAGE"
+
+
+def test_validate_format():
+    validate_format("text")
+    validate_format("segments")
+    with pytest.raises(ApiError) as error:
+        validate_format("srt")
+    assert error.value.detail["error"] == "INVALID_FORMAT"
+
+
+def test_parse_body_fields():
+    assert parse_body_fields({}) == (None, None, False)
+    body = {"videoId": "dQw4w9WgXcQ", "languages": ["de", "en"], "translate": True, "format": "segments"}
+    assert parse_body_fields(body) == ("dQw4w9WgXcQ", ["de", "en"], True)
+    assert parse_body_fields({"videoId": None, "languages": None, "translate": None}) == (None, None, False)
+
+
+@pytest.mark.parametrize("body", [
+    {"translate": "false"},
+    {"translate": 1},
+    {"languages": "de,en"},
+    {"languages": ["de", 5]},
+    {"languages": {"de": True}},
+    {"videoId": 12345678901},
+    ["dQw4w9WgXcQ"],
+    "dQw4w9WgXcQ",
+])
+def test_parse_body_fields_rejects_wrong_types(body):
+    with pytest.raises(ApiError) as error:
+        parse_body_fields(body)
+    assert error.value.status_code == 400
+    assert error.value.detail["error"] == "INVALID_REQUEST"
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for capturing video metadata from the player responses of transcript
+fetches (transcript_core.video_metadata), the metadata cache and /video_metadata.
+"""
+
+import json
+import threading
+
+import pytest
+import requests
+
+from transcript_core.engine import EngineSettings, TranscriptEngine
+from transcript_core.video_metadata import (
+    capture_player_metadata,
+    metadata_size,
+    parse_player_metadata,
+    take_captured_metadata,
+    video_fields,
+)
+
+VIDEO_ID = "abcdefghijk"
+PLAYER_RESPONSE = {
+    "videoDetails": {
+        "videoId": VIDEO_ID,
+        "title": "Test video",
+        "author": "Test channel",
+        "channelId": "UC123",
+        "lengthSeconds": "212",
+    }
+}
+METADATA = {
+    "videoId": VIDEO_ID, "title": "Test video", "channel": "Test channel", "channelId": "UC123", "durationSeconds": 212
+}
+
+
+def player_response(body, url: str = "https://www.youtube.com/youtubei/v1/player?prettyPrint=false", status: int = 200):
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response._content = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+    return response
+
+
+@pytest.fixture(autouse=True)
+def clear_captured():
+    take_captured_metadata("")
+    yield
+    take_captured_metadata("")
+
+
+def test_parse_player_metadata():
+    assert parse_player_metadata(PLAYER_RESPONSE) == METADATA
+    assert parse_player_metadata({}) is None
+    assert parse_player_metadata({"videoDetails": {"title": "No ID"}}) is None
+    live = {"videoDetails": {"videoId": VIDEO_ID, "lengthSeconds": "live"}}
+    assert parse_player_metadata(live) == {
+        "videoId": VIDEO_ID, "title": None, "channel": None, "channelId": None, "durationSeconds": None
+    }
+
+
+def test_capture_and_take():
+    capture_player_metadata(player_response(PLAYER_RESPONSE))
+    # Taking clears it, and metadata for another video is never returned
+    assert take_captured_metadata("zyxwvutsrqp") is None
+    assert take_captured_metadata(VIDEO_ID) is None
+    capture_player_metadata(player_response(PLAYER_RESPONSE))
+    assert take_captured_metadata(VIDEO_ID) == METADATA
+    assert take_captured_metadata(VIDEO_ID) is None
+
+
+@pytest.mark.parametrize("response", [
+    player_response(PLAYER_RESPONSE, url="https://www.youtube.com/watch?v=abcdefghijk"),
+    player_response(PLAYER_RESPONSE, status=403),
+    player_response(b"<html>not json</html>"),
+    player_response({"playabilityStatus": {"status": "ERROR"}}),
+])
+def test_capture_ignores_other_responses(response):
+    capture_player_metadata(response)
+    assert take_captured_metadata(VIDEO_ID) is None
+
+
+def test_capture_is_per_thread():
+    thread = threading.Thread(target=capture_player_metadata, args=(player_response(PLAYER_RESPONSE),))
+    thread.start()
+    thread.join()
+    assert take_captured_metadata(VIDEO_ID) is None
+
+
+def test_video_fields_fall_back_to_placeholders():
+    assert video_fields(VIDEO_ID, None) == {
+        "title": f"Video {VIDEO_ID}", "channel": "Unknown Channel", "channelId": None, "durationSeconds": None
+    }
+    assert video_fields(VIDEO_ID, METADATA)["channel"] == "Test channel"
+
+
+def test_engine_caches_captured_metadata():
+    engine = TranscriptEngine(EngineSettings(proxy_monitor_interval_seconds=0), [])
+    assert engine.cached_metadata(VIDEO_ID) is None
+    capture_player_metadata(player_response(PLAYER_RESPONSE))
+    assert engine.capture_video_metadata(VIDEO_ID) == METADATA
+    assert engine.cached_metadata(VIDEO_ID) == {"videoId": VIDEO_ID, **video_fields(VIDEO_ID, METADATA)}
+    assert engine.metadata_cache.stats()["bytes"] == metadata_size(METADATA)
+    with pytest.raises(ValueError):
+        engine.cached_metadata("bad id!")
+
+
+def test_video_metadata_endpoint(service, client):
+    video_id = "mdmdmdmdmdm"
+    service.engine.metadata_cache.set(video_id, {**METADATA, "videoId": video_id}, metadata_size(METADATA))
+    response = client.get("/video_metadata", params={"videoId": video_id})
+    assert response.status_code == 200
+    assert response.json() == {"videoId": video_id, **video_fields(video_id, METADATA)}
+
+    assert client.get("/video_metadata").json()["detail"]["error"] == "MISSING_VIDEO_ID"
+    # Not cached, and the test app has no proxy to fetch it through
+    assert client.get("/video_metadata", params={"videoId": "zyxwvutsrqp"}).json()["detail"]["error"] == "CONFIGURATION_ERROR"
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded transcript worker pool (app.TranscriptWorkerPool) and the
+request deadline it hands to the fetch on the worker thread.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+from transcript_core.circuit_breaker import CircuitBreaker
+from transcript_core.engine import TranscriptClientPool, fetch_deadline, time_left
+from transcript_core.errors import DeadlineExceeded, WorkerPoolSaturated
+from transcript_core.proxy_pool import ProxyPool, parse_proxy_endpoints
+from transcript_core.rate_limiter import AdaptiveRateLimiter
+
+
+def test_pool_rejects_beyond_workers_and_queue(service):
+    pool = service.TranscriptWorkerPool(1, 1, 5)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert pool.pending == 2
+        with pytest.raises(WorkerPoolSaturated):
+            await pool.run(lambda: None)
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+
+    asyncio.run(scenario())
+    assert pool.pending == 0
+    pool.shutdown()
+
+
+def test_timed_out_call_holds_its_slot_until_the_worker_is_free(service):
+    pool = service.TranscriptWorkerPool(1, 0, 5)
+    release = threading.Event()
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(release.wait, timeout=0.05)
+        assert pool.pending == 1
+        release.set()
+        await asyncio.sleep(0.05)
+        assert pool.pending == 0
+
+    asyncio.run(scenario())
+    pool.shutdown()
+
+
+def test_worker_sees_the_request_deadline(service):
+    pool = service.TranscriptWorkerPool(1, 0, 5)
+    left = asyncio.run(pool.run(time_left, timeout=2))
+    assert 1 < left <= 2
+    # The deadline belongs to the call, not to the caller's context
+    assert fetch_deadline.get() is None
+    pool.shutdown()
+
+
+def failing_client_pool(retries: int) -> TranscriptClientPool:
+    proxy_pool = ProxyPool(parse_proxy_endpoints("http://proxy.invalid:3128"), 100, 60)
+    breakers = {name: CircuitBreaker(name, 100, 30) for name in ("proxy", "youtube", "network")}
+    return TranscriptClientPool(1, proxy_pool, breakers, AdaptiveRateLimiter(0, 0, 1), retries, 0.2, 8, 1)
+
+
+def test_retries_stop_at_the_deadline(monkeypatch):
+    monkeypatch.setattr("transcript_core.engine.backoff_delay", lambda attempt, base, cap: 0.2)
+    client_pool = failing_client_pool(retries=5)
+    attempts = []
+
+    def operation(ytt_api):
+        attempts.append(time.monotonic())
+        raise requests.exceptions.ConnectionError("proxy down")
+
+    token = fetch_deadline.set(time.monotonic() + 0.3)
+    try:
+        started = time.monotonic()
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client_pool.run(operation)
+    finally:
+        fetch_deadline.reset(token)
+    # Attempts at 0s and 0.2s; a third could not start before the deadline at 0.3s
+    assert len(attempts) == 2
+    assert time.monotonic() - started < 0.3
+    # Giving up is the call's final outcome, so it counts against the breaker
+    assert client_pool.breakers["network"].stats()["consecutive_failures"] == 1
+
+
+def test_no_attempt_after_the_deadline():
+    client_pool = failing_client_pool(retries=5)
+    token = fetch_deadline.set(time.monotonic() - 1)
+    try:
+        with pytest.raises(DeadlineExceeded):
+            client_pool.run(lambda ytt_api: pytest.fail("fetched after the deadline"))
+    finally:
+        fetch_deadline.reset(token)
+
+
+def test_retries_without_a_deadline(monkeypatch):
+    monkeypatch.setattr("transcript_core.engine.backoff_delay", lambda attempt, base, cap: 0)
+    client_pool = failing_client_pool(retries=3)
+    attempts = []
+
+    def operation(ytt_api):
+        attempts.append(1)
+        raise requests.exceptions.ConnectionError("proxy down")
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client_pool.run(operation)
+    assert len(attempts) == 4
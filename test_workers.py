@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for multi-worker serving: per-worker engine settings
+(EngineSettings.for_workers), the shared store and the job scheduler lock.
+"""
+
+import os
+
+from transcript_core.engine import EngineSettings
+from transcript_core.job_queue import SchedulerLock
+from transcript_core.transcript_store import TranscriptStore
+
+
+def test_single_worker_keeps_settings():
+    settings = EngineSettings()
+    assert settings.for_workers(1, "/shared") is settings
+    assert settings.for_workers(0, "/shared") is settings
+
+
+def test_workers_split_limits_and_memory():
+    settings = EngineSettings(
+        upstream_rate_per_second=8, upstream_min_rate_per_second=0.4, upstream_burst=6,
+        cache_max_bytes=400, metadata_cache_max_bytes=40, search_index_max_bytes=4000,
+    )
+    worker = settings.for_workers(4, "/shared")
+    assert worker.upstream_rate_per_second == 2
+    assert worker.upstream_min_rate_per_second == 0.1
+    assert worker.upstream_burst == 1.5
+    assert (worker.cache_max_bytes, worker.metadata_cache_max_bytes) == (100, 10)
+    assert worker.search_index_max_bytes == 1000
+    assert worker.transcript_store_path == os.path.join("/shared", "transcripts.db")
+    # Everything else is the same in every worker
+    assert worker.upstream_retries == settings.upstream_retries
+    assert worker.cache_ttl_seconds == settings.cache_ttl_seconds
+
+
+def test_workers_keep_a_burst_of_one_and_a_configured_store():
+    settings = EngineSettings(upstream_burst=2, transcript_store_path="/data/store.db")
+    worker = settings.for_workers(8, "/shared")
+    assert worker.upstream_burst == 1
+    assert worker.transcript_store_path == "/data/store.db"
+
+
+def test_workers_share_the_store(tmp_path):
+    path = str(tmp_path / "transcripts.db")
+    first, second = TranscriptStore(path, 10 ** 6, 3600), TranscriptStore(path, 10 ** 6, 3600)
+    result = {"transcript": "fetched once", "language": "en", "videoId": "abcdefghijk"}
+    first.put("abcdefghijk", ("en",), False, result)
+    assert second.get("abcdefghijk", ("en",), False) == result
+
+
+def test_one_worker_runs_the_job_scheduler(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    leader, follower = SchedulerLock(path), SchedulerLock(path)
+    assert leader.acquire()
+    assert not follower.acquire()
+    leader.release()
+    assert follower.acquire()
+    follower.release()
+    # An in-memory job database belongs to one process
+    assert SchedulerLock(":memory:").acquire() and SchedulerLock(":memory:").acquire()
@@ -0,0 +1,77 @@
+"""
+Shared transcript core for the FastAPI app (app.py) and the Firebase function
+(functions/main.py).
+
+Holds the fetch engine, caches, persistent store, proxy pool, limiter, circuit
+breakers, payload encoding and error model, so both deployments serve the same
+behaviour. The web adapters only handle routing, authentication and turning
+``ApiError`` into framework responses. Firebase deploys copy this package into
+``functions/`` (see the ``predeploy`` step in firebase.json).
+"""
+from .engine import (
+    EngineSettings, TranscriptEngine, configured_proxy_endpoints, fetch_deadline, record_stage, timed_stage
+)
+from .errors import ApiError, CachedTranscriptMiss, DeadlineExceeded, ProxyNotConfigured, WorkerPoolSaturated, api_error
+from .metrics import REGISTRY
+from .payload_encoding import (
+    TRANSCRIPT_FORMATS,
+    EncodingUnavailable,
+    cache_control,
+    chunk_result,
+    encode_payload,
+    etag_matches,
+    shape_result,
+    slice_result,
+    transcript_etag,
+)
+from .proxy_pool import ProxyEndpoint
+from .request_log import annotate, configure_logging, current_trace, elapsed_ms, start_trace
+from .startup import STARTUP
+from .validation import (
+    DEFAULT_LANGUAGES,
+    parse_body_fields,
+    parse_languages,
+    parse_window,
+    validate_encoding,
+    validate_format,
+    validate_video_id,
+)
+
+__all__ = [
+    "ApiError",
+    "CachedTranscriptMiss",
+    "DEFAULT_LANGUAGES",
+    "DeadlineExceeded",
+    "EncodingUnavailable",
+    "EngineSettings",
+    "ProxyEndpoint",
+    "ProxyNotConfigured",
+    "REGISTRY",
+    "STARTUP",
+    "TRANSCRIPT_FORMATS",
+    "TranscriptEngine",
+    "WorkerPoolSaturated",
+    "annotate",
+    "api_error",
+    "cache_control",
+    "chunk_result",
+    "configure_logging",
+    "configured_proxy_endpoints",
+    "current_trace",
+    "elapsed_ms",
+    "encode_payload",
+    "etag_matches",
+    "fetch_deadline",
+    "parse_body_fields",
+    "parse_languages",
+    "parse_window",
+    "record_stage",
+    "shape_result",
+    "slice_result",
+    "start_trace",
+    "timed_stage",
+    "transcript_etag",
+    "validate_encoding",
+    "validate_format",
+    "validate_video_id",
+]
@@ -0,0 +1,124 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling upstream while a breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one upstream dependency.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    ``allow`` refuses calls for ``reset_timeout`` seconds. The first call after
+    that is let through as a half-open probe: success closes the breaker, failure
+    re-opens it for another ``reset_timeout``. A probe that never reports back
+    (e.g. it was answered from the transcript store) is replaced by a new one once
+    ``reset_timeout`` passes.
+
+    All methods are thread-safe.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._stats = {"opened": 0, "rejected": 0, "probes": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker will admit a probe (0 if it admits calls now)."""
+        with self._lock:
+            if self._state == CLOSED:
+                return 0.0
+            started = self._probe_started if self._state == HALF_OPEN else self._opened_at
+            return max(0.0, (started or 0.0) + self.reset_timeout - time.monotonic())
+
+    def is_open(self) -> bool:
+        """True while calls would be refused; does not start a half-open probe."""
+        return self.retry_after() > 0
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed, starting a half-open probe when due."""
+        if not self.enabled:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and now < self._opened_at + self.reset_timeout:
+                self._stats["rejected"] += 1
+                return False
+            if self._state == HALF_OPEN and self._probe_started is not None and now < self._probe_started + self.reset_timeout:
+                self._stats["rejected"] += 1
+                return False
+            self._state = HALF_OPEN
+            self._probe_started = now
+            self._stats["probes"] += 1
+        logger.info(f"🔌 Circuit '{self.name}' half-open, probing upstream")
+        return True
+
+    def check(self) -> None:
+        """Like ``allow`` but raises CircuitOpen when the call is refused."""
+        if not self.allow():
+            raise CircuitOpen(self.name, self.retry_after())
+
+    def record_success(self) -> None:
+        with self._lock:
+            previous = self._state
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_started = None
+        if previous != CLOSED:
+            logger.info(f"🔌 Circuit '{self.name}' closed")
+
+    def record_failure(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                opening = self._state != OPEN
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probe_started = None
+                if opening:
+                    self._stats["opened"] += 1
+            else:
+                opening = False
+        if opening:
+            logger.warning(f"⚠️ Circuit '{self.name}' opened after {self._failures} consecutive failures")
+
+    def stats(self) -> Dict[str, Any]:
+        retry_after = self.retry_after()
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_seconds": self.reset_timeout,
+                "retry_after_seconds": round(retry_after, 1),
+                **self._stats,
+            }
@@ -0,0 +1,1114 @@
+import contextvars
+import logging
+import math
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api.proxies import GenericProxyConfig, WebshareProxyConfig
+from youtube_transcript_api._transcripts import Transcript, TranscriptList
+from youtube_transcript_api._errors import (
+    AgeRestricted,
+    InvalidVideoId,
+    NotTranslatable,
+    TranscriptsDisabled,
+    TranslationLanguageNotAvailable,
+    NoTranscriptFound,
+    VideoUnavailable,
+    VideoUnplayable,
+    RequestBlocked
+)
+
+from .circuit_breaker import CircuitBreaker, CircuitOpen
+from .errors import ApiError, CachedTranscriptMiss, DeadlineExceeded, ProxyNotConfigured, api_error
+from .metrics import REGISTRY, stat_samples
+from .payload_encoding import build_segments, content_digest
+from .peers import PeerRouter, PeerUnavailable
+from .proxy_pool import ProxyEndpoint, ProxyHealthMonitor, ProxyPool, parse_proxy_endpoints
+from .rate_limiter import AdaptiveRateLimiter, UpstreamThrottled, backoff_delay
+from .request_log import current_trace
+from .search_index import SearchIndex
+from .startup import STARTUP
+from .transcript_cache import TranscriptCache
+from .transcript_store import TranscriptStore
+from .validation import DEFAULT_LANGUAGES, validate_video_id
+from .video_metadata import capture_player_metadata, metadata_size, take_captured_metadata, video_fields
+
+logger = logging.getLogger(__name__)
+
+# Per-request timeout for warmup connections
+WARMUP_TIMEOUT_SECONDS = 10
+
+# Stored transcripts read per page while building the search index at startup
+SEARCH_INDEX_BUILD_PAGE = 200
+
+# YouTube's answers about the video itself. They prove the proxy and YouTube are
+# working, so they count as upstream successes; any other error from a fetch
+# (YouTubeRequestFailed, PoTokenRequired, unparsable pages) counts against the
+# youtube circuit breaker
+VIDEO_VERDICTS = (
+    TranscriptsDisabled, NoTranscriptFound, VideoUnavailable, VideoUnplayable, AgeRestricted, InvalidVideoId,
+    NotTranslatable, TranslationLanguageNotAvailable,
+)
+
+
+@dataclass(frozen=True)
+class EngineSettings:
+    """Fetch engine configuration; ``from_env`` reads the variables documented in the README."""
+    # Proxy endpoints: PROXY_ENDPOINTS, or the single Webshare plan
+    proxy_endpoints: Optional[str] = None
+    webshare_username: Optional[str] = None
+    webshare_password: Optional[str] = None
+    proxy_bench_after_failures: int = 3
+    proxy_bench_seconds: float = 60
+    # Background proxy health monitor (interval of 0 disables the monitor)
+    proxy_monitor_interval_seconds: float = 300
+    proxy_monitor_url: str = "https://httpbin.org/ip"
+    # Idle keep-alive clients kept per proxy endpoint
+    client_pool_size: int = 8
+    # Adaptive upstream rate limit and retry backoff (rate of 0 disables the limiter)
+    upstream_rate_per_second: float = 5
+    upstream_min_rate_per_second: float = 0.2
+    upstream_burst: float = 5
+    upstream_retries: int = 5
+    upstream_retry_base_seconds: float = 0.5
+    upstream_retry_max_seconds: float = 8
+    # Connect and read timeouts for every upstream request; youtube-transcript-api
+    # sets none, so without them a stalled proxy would hold a worker indefinitely
+    upstream_connect_timeout_seconds: float = 10
+    upstream_read_timeout_seconds: float = 20
+    # Longest a fetch waits for a rate limiter token, capped by the time left
+    # before the request deadline, so a throttled fetch fails while its caller
+    # is still waiting instead of fetching for nobody after the deadline
+    upstream_acquire_timeout_seconds: float = 10
+    # Circuit breakers per upstream (threshold of 0 disables them)
+    circuit_failure_threshold: int = 5
+    circuit_reset_seconds: float = 30
+    # Transcript result cache (max bytes of 0 disables the cache)
+    cache_max_bytes: int = 128 * 1024 * 1024
+    cache_ttl_seconds: float = 86400
+    cache_negative_ttl_seconds: float = 600
+    # Video metadata cache (title, channel; max bytes of 0 disables it).
+    # Metadata rarely changes, so it outlives transcript cache entries
+    metadata_cache_max_bytes: int = 16 * 1024 * 1024
+    metadata_cache_ttl_seconds: float = 7 * 86400
+    # Persistent transcript store (unset path disables the store)
+    transcript_store_path: Optional[str] = None
+    transcript_store_max_bytes: int = 1024 * 1024 * 1024
+    transcript_store_ttl_seconds: float = 30 * 86400
+    # Startup warmup: keep-alive proxy connections opened per endpoint and stored
+    # transcripts preloaded into the in-memory cache (0 skips either step)
+    warmup_connections: int = 0
+    warmup_cache_entries: int = 0
+    warmup_url: str = "https://www.youtube.com/generate_204"
+    # In-memory search index over cached and stored transcripts (max bytes of 0 disables it)
+    search_index_max_bytes: int = 0
+
+    @property
+    def warmup_enabled(self) -> bool:
+        return self.warmup_connections > 0 or self.warmup_cache_entries > 0
+
+    def for_workers(self, workers: int, shared_dir: str) -> "EngineSettings":
+        """
+        Settings for one of ``workers`` server processes sharing a machine.
+
+        The upstream rate limit and the in-memory cache and search index budgets
+        are split between the processes, so together they stay within the
+        configured totals. Unless TRANSCRIPT_STORE_PATH is set, they share a
+        store in ``shared_dir`` as the cross-process cache tier, so a transcript
+        fetched by one worker is served to the others without another upstream
+        fetch. Each process indexes the store only at its own startup, so its
+        search index misses rows the others write later.
+        """
+        if workers <= 1:
+            return self
+        return replace(
+            self,
+            upstream_rate_per_second=self.upstream_rate_per_second / workers,
+            upstream_min_rate_per_second=self.upstream_min_rate_per_second / workers,
+            upstream_burst=max(1.0, self.upstream_burst / workers),
+            cache_max_bytes=self.cache_max_bytes // workers,
+            metadata_cache_max_bytes=self.metadata_cache_max_bytes // workers,
+            search_index_max_bytes=self.search_index_max_bytes // workers,
+            transcript_store_path=self.transcript_store_path or os.path.join(shared_dir, "transcripts.db"),
+        )
+
+    @classmethod
+    def from_env(cls) -> "EngineSettings":
+        workers = os.getenv("TRANSCRIPT_WORKERS", "8")
+        return cls(
+            proxy_endpoints=os.getenv("PROXY_ENDPOINTS"),
+            webshare_username=os.getenv("WEBSHARE_USERNAME"),
+            webshare_password=os.getenv("WEBSHARE_PASSWORD"),
+            proxy_bench_after_failures=int(os.getenv("PROXY_BENCH_AFTER_FAILURES", "3")),
+            proxy_bench_seconds=float(os.getenv("PROXY_BENCH_SECONDS", "60")),
+            proxy_monitor_interval_seconds=float(os.getenv("PROXY_MONITOR_INTERVAL_SECONDS", "300")),
+            proxy_monitor_url=os.getenv("PROXY_MONITOR_URL", "https://httpbin.org/ip"),
+            client_pool_size=int(os.getenv("CLIENT_POOL_SIZE", workers)),
+            upstream_rate_per_second=float(os.getenv("UPSTREAM_RATE_PER_SECOND", "5")),
+            upstream_min_rate_per_second=float(os.getenv("UPSTREAM_MIN_RATE_PER_SECOND", "0.2")),
+            upstream_burst=float(os.getenv("UPSTREAM_BURST", "5")),
+            upstream_retries=int(os.getenv("UPSTREAM_RETRIES", "5")),
+            upstream_retry_base_seconds=float(os.getenv("UPSTREAM_RETRY_BASE_SECONDS", "0.5")),
+            upstream_retry_max_seconds=float(os.getenv("UPSTREAM_RETRY_MAX_SECONDS", "8")),
+            upstream_connect_timeout_seconds=float(os.getenv("UPSTREAM_CONNECT_TIMEOUT_SECONDS", "10")),
+            upstream_read_timeout_seconds=float(os.getenv("UPSTREAM_READ_TIMEOUT_SECONDS", "20")),
+            upstream_acquire_timeout_seconds=float(os.getenv("UPSTREAM_ACQUIRE_TIMEOUT_SECONDS", "10")),
+            circuit_failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+            circuit_reset_seconds=float(os.getenv("CIRCUIT_RESET_SECONDS", "30")),
+            cache_max_bytes=int(os.getenv("CACHE_MAX_BYTES", str(128 * 1024 * 1024))),
+            cache_ttl_seconds=float(os.getenv("CACHE_TTL_SECONDS", "86400")),
+            cache_negative_ttl_seconds=float(os.getenv("CACHE_NEGATIVE_TTL_SECONDS", "600")),
+            metadata_cache_max_bytes=int(os.getenv("METADATA_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+            metadata_cache_ttl_seconds=float(os.getenv("METADATA_CACHE_TTL_SECONDS", str(7 * 86400))),
+            transcript_store_path=os.getenv("TRANSCRIPT_STORE_PATH"),
+            transcript_store_max_bytes=int(os.getenv("TRANSCRIPT_STORE_MAX_BYTES", str(1024 * 1024 * 1024))),
+            transcript_store_ttl_seconds=float(os.getenv("TRANSCRIPT_STORE_TTL_SECONDS", str(30 * 86400))),
+            warmup_connections=int(os.getenv("WARMUP_CONNECTIONS", "0")),
+            warmup_cache_entries=int(os.getenv("WARMUP_CACHE_ENTRIES", "0")),
+            warmup_url=os.getenv("WARMUP_URL", "https://www.youtube.com/generate_204"),
+            search_index_max_bytes=int(os.getenv("SEARCH_INDEX_MAX_BYTES", "0")),
+        )
+
+
+stage_latency = REGISTRY.histogram(
+    "transcript_stage_seconds",
+    "Latency of each transcript fetch stage (queue, peer, store_read, rate_limit, checkout, list, fetch, backoff, process, store_write)",
+    ("stage",)
+)
+proxy_bytes = REGISTRY.counter(
+    "proxy_response_bytes_total", "Response bytes received from YouTube through each proxy endpoint", ("endpoint",)
+)
+
+
+# Monotonic time after which the caller no longer waits for the current fetch.
+# The app's worker pool sets it for each call and it follows the fetch into the
+# worker thread with the copied context; callers without a deadline leave it unset
+fetch_deadline: "contextvars.ContextVar[Optional[float]]" = contextvars.ContextVar("fetch_deadline", default=None)
+
+
+def time_left() -> Optional[float]:
+    """Seconds until ``fetch_deadline`` (0 or less once it has passed), or None without one."""
+    deadline = fetch_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Record a fetch stage duration in the stage_latency histogram and the request's log summary."""
+    stage_latency.observe(seconds, stage=stage)
+    trace = current_trace()
+    if trace is not None:
+        trace.add_stage(stage, seconds)
+
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+class KeepAliveWebshareProxyConfig(WebshareProxyConfig):
+    """
+    WebshareProxyConfig that keeps proxy connections open between requests.
+
+    The stock config sends ``Connection: close`` so every request rotates the exit
+    IP, and retries blocked requests on the same session. Pooled clients instead
+    reuse their connection (and the TLS tunnel to YouTube) and rotate by being
+    discarded, so library-level block retries are disabled here and handled by
+    TranscriptClientPool.
+    """
+
+    def __init__(self, proxy_username: str, proxy_password: str):
+        super().__init__(proxy_username=proxy_username, proxy_password=proxy_password, retries_when_blocked=0)
+
+    @property
+    def prevent_keeping_connections_alive(self) -> bool:
+        return False
+
+
+class TimeoutSession(requests.Session):
+    """requests.Session that applies a default ``(connect, read)`` timeout to requests made without one."""
+
+    def __init__(self, timeout: Tuple[float, float]):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().request(method, url, **kwargs)
+
+
+class TranscriptClientPool:
+    """
+    Process-wide pool of YouTubeTranscriptApi clients with keep-alive sessions.
+
+    YouTubeTranscriptApi wraps a requests.Session and is not thread-safe, so each
+    worker checks out its own client for the duration of a fetch and returns it
+    afterwards. Each attempt is routed to an endpoint chosen by ``proxy_pool``, and
+    up to ``size`` idle clients per endpoint are kept warm; extra clients created
+    under load are closed on return. A client whose proxy connection fails, or
+    whose exit IP gets blocked by YouTube, is discarded and counted against its
+    endpoint, and the retry goes to a freshly chosen endpoint (and a new rotating
+    exit IP).
+
+    Every attempt first takes a token from ``rate_limiter``; blocks feed back into
+    it so the outbound rate drops while YouTube is pushing back. Blocked and
+    proxy/network failures are retried with jittered exponential backoff. The
+    final outcome of each call is reported to ``breakers`` (keyed by
+    upstream_failure_kind), and calls are refused while any of them is open.
+    Only VIDEO_VERDICTS and results count as successes; other YouTube errors
+    count against the youtube breaker without scoring the proxy endpoint.
+
+    Every pooled session has a default ``timeout`` of (connect, read) seconds,
+    so a proxy that accepts connections but never answers raises
+    requests.Timeout, which is retried and scored like any other network failure
+    and frees the worker thread. No attempt starts, and no retry is scheduled,
+    once the caller's ``fetch_deadline`` would have passed, so a fetch the client
+    has given up on stops using its worker slot and the upstream budget.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        proxy_pool: ProxyPool,
+        breakers: Dict[str, CircuitBreaker],
+        rate_limiter: AdaptiveRateLimiter,
+        retries: int,
+        retry_base: float,
+        retry_max: float,
+        acquire_timeout: float,
+        timeout: Tuple[float, float] = (10, 20),
+    ):
+        self.size = size
+        self.proxy_pool = proxy_pool
+        self.breakers = breakers
+        self.rate_limiter = rate_limiter
+        self.retries = retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.acquire_timeout = acquire_timeout
+        self.timeout = timeout
+        self._idle: Dict[str, "queue.LifoQueue[Tuple[YouTubeTranscriptApi, requests.Session]]"] = {
+            endpoint.name: queue.LifoQueue() for endpoint in proxy_pool.endpoints
+        }
+        self._lock = threading.Lock()
+        self._stats = {"created": 0, "reused": 0, "discarded": 0, "retries": 0}
+
+    def _checkout(self, endpoint: ProxyEndpoint) -> Tuple[YouTubeTranscriptApi, requests.Session]:
+        try:
+            client = self._idle[endpoint.name].get_nowait()
+            with self._lock:
+                self._stats["reused"] += 1
+            return client
+        except queue.Empty:
+            pass
+
+        session = TimeoutSession(self.timeout)
+        session.hooks["response"].append(lambda response, *args, **kwargs: count_proxy_bytes(endpoint, response))
+        session.hooks["response"].append(capture_player_metadata)
+        if endpoint.is_webshare:
+            proxy_config = KeepAliveWebshareProxyConfig(endpoint.username, endpoint.password)
+        else:
+            proxy_config = GenericProxyConfig(http_url=endpoint.url, https_url=endpoint.url)
+        ytt_api = YouTubeTranscriptApi(proxy_config=proxy_config, http_client=session)
+        with self._lock:
+            self._stats["created"] += 1
+        return ytt_api, session
+
+    def _checkin(self, endpoint: ProxyEndpoint, client: Tuple[YouTubeTranscriptApi, requests.Session]) -> None:
+        idle = self._idle[endpoint.name]
+        if idle.qsize() < self.size:
+            idle.put(client)
+        else:
+            client[1].close()
+
+    def _discard(self, client: Tuple[YouTubeTranscriptApi, requests.Session]) -> None:
+        client[1].close()
+        with self._lock:
+            self._stats["discarded"] += 1
+
+    def run(self, operation: Callable[[YouTubeTranscriptApi], Any]) -> Any:
+        """
+        Call ``operation(ytt_api)`` with a pooled client on the healthiest endpoint.
+
+        RequestBlocked and proxy/network errors retry up to ``retries`` times, each
+        on a rebuilt client after a backoff delay, unless the retry could not start
+        before ``fetch_deadline``. Raises CircuitOpen if an upstream breaker is
+        open, UpstreamThrottled if no rate limiter token becomes available within
+        ``acquire_timeout`` or before the deadline, and DeadlineExceeded if the
+        deadline has already passed when an attempt would start.
+        """
+        # Refuse before starting any half-open probe, so a probe is never
+        # started on one breaker and then abandoned because another is open
+        for breaker in self.breakers.values():
+            if breaker.is_open():
+                raise CircuitOpen(breaker.name, breaker.retry_after())
+        for breaker in self.breakers.values():
+            breaker.check()
+        attempt = 0
+        while True:
+            remaining = time_left()
+            if remaining is not None and remaining <= 0:
+                raise DeadlineExceeded()
+            wait = self.acquire_timeout if remaining is None else min(self.acquire_timeout, remaining)
+            with timed_stage("rate_limit"):
+                admitted = self.rate_limiter.acquire(wait)
+            if not admitted:
+                raise UpstreamThrottled()
+            endpoint = self.proxy_pool.choose()
+            with timed_stage("checkout"):
+                client = self._checkout(endpoint)
+            started = time.monotonic()
+            try:
+                result = operation(client[0])
+            except (RequestBlocked, requests.exceptions.RequestException) as e:
+                self._discard(client)
+                self.proxy_pool.record(endpoint, False, (time.monotonic() - started) * 1000)
+                blocked = isinstance(e, RequestBlocked)
+                if blocked:
+                    self.rate_limiter.record_block()
+                delay = backoff_delay(attempt, self.retry_base, self.retry_max)
+                remaining = time_left()
+                if attempt >= self.retries or (remaining is not None and remaining <= delay):
+                    if attempt < self.retries:
+                        logger.warning("⚠️ Not retrying via %s: the request deadline passes first", endpoint.name)
+                    self.breakers[upstream_failure_kind(e)].record_failure()
+                    raise
+                attempt += 1
+                with self._lock:
+                    self._stats["retries"] += 1
+                reason = "Request blocked" if blocked else f"Proxy error ({type(e).__name__})"
+                logger.warning(
+                    "⚠️ %s via %s, retrying on a fresh proxy connection in %.2fs (%d/%d)",
+                    reason, endpoint.name, delay, attempt, self.retries
+                )
+                with timed_stage("backoff"):
+                    time.sleep(delay)
+                continue
+            except VIDEO_VERDICTS:
+                # A verdict on the video (no transcript, unavailable) leaves the
+                # connection healthy, so the client goes back to the pool
+                self._succeeded(endpoint, client, started)
+                raise
+            except Exception:
+                # YouTube failed to answer properly (5xx, PO token demanded,
+                # unparsable page): not the proxy's fault, but not a success either
+                self._discard(client)
+                self.breakers["youtube"].record_failure()
+                raise
+            self._succeeded(endpoint, client, started)
+            return result
+
+    def _succeeded(
+        self, endpoint: ProxyEndpoint, client: Tuple[YouTubeTranscriptApi, requests.Session], started: float
+    ) -> None:
+        self.proxy_pool.record(endpoint, True, (time.monotonic() - started) * 1000)
+        self.rate_limiter.record_success()
+        for breaker in self.breakers.values():
+            breaker.record_success()
+        self._checkin(endpoint, client)
+
+    def warm(self, connections: int, url: str, timeout: float) -> Tuple[int, int]:
+        """
+        Open up to ``connections`` keep-alive clients per endpoint by requesting ``url``.
+
+        A request to the YouTube host leaves a proxied TLS connection to it in each
+        session, which the first fetches then reuse instead of paying the proxy and
+        TLS handshakes. Warmup requests bypass the rate limiter and are not scored
+        against endpoints or circuit breakers. Returns (opened, failed).
+        """
+        endpoints = [endpoint for endpoint in self.proxy_pool.endpoints for _ in range(min(connections, self.size))]
+        if not endpoints:
+            return 0, 0
+
+        def open_connection(endpoint: ProxyEndpoint) -> bool:
+            client = self._checkout(endpoint)
+            try:
+                client[1].get(url, timeout=timeout).close()
+            except requests.exceptions.RequestException as e:
+                logger.warning("⚠️ Warmup request via %s failed: %s", endpoint.name, e)
+                self._discard(client)
+                return False
+            self._checkin(endpoint, client)
+            return True
+
+        with ThreadPoolExecutor(max_workers=len(endpoints), thread_name_prefix="warmup") as executor:
+            opened = sum(executor.map(open_connection, endpoints))
+        return opened, len(endpoints) - opened
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            idle = sum(q.qsize() for q in self._idle.values())
+            return {"size": self.size, "idle": idle, **self._stats}
+
+
+def count_proxy_bytes(endpoint: ProxyEndpoint, response: requests.Response) -> None:
+    """Session response hook: add the body size as read off the wire to proxy_bytes."""
+    try:
+        body = response.content
+        received = response.raw.tell() or len(body)
+    except Exception:
+        return
+    proxy_bytes.inc(received, endpoint=endpoint.name)
+
+
+def upstream_failure_kind(error: Exception) -> str:
+    """Name of the circuit breaker an exhausted upstream failure counts against."""
+    if isinstance(error, RequestBlocked):
+        return "youtube"
+    if isinstance(error, requests.exceptions.ProxyError):
+        return "proxy"
+    return "network"
+
+
+def configured_proxy_endpoints(settings: EngineSettings) -> List[ProxyEndpoint]:
+    """Proxy endpoints from PROXY_ENDPOINTS, falling back to the single Webshare plan."""
+    if settings.proxy_endpoints:
+        return parse_proxy_endpoints(settings.proxy_endpoints)
+    if settings.webshare_username and settings.webshare_password:
+        return [ProxyEndpoint(name="webshare", username=settings.webshare_username, password=settings.webshare_password)]
+    return []
+
+
+def select_transcript(
+    transcript_list: TranscriptList,
+    languages: Tuple[str, ...],
+    translate: bool
+) -> Tuple[Transcript, str]:
+    """
+    Pick the best transcript track from a single listing.
+
+    Preferred languages are tried in priority order, taking a manually created
+    track before an auto-generated one for each language. If none match and
+    ``translate`` is set, a translatable track is machine-translated into the
+    first preferred language YouTube offers. Otherwise any available track is
+    used, manual first.
+
+    Returns:
+        The selected track and the strategy used: "manual", "generated",
+        "translated" or "fallback"
+
+    Raises:
+        NoTranscriptFound: if the video has no caption tracks at all
+    """
+    available = list(transcript_list)  # manually created tracks first
+    for language in languages:
+        for transcript in available:
+            if transcript.language_code == language:
+                return transcript, "generated" if transcript.is_generated else "manual"
+
+    if translate:
+        for language in languages:
+            for transcript in available:
+                if any(t.language_code == language for t in transcript.translation_languages):
+                    return transcript.translate(language), "translated"
+
+    if not available:
+        raise NoTranscriptFound(transcript_list.video_id, languages, transcript_list)
+    return available[0], "fallback"
+
+
+def _result_size(result: Dict[str, Any]) -> int:
+    """Approximate in-memory size of a transcript result for the cache byte cap."""
+    # Three parallel segment lists: an 8-byte pointer plus a boxed int per entry
+    segment_count = len(result.get("segments", {}).get("offset", ()))
+    return sys.getsizeof(result["transcript"]) + 512 + segment_count * 3 * 32
+
+
+def _breaker_state(breaker: CircuitBreaker) -> float:
+    return {"closed": 0, "half_open": 1, "open": 2}[breaker.stats()["state"]]
+
+
+class TranscriptEngine:
+    """
+    The transcript fetch engine shared by the FastAPI app and the Firebase function.
+
+    Owns the in-memory transcript and metadata caches, the optional persistent
+    store, and the upstream path: proxy pool, health monitor, adaptive rate
+    limiter, circuit breakers and pooled keep-alive clients. With a ``peers``
+    router, cache misses for videos owned by another instance are forwarded to
+    it first. Every method is blocking and thread-safe; async adapters call
+    ``cached`` and ``check_upstream`` on the event loop and run
+    ``resolve_uncached`` on a worker thread.
+    """
+
+    def __init__(self, settings: EngineSettings, endpoints: List[ProxyEndpoint], peers: Optional[PeerRouter] = None):
+        self.settings = settings
+        self.peers = peers
+        self.cache = TranscriptCache(
+            settings.cache_max_bytes, settings.cache_ttl_seconds, settings.cache_negative_ttl_seconds,
+            on_remove=self._removed_from_cache
+        )
+        # Video metadata by video ID, filled from the player responses of transcript fetches
+        self.metadata_cache = TranscriptCache(settings.metadata_cache_max_bytes, settings.metadata_cache_ttl_seconds, 0)
+        self.store: Optional[TranscriptStore] = None
+        # Fed with every transcript that enters the cache; see search()
+        self.search_index = SearchIndex(settings.search_index_max_bytes)
+        self.proxy_pool = ProxyPool(endpoints, settings.proxy_bench_after_failures, settings.proxy_bench_seconds)
+        self.proxy_monitor: Optional[ProxyHealthMonitor] = None
+        self.breakers = {
+            name: CircuitBreaker(name, settings.circuit_failure_threshold, settings.circuit_reset_seconds)
+            for name in ("proxy", "youtube", "network")
+        }
+        self.rate_limiter = AdaptiveRateLimiter(
+            settings.upstream_rate_per_second, settings.upstream_min_rate_per_second, settings.upstream_burst
+        )
+        self.client_pool = TranscriptClientPool(
+            settings.client_pool_size,
+            self.proxy_pool,
+            self.breakers,
+            self.rate_limiter,
+            settings.upstream_retries,
+            settings.upstream_retry_base_seconds,
+            settings.upstream_retry_max_seconds,
+            settings.upstream_acquire_timeout_seconds,
+            (settings.upstream_connect_timeout_seconds, settings.upstream_read_timeout_seconds),
+        )
+        self._register_metrics()
+
+    def start(self) -> None:
+        """Open the persistent store and start the proxy monitor, as configured."""
+        settings = self.settings
+        if settings.transcript_store_path:
+            self.store = TranscriptStore(
+                settings.transcript_store_path, settings.transcript_store_max_bytes, settings.transcript_store_ttl_seconds,
+                on_remove=self._removed_from_store
+            )
+        else:
+            logger.info("Transcript store disabled")
+        if self.search_index.enabled:
+            self.search_index.start()
+            if self.store is not None:
+                threading.Thread(target=self.index_store, name="search-index-build", daemon=True).start()
+        if self.proxy_pool.endpoints and settings.proxy_monitor_interval_seconds > 0:
+            self.proxy_monitor = ProxyHealthMonitor(
+                self.proxy_pool, settings.proxy_monitor_interval_seconds, settings.proxy_monitor_url
+            )
+            self.proxy_monitor.start()
+        else:
+            logger.info("Proxy monitor disabled")
+        if self.peers is not None:
+            self.peers.start()
+
+    def warmup(self) -> Dict[str, Any]:
+        """
+        Prepare a freshly started engine for its first requests, as configured.
+
+        Preloads the most recently read stored transcripts into the in-memory
+        cache, then opens keep-alive proxy connections to YouTube. Blocking; call
+        it after ``start()``, typically on a background thread.
+        """
+        settings = self.settings
+        started = time.monotonic()
+        preloaded = 0
+        if self.store is not None and settings.warmup_cache_entries > 0:
+            try:
+                # Oldest first, so the most recently read entries end up most recent in the LRU
+                for video_id, languages, translate, result in reversed(self.store.recent(settings.warmup_cache_entries)):
+                    if "segments" in result:
+                        self.cache_transcript((video_id, languages, translate), result)
+                        preloaded += 1
+            except sqlite3.Error as e:
+                logger.warning("⚠️ Transcript store preload failed: %s", e)
+        opened, failed = self.client_pool.warm(settings.warmup_connections, settings.warmup_url, WARMUP_TIMEOUT_SECONDS)
+        summary = {
+            "preloaded": preloaded,
+            "connections": opened,
+            "connection_failures": failed,
+            "seconds": round(time.monotonic() - started, 3),
+        }
+        logger.info(
+            "🔥 Warmup done in %.2fs: %d stored transcripts preloaded, %d proxy connections opened (%d failed)",
+            summary["seconds"], preloaded, opened, failed
+        )
+        STARTUP.mark("warm")
+        return summary
+
+    def close(self) -> None:
+        if self.proxy_monitor is not None:
+            self.proxy_monitor.stop()
+        if self.peers is not None:
+            self.peers.stop()
+        if self.store is not None:
+            self.store.close()
+
+    def get_video_transcript(
+        self,
+        video_id: str,
+        languages: Tuple[str, ...] = DEFAULT_LANGUAGES,
+        translate: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Retrieve transcript for a YouTube video using the simplified 1.1.1 API.
+
+        The caption track list is fetched once and the track is chosen locally (see
+        select_transcript), so only the chosen track is downloaded. Title and channel
+        come from the player response the listing already fetched.
+        """
+        logger.debug("=== STARTING get_video_transcript for video: %s ===", video_id)
+
+        if not validate_video_id(video_id):
+            logger.error("Invalid video ID format: %s", video_id)
+            raise ValueError("Invalid video ID format")
+
+        try:
+            logger.debug("🔧 STEP 1: Checking out pooled YouTubeTranscriptApi client")
+
+            def fetch(ytt_api: YouTubeTranscriptApi):
+                logger.debug("🔧 STEP 2: Listing available transcripts...")
+                with timed_stage("list"):
+                    try:
+                        transcript_list = ytt_api.list(video_id)
+                    finally:
+                        # Cached even when the video turns out to have no transcripts
+                        metadata = self.capture_video_metadata(video_id)
+                    transcript, strategy = select_transcript(transcript_list, languages, translate)
+                logger.debug(
+                    "✅ Selected %s transcript (%s) for preference %s", transcript.language_code, strategy, languages
+                )
+                with timed_stage("fetch"):
+                    return transcript.fetch(), strategy, metadata
+
+            fetched_transcript, strategy, metadata = self.client_pool.run(fetch)
+
+            logger.debug("✅ Transcript retrieved: %d entries", len(fetched_transcript))
+
+            # Process transcript data
+            logger.debug("🔧 STEP 3: Processing transcript data...")
+            with timed_stage("process"):
+                snippets = fetched_transcript.snippets
+                texts = [snippet.text for snippet in snippets]
+                full_text = ' '.join(texts)
+                segments = build_segments(
+                    texts, [snippet.start for snippet in snippets], [snippet.duration for snippet in snippets]
+                )
+            logger.debug("✅ Transcript text combined: %d characters", len(full_text))
+
+            result = {
+                "transcript": full_text,
+                "language": fetched_transcript.language_code,
+                "languageStrategy": strategy,
+                **video_fields(video_id, metadata),
+                "videoId": video_id,
+                "segments": segments
+            }
+
+            logger.debug(
+                "🎉 SUCCESS: %s: %d entries, %d chars, language: %s",
+                video_id, len(fetched_transcript), len(full_text), fetched_transcript.language_code
+            )
+            return result
+
+        except Exception as e:
+            logger.error("❌ ERROR in get_video_transcript for video %s: %s: %s", video_id, type(e).__name__, e)
+            raise
+
+    def capture_video_metadata(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Collect the metadata captured from the last player response on this thread and cache it."""
+        metadata = take_captured_metadata(video_id)
+        if metadata is not None:
+            self.metadata_cache.set(video_id, metadata, metadata_size(metadata))
+        return metadata
+
+    def fetch_video_metadata(self, video_id: str) -> Dict[str, Any]:
+        """Fetch title and channel through the proxy by listing caption tracks, without downloading one."""
+        def fetch(ytt_api: YouTubeTranscriptApi) -> Optional[Dict[str, Any]]:
+            with timed_stage("list"):
+                try:
+                    ytt_api.list(video_id)
+                except (TranscriptsDisabled, NoTranscriptFound):
+                    pass  # the player response, and its metadata, still arrived
+                return self.capture_video_metadata(video_id)
+
+        metadata = self.client_pool.run(fetch)
+        return {"videoId": video_id, **video_fields(video_id, metadata)}
+
+    def cached_metadata(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Video metadata from the metadata cache, or None on a miss. Does no I/O."""
+        if not validate_video_id(video_id):
+            raise ValueError("Invalid video ID format")
+        cached = self.metadata_cache.get(video_id)
+        if cached is None:
+            return None
+        logger.debug("📦 Metadata cache hit for video %s", video_id)
+        return {"videoId": video_id, **video_fields(video_id, cached.value)}
+
+    def resolve_metadata(self, video_id: str) -> Dict[str, Any]:
+        """Video metadata from the metadata cache, or fetched through the proxy."""
+        cached = self.cached_metadata(video_id)
+        if cached is not None:
+            return cached
+        self.require_proxy()
+        return self.fetch_video_metadata(video_id)
+
+    def stale_transcript(
+        self, video_id: str, languages: Tuple[str, ...], translate: bool, error: CircuitOpen
+    ) -> Dict[str, Any]:
+        """Return a stored transcript regardless of age, or re-raise ``error`` if there is none."""
+        if self.store is not None:
+            try:
+                stored = self.store.get(video_id, languages, translate, allow_expired=True)
+            except sqlite3.Error as e:
+                logger.warning("⚠️ Transcript store read failed for %s: %s", video_id, e)
+                stored = None
+            if stored is not None:
+                logger.info("💾 Serving stored transcript for %s while circuit '%s' is open", video_id, error.name)
+                return stored
+        raise error
+
+    def cache_transcript(self, key: Tuple[str, Tuple[str, ...], bool], result: Dict[str, Any]) -> None:
+        """Put a transcript result in the in-memory cache and queue it for the search index."""
+        digest = content_digest(result) if self.cache.enabled else None
+        self.cache.set(key, result, _result_size(result), digest)
+        self.search_index.submit(key, result)
+
+    def content_digest(
+        self, video_id: str, languages: Tuple[str, ...], translate: bool, result: Dict[str, Any]
+    ) -> str:
+        """
+        Content digest of ``result`` for ETags: the one computed when it was
+        cached, or computed now for results that did not come from the cache.
+        """
+        digest = self.cache.digest((video_id, languages, translate), result)
+        return digest if digest is not None else content_digest(result)
+
+    def _removed_from_cache(self, key: Tuple[str, Tuple[str, ...], bool]) -> None:
+        # Without a store the cache holds the only copy, so the transcript is gone
+        if self.store is None:
+            self.search_index.discard(key)
+
+    def _removed_from_store(self, key: Tuple[str, Tuple[str, ...], bool]) -> None:
+        if self.cache.peek(key) is None:
+            self.search_index.discard(key)
+
+    def index_store(self) -> None:
+        """
+        Add every unexpired stored transcript to the search index.
+
+        Runs once at startup on a background thread, so searches cover what
+        earlier runs of the machine fetched; they return partial results until it
+        finishes. Transcripts fetched meanwhile are indexed as usual.
+        """
+        started = time.monotonic()
+        after = 0
+        added = 0
+        try:
+            while True:
+                rows = self.store.scan(after, SEARCH_INDEX_BUILD_PAGE)
+                if not rows:
+                    break
+                for rowid, video_id, languages, translate, result in rows:
+                    after = rowid
+                    added += self.search_index.add((video_id, languages, translate), result)
+        except sqlite3.Error as e:
+            logger.warning("⚠️ Search index build from the transcript store stopped: %s", e)
+        logger.info(
+            "🔎 Search index built from the transcript store: %d transcripts in %.1fs", added, time.monotonic() - started
+        )
+
+    def load_for_search(self, key: Tuple[str, Tuple[str, ...], bool]) -> Optional[Dict[str, Any]]:
+        """A transcript from the cache or store for search snippets, without touching LRU order or hit counts."""
+        result = self.cache.peek(key)
+        if result is None and self.store is not None:
+            try:
+                result = self.store.peek(*key)
+            except sqlite3.Error as e:
+                logger.warning("⚠️ Transcript store read failed for %s: %s", key[0], e)
+        return result
+
+    def search(self, query: str, limit: int = 20, offset: int = 0, snippets: int = 3) -> Dict[str, Any]:
+        """
+        Videos among the indexed transcripts that contain every word of ``query``,
+        with timestamped snippets. Blocking; snippets are cut from cached or
+        stored transcripts.
+        """
+        return self.search_index.search(query, self.load_for_search, limit, offset, snippets)
+
+    def fetch_and_cache_transcript(
+        self,
+        video_id: str,
+        languages: Tuple[str, ...] = DEFAULT_LANGUAGES,
+        translate: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Return a transcript from the persistent store, or fetch it through the proxy.
+
+        The outcome is recorded in the in-memory cache, and successful fetches are
+        written to the persistent store when one is configured. Store errors are
+        logged and never fail the request. If an upstream circuit is open, an expired
+        stored copy is served instead when one exists.
+        """
+        cache_key = (video_id, languages, translate)
+        if self.store is not None:
+            try:
+                with timed_stage("store_read"):
+                    stored = self.store.get(video_id, languages, translate)
+            except sqlite3.Error as e:
+                logger.warning("⚠️ Transcript store read failed for %s: %s", video_id, e)
+                stored = None
+            if stored is not None and "segments" not in stored:
+                # Written before segment timings were kept; refetch to fill them in
+                stored = None
+            if stored is not None:
+                logger.debug("💾 Store hit for video %s", video_id)
+                self.cache_transcript(cache_key, stored)
+                return stored
+
+        try:
+            result = self.get_video_transcript(video_id, languages, translate)
+        except (TranscriptsDisabled, NoTranscriptFound, VideoUnavailable) as e:
+            self.cache.set_negative(cache_key, type(e).__name__)
+            raise
+        except CircuitOpen as e:
+            return self.stale_transcript(video_id, languages, translate, e)
+        self.cache_transcript(cache_key, result)
+
+        if self.store is not None:
+            try:
+                with timed_stage("store_write"):
+                    self.store.put(video_id, languages, translate, result)
+            except sqlite3.Error as e:
+                logger.warning("⚠️ Transcript store write failed for %s: %s", video_id, e)
+        return result
+
+    def tripped_breaker(self) -> Optional[CircuitBreaker]:
+        """The first upstream circuit breaker that is currently open, if any."""
+        return next((breaker for breaker in self.breakers.values() if breaker.is_open()), None)
+
+    def require_proxy(self) -> None:
+        if not self.proxy_pool.endpoints:
+            logger.error("❌ No proxy endpoints configured (PROXY_ENDPOINTS or WEBSHARE_USERNAME/WEBSHARE_PASSWORD)")
+            raise ProxyNotConfigured()
+
+    def check_upstream(self, video_id: str, route: bool = True) -> Optional[CircuitOpen]:
+        """
+        Fail a cache miss fast, without I/O, before it takes a worker.
+
+        Misses that peer routing will forward are not checked here. Otherwise
+        raises ProxyNotConfigured when there is no proxy, and CircuitOpen when an
+        upstream breaker is open and there is no store to serve a stale copy from.
+        With a store, the CircuitOpen is returned instead, for the caller to pass
+        to ``stale_transcript``. Returns None when the miss should be resolved
+        normally with ``resolve_uncached``.
+        """
+        if route and self.peers is not None and self.peers.would_forward(video_id):
+            return None
+        tripped = self.tripped_breaker()
+        if tripped is not None:
+            error = CircuitOpen(tripped.name, tripped.retry_after())
+            if self.store is None:
+                raise error
+            return error
+        self.require_proxy()
+        return None
+
+    def cached(self, video_id: str, languages: Tuple[str, ...], translate: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Answer from the in-memory cache without any I/O, or return None on a miss.
+
+        While an upstream circuit breaker is open, expired entries are served too.
+
+        Raises:
+            ValueError: for a malformed video ID
+            CachedTranscriptMiss: for a cached "no transcript" outcome
+        """
+        if not validate_video_id(video_id):
+            raise ValueError("Invalid video ID format")
+        tripped = self.tripped_breaker()
+        cached = self.cache.get((video_id, languages, translate), allow_stale=tripped is not None)
+        if cached is None:
+            return None
+        if cached.negative:
+            logger.debug("📦 Cached miss for video %s: %s", video_id, cached.reason)
+            raise CachedTranscriptMiss(cached.reason)
+        logger.debug("📦 Cache hit for video %s", video_id)
+        STARTUP.mark("first_transcript")
+        return cached.value
+
+    def resolve_uncached(
+        self, video_id: str, languages: Tuple[str, ...], translate: bool = False, route: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Resolve a cache miss: from the owning peer, the store, or upstream through the proxy.
+
+        With peer routing, a video owned by another instance is resolved there and
+        not cached here; if the owner cannot answer it is fetched locally. Pass
+        ``route=False`` for requests forwarded by a peer, so they never hop twice.
+        While an upstream circuit breaker is open only stored copies are served,
+        and anything else fails fast with CircuitOpen.
+        """
+        peer = self.peers.route(video_id) if self.peers is not None and route else None
+        if peer is not None:
+            try:
+                with timed_stage("peer"):
+                    result = self.peers.fetch(peer, video_id, languages, translate)
+                STARTUP.mark("first_transcript")
+                return result
+            except PeerUnavailable:
+                pass
+        tripped = self.tripped_breaker()
+        if tripped is not None:
+            result = self.stale_transcript(video_id, languages, translate, CircuitOpen(tripped.name, tripped.retry_after()))
+        else:
+            self.require_proxy()
+            result = self.fetch_and_cache_transcript(video_id, languages, translate)
+        STARTUP.mark("first_transcript")
+        return result
+
+    def resolve(self, video_id: str, languages: Tuple[str, ...], translate: bool = False) -> Dict[str, Any]:
+        """Resolve a transcript from the cache, the store or upstream, blocking the caller."""
+        cached = self.cached(video_id, languages, translate)
+        if cached is not None:
+            return cached
+        return self.resolve_uncached(video_id, languages, translate)
+
+    def upstream_retry_after(self) -> int:
+        """Seconds until the upstream limiter is expected to admit another fetch."""
+        rate = self.rate_limiter.rate
+        return max(1, math.ceil(1 / rate)) if rate > 0 else 1
+
+    def api_error(self, error: Exception, video_id: str) -> ApiError:
+        """Map an exception from resolving ``video_id`` to the API's error response."""
+        return api_error(error, video_id, self.upstream_retry_after())
+
+    def proxy_status(self) -> Dict[str, Any]:
+        """Per-endpoint routing scores, latest background probes, limiter and circuit breaker state."""
+        endpoints = self.proxy_pool.stats()
+        if self.proxy_monitor is not None:
+            for endpoint in endpoints:
+                endpoint["probe"] = self.proxy_monitor.status(endpoint["name"])
+        return {
+            "enabled": self.proxy_monitor is not None,
+            "interval_seconds": self.settings.proxy_monitor_interval_seconds,
+            "healthy": any(not endpoint["benched"] for endpoint in endpoints),
+            "endpoints": endpoints,
+            "client_pool": self.client_pool.stats(),
+            "rate_limiter": self.rate_limiter.stats(),
+            "circuit_breakers": {name: breaker.stats() for name, breaker in self.breakers.items()}
+        }
+
+    def cache_status(self) -> Dict[str, Any]:
+        """Transcript and metadata cache, persistent store, search index and peer ring counters."""
+        store = self.store.stats() if self.store is not None else {"enabled": False}
+        peers = self.peers.stats() if self.peers is not None else {"enabled": False}
+        return {
+            **self.cache.stats(),
+            "metadata": self.metadata_cache.stats(),
+            "store": store,
+            "search": self.search_index.stats(),
+            "peers": peers,
+        }
+
+    def _register_metrics(self) -> None:
+        collect = REGISTRY.collect
+        collect(
+            "transcript_cache_lookups_total", "counter", "In-memory cache lookups by result",
+            lambda: stat_samples(self.cache.stats(), ("hits", "negative_hits", "stale_hits", "misses"), "result")
+        )
+        collect(
+            "transcript_cache_removals_total", "counter", "In-memory cache entries removed by reason",
+            lambda: stat_samples(self.cache.stats(), ("evictions", "expirations"), "reason")
+        )
+        collect(
+            "transcript_cache_bytes", "gauge", "Approximate bytes held by the in-memory cache",
+            lambda: [({}, self.cache.stats()["bytes"])]
+        )
+        collect(
+            "transcript_cache_entries", "gauge", "Entries in the in-memory cache",
+            lambda: [({}, self.cache.stats()["entries"])]
+        )
+        collect(
+            "video_metadata_cache_lookups_total", "counter", "Video metadata cache lookups by result",
+            lambda: stat_samples(self.metadata_cache.stats(), ("hits", "misses"), "result")
+        )
+        collect(
+            "video_metadata_cache_entries", "gauge", "Entries in the video metadata cache",
+            lambda: [({}, self.metadata_cache.stats()["entries"])]
+        )
+        collect(
+            "transcript_store_bytes", "gauge", "Compressed bytes in the persistent transcript store",
+            lambda: [({}, self.store.stats()["bytes"])] if self.store is not None else []
+        )
+        collect(
+            "transcript_store_lookups_total", "counter", "Persistent store lookups by result",
+            lambda: stat_samples(self.store.stats(), ("hits", "misses"), "result") if self.store is not None else []
+        )
+        collect(
+            "client_pool_clients_total", "counter", "Pooled YouTubeTranscriptApi clients by lifecycle event",
+            lambda: stat_samples(self.client_pool.stats(), ("created", "reused", "discarded", "retries"), "event")
+        )
+        collect(
+            "client_pool_idle", "gauge", "Idle keep-alive clients across all proxy endpoints",
+            lambda: [({}, self.client_pool.stats()["idle"])]
+        )
+        collect(
+            "upstream_rate_per_second", "gauge", "Current adaptive upstream fetch rate",
+            lambda: [({}, self.rate_limiter.stats()["rate_per_second"])]
+        )
+        collect(
+            "upstream_block_rate", "gauge", "Rolling fraction of upstream fetches blocked by YouTube",
+            lambda: [({}, self.rate_limiter.stats()["block_rate"])]
+        )
+        collect(
+            "proxy_endpoint_success_rate", "gauge", "Rolling success rate per proxy endpoint",
+            lambda: [({"endpoint": e["name"]}, e["success_rate"]) for e in self.proxy_pool.stats()]
+        )
+        collect(
+            "proxy_endpoint_benched", "gauge", "1 if the proxy endpoint is currently out of rotation",
+            lambda: [({"endpoint": e["name"]}, int(e["benched"])) for e in self.proxy_pool.stats()]
+        )
+        collect(
+            "circuit_breaker_state", "gauge", "Upstream circuit state (0 closed, 1 half-open, 2 open)",
+            lambda: [({"upstream": name}, _breaker_state(breaker)) for name, breaker in self.breakers.items()]
+        )
+        collect(
+            "proxy_probe_healthy", "gauge", "1 if the latest background probe through the endpoint succeeded",
+            lambda: [({"endpoint": name}, int(probe["healthy"])) for name, probe in self._probes()]
+        )
+        collect(
+            "proxy_probe_latency_seconds", "gauge", "Round-trip time of the latest background probe",
+            lambda: [({"endpoint": name}, probe["latency_ms"] / 1000) for name, probe in self._probes()]
+        )
+        collect(
+            "proxy_probe_consecutive_failures", "gauge", "Background probes failed in a row per endpoint",
+            lambda: [({"endpoint": name}, probe["consecutive_failures"]) for name, probe in self._probes()]
+        )
+        collect(
+            "proxy_probe_last_checked_timestamp_seconds", "gauge", "Unix time of the latest background probe",
+            lambda: [({"endpoint": name}, probe["last_checked"]) for name, probe in self._probes()]
+        )
+        collect(
+            "proxy_probes_total", "counter", "Background probes per endpoint by result",
+            lambda: [
+                sample for name, probe in self._probes() for sample in (
+                    ({"endpoint": name, "result": "ok"}, probe["samples"] - probe["failures"]),
+                    ({"endpoint": name, "result": "failed"}, probe["failures"]),
+                )
+            ]
+        )
+        collect(
+            "proxy_probe_exit_ip_info", "gauge", "Exit IP seen by the latest successful probe (value is always 1)",
+            lambda: [
+                ({"endpoint": name, "exit_ip": probe["exit_ip"]}, 1) for name, probe in self._probes() if probe["exit_ip"]
+            ]
+        )
+
+    def _probes(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """(endpoint name, latest probe state) for every endpoint the proxy monitor has sampled."""
+        if self.proxy_monitor is None:
+            return []
+        probes = [(endpoint.name, self.proxy_monitor.status(endpoint.name)) for endpoint in self.proxy_pool.endpoints]
+        return [(name, probe) for name, probe in probes if probe is not None and probe["samples"]]
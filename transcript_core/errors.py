@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import math
+from typing import Any, Dict, Optional
+
+import requests
+from youtube_transcript_api._errors import (
+    TranscriptsDisabled,
+    NoTranscriptFound,
+    VideoUnavailable,
+    RequestBlocked,
+    CouldNotRetrieveTranscript
+)
+
+from .circuit_breaker import CircuitOpen
+from .rate_limiter import UpstreamThrottled
+
+logger = logging.getLogger(__name__)
+
+
+class ApiError(Exception):
+    """
+    An error response in the API's error model, independent of the web framework.
+
+    ``detail`` is the JSON error body (``error`` code, ``message`` and, when known,
+    ``videoId``); adapters send it with ``status_code`` and ``headers``.
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        code: str,
+        message: str,
+        video_id: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+        self.video_id = video_id
+        self.headers = headers
+
+    @property
+    def detail(self) -> Dict[str, Any]:
+        detail = {"error": self.code, "message": self.message}
+        if self.video_id is not None:
+            detail["videoId"] = self.video_id
+        return detail
+
+
+class ProxyNotConfigured(Exception):
+    """Raised when a transcript must be fetched but proxy credentials are missing."""
+
+
+class CachedTranscriptMiss(Exception):
+    """Raised for a negative cache hit; ``reason`` is the original exception name."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class WorkerPoolSaturated(Exception):
+    """Raised when the transcript worker pool has no free capacity."""
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised on a worker thread when the caller's deadline passed before the fetch could finish."""
+
+
+def api_error(error: Exception, video_id: str, upstream_retry_after: int = 1) -> ApiError:
+    """
+    Map an exception from resolving a transcript to the API's error response.
+
+    ``upstream_retry_after`` is the Retry-After value for rate limited responses.
+    """
+    if isinstance(error, ApiError):
+        return error
+
+    if isinstance(error, ValueError):
+        logger.warning("Invalid request: %s", error)
+        return ApiError(400, "INVALID_VIDEO_ID", str(error))
+
+    if isinstance(error, ProxyNotConfigured):
+        return ApiError(500, "CONFIGURATION_ERROR", "Proxy credentials not configured")
+
+    if isinstance(error, WorkerPoolSaturated):
+        logger.warning("⚠️ Transcript workers saturated, rejecting %s", video_id)
+        return ApiError(
+            503, "SERVER_BUSY", "Server is at capacity, please retry shortly", video_id, {"Retry-After": "1"}
+        )
+
+    if isinstance(error, asyncio.TimeoutError):
+        logger.error("❌ Transcript fetch for %s exceeded its deadline", video_id)
+        return ApiError(504, "UPSTREAM_TIMEOUT", "Timed out retrieving transcript", video_id)
+
+    if isinstance(error, VideoUnavailable) or (
+        isinstance(error, CachedTranscriptMiss) and error.reason == VideoUnavailable.__name__
+    ):
+        logger.info("Video unavailable: %s: %s", video_id, error)
+        return ApiError(404, "VIDEO_UNAVAILABLE", "Video is unavailable or private", video_id)
+
+    if isinstance(error, RequestBlocked):
+        logger.warning("Rate limited for video %s: %s", video_id, error)
+        return ApiError(
+            429, "RATE_LIMITED", "Too many requests, please try again later", video_id,
+            {"Retry-After": str(upstream_retry_after)}
+        )
+
+    if isinstance(error, UpstreamThrottled):
+        logger.warning("⚠️ Upstream rate limit reached, rejecting %s", video_id)
+        return ApiError(
+            503, "UPSTREAM_THROTTLED", "Upstream request rate limit reached, please retry shortly", video_id,
+            {"Retry-After": str(upstream_retry_after)}
+        )
+
+    if isinstance(error, CircuitOpen):
+        logger.warning("⚠️ Circuit '%s' open, failing fast for %s", error.name, video_id)
+        return ApiError(
+            503, "UPSTREAM_UNAVAILABLE", f"Upstream '{error.name}' is failing, please retry later", video_id,
+            {"Retry-After": str(max(1, math.ceil(error.retry_after)))}
+        )
+
+    if isinstance(error, requests.exceptions.RequestException):
+        logger.error("❌ Proxy error for video %s after retries: %s", video_id, error)
+        return ApiError(502, "PROXY_ERROR", "Could not reach YouTube through the proxy", video_id)
+
+    if isinstance(error, (TranscriptsDisabled, NoTranscriptFound, CouldNotRetrieveTranscript, CachedTranscriptMiss)):
+        logger.info("No transcript available for video %s: %s", video_id, error)
+        return ApiError(404, "TRANSCRIPT_NOT_AVAILABLE", "No transcript available for this video", video_id)
+
+    logger.error("❌ Unexpected error: %s", error)
+    return ApiError(500, "INTERNAL_ERROR", "An unexpected error occurred")
@@ -0,0 +1,377 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from typing import IO, Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows; only single-process serving is supported there
+    fcntl = None
+
+from .transcript_store import BUSY_TIMEOUT_MS
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying later rather than recording as a final failure
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+MAX_RETRY_DELAY_SECONDS = 300
+# How often the scheduler deletes jobs past their retention period
+PRUNE_INTERVAL_SECONDS = 600
+
+JobItem = Tuple[str, int, str, Tuple[str, ...], bool, int]
+FetchItem = Callable[[str, Tuple[str, ...], bool], Awaitable[Tuple[int, Dict[str, Any]]]]
+
+
+class JobStore:
+    """
+    SQLite persistence for bulk transcript jobs.
+
+    A job is a list of video IDs with a language preference. Each video is a row in
+    ``job_items`` that moves from ``pending`` to ``running`` to ``done`` or
+    ``failed``; results are stored zlib-compressed with the item. Rows left
+    ``running`` by a stopped machine are reset to ``pending`` when the store is
+    opened with ``resume``, so harvesting resumes where it left off. Only the
+    process running the scheduler should resume (see SchedulerLock).
+
+    Cancelling a job marks its pending items ``cancelled``. Finished and
+    cancelled jobs are deleted with their results by ``prune`` once nothing has
+    changed in them for the retention period.
+    """
+
+    def __init__(self, path: str, resume: bool = True):
+        self.path = path
+        directory = os.path.dirname(path)
+        if path != ":memory:" and directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                created_at REAL NOT NULL,
+                languages TEXT NOT NULL,
+                translate INTEGER NOT NULL,
+                total INTEGER NOT NULL,
+                cancelled INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS job_items (
+                job_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                video_id TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                http_status INTEGER,
+                result BLOB,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                updated_at REAL,
+                PRIMARY KEY (job_id, position)
+            );
+            CREATE INDEX IF NOT EXISTS job_items_status ON job_items (status, next_attempt_at);
+            """
+        )
+        if resume:
+            resumed = self._conn.execute("UPDATE job_items SET status = 'pending' WHERE status = 'running'").rowcount
+            if resumed:
+                logger.info(f"📋 Resuming {resumed} interrupted job items")
+
+    def create(self, video_ids: Sequence[str], languages: Sequence[str], translate: bool) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "INSERT INTO jobs (id, created_at, languages, translate, total) VALUES (?, ?, ?, ?, ?)",
+                (job_id, time.time(), ",".join(languages), int(translate), len(video_ids)),
+            )
+            self._conn.executemany(
+                "INSERT INTO job_items (job_id, position, video_id) VALUES (?, ?, ?)",
+                ((job_id, position, video_id) for position, video_id in enumerate(video_ids)),
+            )
+            self._conn.execute("COMMIT")
+        return job_id
+
+    def claim(self, limit: int) -> List[JobItem]:
+        """Mark up to ``limit`` due pending items as running, oldest job first."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT i.job_id, i.position, i.video_id, j.languages, j.translate, i.attempts
+                FROM job_items i JOIN jobs j ON j.id = i.job_id
+                WHERE i.status = 'pending' AND i.next_attempt_at <= ? AND j.cancelled = 0
+                ORDER BY j.created_at, i.position
+                LIMIT ?
+                """,
+                (time.time(), limit),
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE job_items SET status = 'running' WHERE job_id = ? AND position = ?",
+                ((row[0], row[1]) for row in rows),
+            )
+        return [
+            (job_id, position, video_id, tuple(languages.split(",")), bool(translate), attempts)
+            for job_id, position, video_id, languages, translate, attempts in rows
+        ]
+
+    def finish(self, job_id: str, position: int, http_status: int, payload: Dict[str, Any]) -> None:
+        status = "done" if http_status == 200 else "failed"
+        blob = zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE job_items SET status = ?, http_status = ?, result = ?, attempts = attempts + 1, updated_at = ?
+                WHERE job_id = ? AND position = ?
+                """,
+                (status, http_status, blob, time.time(), job_id, position),
+            )
+
+    def retry_later(self, job_id: str, position: int, delay: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE job_items SET status = 'pending', attempts = attempts + 1, next_attempt_at = ?, updated_at = ?
+                WHERE job_id = ? AND position = ?
+                """,
+                (time.time() + delay, time.time(), job_id, position),
+            )
+
+    def cancel(self, job_id: str) -> bool:
+        """Stop a job's pending items; items already running still finish. False if there is no such job."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            found = self._conn.execute("UPDATE jobs SET cancelled = 1 WHERE id = ?", (job_id,)).rowcount > 0
+            self._conn.execute(
+                "UPDATE job_items SET status = 'cancelled', updated_at = ? WHERE job_id = ? AND status = 'pending'",
+                (time.time(), job_id),
+            )
+            self._conn.execute("COMMIT")
+        return found
+
+    def prune(self, retention_seconds: float) -> int:
+        """
+        Delete jobs with no work left whose last item finished, or that were
+        created, more than ``retention_seconds`` ago. Returns the number deleted.
+
+        Items of a cancelled job left ``pending`` by a restart count as no work left.
+        """
+        cutoff = time.time() - retention_seconds
+        with self._lock:
+            self._conn.execute("BEGIN")
+            expired = self._conn.execute(
+                """
+                SELECT j.id FROM jobs j
+                WHERE j.created_at <= ? AND NOT EXISTS (
+                    SELECT 1 FROM job_items i WHERE i.job_id = j.id AND (
+                        i.updated_at > ? OR i.status = 'running' OR (i.status = 'pending' AND j.cancelled = 0)
+                    )
+                )
+                """,
+                (cutoff, cutoff),
+            ).fetchall()
+            self._conn.executemany("DELETE FROM job_items WHERE job_id = ?", expired)
+            self._conn.executemany("DELETE FROM jobs WHERE id = ?", expired)
+            self._conn.execute("COMMIT")
+        return len(expired)
+
+    def progress(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._conn.execute(
+                "SELECT created_at, languages, translate, total, cancelled FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            counts = dict(
+                self._conn.execute(
+                    "SELECT status, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY status", (job_id,)
+                ).fetchall()
+            )
+        created_at, languages, translate, total, cancelled = job
+        done, failed = counts.get("done", 0), counts.get("failed", 0)
+        remaining = counts.get("pending", 0) + counts.get("running", 0)
+        if cancelled:
+            status = "cancelled"
+        elif remaining == 0:
+            status = "completed"
+        elif done or failed or counts.get("running"):
+            status = "running"
+        else:
+            status = "queued"
+        return {
+            "jobId": job_id,
+            "status": status,
+            "createdAt": created_at,
+            "languages": languages.split(","),
+            "translate": bool(translate),
+            "total": total,
+            "succeeded": done,
+            "failed": failed,
+            "pending": remaining,
+            "cancelled": counts.get("cancelled", 0),
+        }
+
+    def results(self, job_id: str, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Finished items in submission order, in the same shape as batch results."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT video_id, http_status, result FROM job_items
+                WHERE job_id = ? AND status IN ('done', 'failed')
+                ORDER BY position LIMIT ? OFFSET ?
+                """,
+                (job_id, limit, offset),
+            ).fetchall()
+        items = []
+        for video_id, http_status, blob in rows:
+            key = "transcript" if http_status == 200 else "error"
+            items.append({"videoId": video_id, "status": http_status, key: json.loads(zlib.decompress(blob))})
+        return items
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SchedulerLock:
+    """
+    Exclusive lock deciding which server process runs the JobScheduler.
+
+    In multi-worker mode every process opens the same job database, but only the
+    lock holder resumes interrupted items and claims work, so no item is claimed
+    twice. The lock is an advisory lock on ``<path>.lock`` that the OS releases
+    when the holder exits; an in-memory database is private to its process, so
+    its lock is always granted.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._file: Optional[IO[str]] = None
+
+    def acquire(self) -> bool:
+        """Take the lock without waiting; False if another process holds it."""
+        if self.db_path == ":memory:" or fcntl is None:
+            return True
+        lock_file = open(self.db_path + ".lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        return True
+
+    def release(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class JobScheduler:
+    """
+    Background worker that drains pending job items at a bounded rate.
+
+    Items are started no faster than ``rate`` per second with at most
+    ``concurrency`` in flight. ``fetch_item`` returns an HTTP status and a result
+    or error payload; retryable statuses (rate limited, server busy, timeout) are
+    put back with exponential backoff until ``max_attempts`` is reached.
+
+    With ``retention_seconds`` set, finished jobs older than that are pruned from
+    the store every PRUNE_INTERVAL_SECONDS, starting when the scheduler starts.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        fetch_item: FetchItem,
+        rate: float,
+        concurrency: int,
+        max_attempts: int,
+        retention_seconds: float = 0,
+    ):
+        self.store = store
+        self.fetch_item = fetch_item
+        self.rate = rate
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._running: "set[asyncio.Task[None]]" = set()
+        self._wakeup = asyncio.Event()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._running):
+            task.cancel()
+
+    def notify(self) -> None:
+        """Wake the scheduler immediately, e.g. after a job is submitted."""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        interval = 1.0 / self.rate if self.rate > 0 else 0.0
+        next_start = time.monotonic()
+        next_prune = time.monotonic()
+        while True:
+            if self.retention_seconds > 0 and time.monotonic() >= next_prune:
+                next_prune = time.monotonic() + PRUNE_INTERVAL_SECONDS
+                await self._prune()
+            free = self.concurrency - len(self._running)
+            items = await asyncio.to_thread(self.store.claim, free) if free > 0 else []
+            if not items:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            for item in items:
+                delay = next_start - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                next_start = max(next_start, time.monotonic()) + interval
+                task = asyncio.ensure_future(self._process(item))
+                self._running.add(task)
+                task.add_done_callback(self._finished)
+
+    async def _prune(self) -> None:
+        try:
+            pruned = await asyncio.to_thread(self.store.prune, self.retention_seconds)
+        except Exception as e:
+            logger.error(f"❌ Pruning finished jobs failed: {str(e)}")
+            return
+        if pruned:
+            logger.info(f"📋 Pruned {pruned} finished jobs older than {self.retention_seconds:g}s")
+
+    def _finished(self, task: "asyncio.Task[None]") -> None:
+        self._running.discard(task)
+        # A free slot may let the next item start before the idle timeout
+        self._wakeup.set()
+
+    async def _process(self, item: JobItem) -> None:
+        job_id, position, video_id, languages, translate, attempts = item
+        try:
+            http_status, payload = await self.fetch_item(video_id, languages, translate)
+        except Exception as e:
+            logger.error(f"❌ Job {job_id} item {video_id} crashed: {str(e)}")
+            http_status, payload = 500, {"error": "INTERNAL_ERROR", "message": "An unexpected error occurred"}
+
+        if http_status in RETRYABLE_STATUSES and attempts + 1 < self.max_attempts:
+            delay = min(MAX_RETRY_DELAY_SECONDS, 2 ** attempts)
+            logger.info(f"📋 Job {job_id} item {video_id} got {http_status}, retrying in {delay}s")
+            await asyncio.to_thread(self.store.retry_later, job_id, position, delay)
+        else:
+            await asyncio.to_thread(self.store.finish, job_id, position, http_status, payload)
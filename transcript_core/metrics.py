@@ -0,0 +1,158 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+# Latency buckets in seconds, from cache hits up to the 60s request deadline
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Samples = List[Tuple[Dict[str, str], float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def stat_samples(stats: Dict[str, Any], keys: Sequence[str], label: str) -> Samples:
+    """Samples for the numeric ``keys`` of a ``stats()`` dict, labelled ``{label: key}``."""
+    return [({label: key}, stats[key]) for key in keys if isinstance(stats.get(key), (int, float))]
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            # Per-bucket (non-cumulative) counts, then sum and count
+            row = self._values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[index] += 1
+                    break
+            row[-2] += value
+            row[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall-clock duration of the ``with`` block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            values = [(key, list(row)) for key, row in self._values.items()]
+        for key, row in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0.0
+            for index, bound in enumerate(self.buckets):
+                cumulative += row[index]
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, row[-1]
+            yield f"{self.name}_sum", labels, row[-2]
+            yield f"{self.name}_count", labels, row[-1]
+
+
+class Collected:
+    """Metric whose samples are read from ``func`` at scrape time (e.g. cache stats)."""
+
+    def __init__(self, name: str, kind: str, help: str, func: Callable[[], Samples]):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.func = func
+
+    def samples(self) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        for labels, value in self.func():
+            yield self.name, labels, value
+
+
+class MetricsRegistry:
+    """
+    Minimal Prometheus text-format (0.0.4) registry.
+
+    Counters and histograms are updated in place from any thread; gauges and
+    counters that mirror existing ``stats()`` dicts are registered with
+    ``collect`` and read only when ``/metrics`` is scraped.
+    """
+
+    def __init__(self):
+        self._metrics: List[Any] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collect(self, name: str, kind: str, help: str, func: Callable[[], Samples]) -> None:
+        self._metrics.append(Collected(name, kind, help, func))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry shared by the fetch engine and the web adapters
+REGISTRY = MetricsRegistry()
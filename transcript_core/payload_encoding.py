@@ -0,0 +1,264 @@
+import gzip
+import hashlib
+import json
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip is offered without it
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:  # optional: MessagePack is rejected without it
+    msgpack = None
+
+TRANSCRIPT_FORMATS = ("text", "segments")
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# Rough characters per LLM token, for chunk budgets given in tokens
+CHARS_PER_TOKEN = 4
+
+
+class EncodingUnavailable(Exception):
+    """Raised when MessagePack is requested but the msgpack package is not installed."""
+
+
+def build_segments(texts: Sequence[str], starts: Sequence[float], durations: Sequence[float]) -> Dict[str, List[int]]:
+    """
+    Snippet timings as parallel integer arrays over the joined transcript text.
+
+    Times are whole milliseconds, which keeps both JSON and MessagePack compact.
+    ``offset[i]`` is where snippet ``i`` starts in ``" ".join(texts)``, so its text
+    is ``transcript[offset[i]:offset[i + 1] - 1]`` (or to the end for the last one)
+    and no snippet text is stored twice.
+    """
+    offsets = []
+    position = 0
+    for text in texts:
+        offsets.append(position)
+        position += len(text) + 1
+    return {
+        "start_ms": [round(start * 1000) for start in starts],
+        "duration_ms": [round(duration * 1000) for duration in durations],
+        "offset": offsets,
+    }
+
+
+def segment_span(segments: Dict[str, List[int]], start_ms: Optional[int], end_ms: Optional[int]) -> Tuple[int, int]:
+    """
+    Indexes ``[first, last)`` of the snippets overlapping ``start_ms``..``end_ms``.
+
+    Snippets are in start order, so both ends are found by bisecting ``start_ms``
+    without walking the list. A snippet that ends exactly at ``start_ms`` is left out.
+    """
+    starts = segments["start_ms"]
+    first = 0
+    if start_ms is not None:
+        first = max(bisect_right(starts, start_ms) - 1, 0)
+        if first < len(starts) and starts[first] + segments["duration_ms"][first] <= start_ms:
+            first += 1
+    last = len(starts) if end_ms is None else bisect_left(starts, end_ms)
+    return first, max(first, last)
+
+
+def _cut(result: Dict[str, Any], first: int, last: int) -> Tuple[str, Dict[str, List[int]]]:
+    """Transcript text and rebased segments of snippets ``[first, last)``."""
+    transcript = result["transcript"]
+    segments = result["segments"]
+    offsets = segments["offset"]
+    if first >= last:
+        return "", {"start_ms": [], "duration_ms": [], "offset": []}
+    base = offsets[first]
+    end = offsets[last] - 1 if last < len(offsets) else len(transcript)
+    return transcript[base:end], {
+        "start_ms": segments["start_ms"][first:last],
+        "duration_ms": segments["duration_ms"][first:last],
+        "offset": [offset - base for offset in offsets[first:last]],
+    }
+
+
+def slice_result(result: Dict[str, Any], start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Dict[str, Any]:
+    """
+    The result cut down to the snippets between ``start_ms`` and ``end_ms``.
+
+    Only the window's text is copied; the cached result is left untouched.
+    Results without segments, or calls without a range, are returned as is.
+    """
+    if (start_ms is None and end_ms is None) or "segments" not in result:
+        return result
+    transcript, segments = _cut(result, *segment_span(result["segments"], start_ms, end_ms))
+    return {**result, "transcript": transcript, "segments": segments}
+
+
+def chunk_result(result: Dict[str, Any], max_chars: int, with_segments: bool = False) -> List[Dict[str, Any]]:
+    """
+    Split a result into chunks of whole snippets of at most ``max_chars`` characters.
+
+    Chunk boundaries are found by bisecting the snippet offsets, so the cost
+    grows with the number of chunks rather than snippets. A single snippet
+    longer than the budget becomes a chunk of its own.
+    """
+    if "segments" not in result:
+        return [{"index": 0, "text": result["transcript"]}]
+    segments = result["segments"]
+    offsets = segments["offset"]
+    # Offset just past the last snippet, as if another one followed it
+    bounds = offsets + [len(result["transcript"]) + 1]
+    chunks = []
+    first = 0
+    while first < len(offsets):
+        last = max(bisect_right(bounds, offsets[first] + max_chars + 1) - 1, first + 1)
+        text, chunk_segments = _cut(result, first, last)
+        chunk = {
+            "index": len(chunks),
+            "start_ms": segments["start_ms"][first],
+            "end_ms": segments["start_ms"][last - 1] + segments["duration_ms"][last - 1],
+            "text": text,
+        }
+        if with_segments:
+            chunk["segments"] = chunk_segments
+        chunks.append(chunk)
+        first = last
+    return chunks
+
+
+def shape_result(
+    result: Dict[str, Any],
+    transcript_format: str,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None,
+    chunk_chars: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Return the response body for ``format``: ``segments`` keeps timings, ``text`` drops them.
+
+    ``start_ms``/``end_ms`` keep only the snippets in that window. With
+    ``chunk_chars`` the text is returned as a ``chunks`` list instead of one
+    ``transcript`` string, each chunk carrying its own segments for ``format=segments``.
+    """
+    result = slice_result(result, start_ms, end_ms)
+    if chunk_chars:
+        metadata = {key: value for key, value in result.items() if key not in ("transcript", "segments")}
+        return {**metadata, "chunks": chunk_result(result, chunk_chars, transcript_format == "segments")}
+    if transcript_format == "segments":
+        return result
+    return {key: value for key, value in result.items() if key != "segments"}
+
+
+def wants_msgpack(accept: str) -> bool:
+    """True if an Accept header asks for MessagePack."""
+    return any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES)
+
+
+def negotiate_content_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick ``br`` (when brotli is installed) or ``gzip`` from an Accept-Encoding header."""
+    offered = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip().lower()] = quality
+    for coding in ("br", "gzip"):
+        if coding == "br" and brotli is None:
+            continue
+        if offered.get(coding, offered.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+def encode_payload(
+    payload: Any, accept: str, accept_encoding: str, min_compress_bytes: int
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Serialize ``payload`` as JSON, or MessagePack when ``accept`` asks for it, and
+    compress bodies of at least ``min_compress_bytes`` with the best coding in
+    ``accept_encoding``.
+
+    Returns:
+        The body and its Content-Type, Vary and (if compressed) Content-Encoding headers
+
+    Raises:
+        EncodingUnavailable: if MessagePack is requested but not installed
+    """
+    if wants_msgpack(accept):
+        if msgpack is None:
+            raise EncodingUnavailable()
+        body = msgpack.packb(payload, use_bin_type=True)
+        media_type = "application/msgpack"
+    else:
+        body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        media_type = "application/json"
+
+    headers = {"Content-Type": media_type, "Vary": "Accept, Accept-Encoding"}
+    if min_compress_bytes > 0 and len(body) >= min_compress_bytes:
+        coding = negotiate_content_encoding(accept_encoding)
+        if coding == "br":
+            body = brotli.compress(body, quality=5)
+        elif coding == "gzip":
+            body = gzip.compress(body, compresslevel=6)
+        if coding is not None:
+            headers["Content-Encoding"] = coding
+    return body, headers
+
+
+def content_digest(result: Dict[str, Any]) -> str:
+    """
+    SHA-256 of a whole transcript result: text, segment timings and metadata.
+
+    Hashes the canonical JSON of ``result``, so it costs about as much as
+    encoding the full transcript; the engine computes it once when a result is
+    cached (see TranscriptEngine.content_digest).
+    """
+    canonical = json.dumps(result, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def transcript_etag(
+    digest: str,
+    transcript_format: str,
+    shape: Dict[str, Optional[int]],
+    accept: str,
+    accept_encoding: str,
+    min_compress_bytes: int
+) -> str:
+    """
+    Strong ETag for the response encode_payload would send for this request.
+
+    ``digest`` is the content_digest of the result, which covers every field a
+    response can include. The tag adds what else changes the bytes: the format,
+    the range and chunk arguments (``shape``), the media type and the content
+    coding the request would get. Only those few values are hashed per request.
+    """
+    coding = negotiate_content_encoding(accept_encoding) if min_compress_bytes > 0 else None
+    variant = (
+        digest, transcript_format, shape.get("start_ms"), shape.get("end_ms"), shape.get("chunk_chars"),
+        "msgpack" if wants_msgpack(accept) else "json", coding, min_compress_bytes if coding else 0,
+    )
+    return f'"{hashlib.sha256(repr(variant).encode("utf-8")).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """True if an If-None-Match header lists ``etag`` (weakly compared, as RFC 9110 requires) or is ``*``."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def cache_control(max_age: float, public: bool = False) -> str:
+    """
+    Cache-Control for a transcript response that may be reused for ``max_age`` seconds.
+
+    Responses are ``private`` (browser and client caches only) unless ``public``
+    lets shared caches such as a CDN keep them; ``max_age`` of 0 forces a
+    revalidation with the ETag on every use.
+    """
+    if max_age <= 0:
+        return "no-cache"
+    return f"{'public' if public else 'private'}, max-age={int(max_age)}"
@@ -0,0 +1,250 @@
+import bisect
+import hashlib
+import logging
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .circuit_breaker import CircuitBreaker
+from .errors import ApiError
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Points per member on the hash ring; more points spread the slices more evenly
+RING_POINTS_PER_PEER = 160
+
+# Consecutive forwarding failures before a peer is skipped until its next probe
+PEER_FAILURE_THRESHOLD = 3
+
+# Error codes from the owner that are a verdict on the video itself. Any other
+# error (busy, throttled, proxy trouble) is the owner's problem, so the video is
+# fetched locally instead
+PEER_FINAL_CODES = ("TRANSCRIPT_NOT_AVAILABLE", "VIDEO_UNAVAILABLE", "INVALID_VIDEO_ID")
+
+# Internal route on every instance that resolves a transcript without forwarding it again
+PEER_TRANSCRIPT_PATH = "/peer/transcript"
+
+peer_requests = REGISTRY.counter(
+    "peer_requests_total",
+    "Transcript cache misses by peer routing outcome (owned, forwarded, fallback)",
+    ("outcome",)
+)
+
+
+class PeerUnavailable(Exception):
+    """Raised when the owning peer cannot answer; the caller fetches locally instead."""
+
+
+def _ring_hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring over peer URLs.
+
+    Each member is placed at ``points`` positions; a key belongs to the first
+    member clockwise from the key's hash. Adding or removing one member of N
+    only moves about 1/N of the keys, so the other caches stay warm.
+    """
+
+    def __init__(self, members: Sequence[str], points: int = RING_POINTS_PER_PEER):
+        self.members = tuple(sorted(set(members)))
+        ring = sorted((_ring_hash(f"{member}#{i}"), member) for member in self.members for i in range(points))
+        self._hashes = [position for position, _ in ring]
+        self._owners = [member for _, member in ring]
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._hashes:
+            return None
+        index = bisect.bisect(self._hashes, _ring_hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+
+def resolve_dns_peers(name: str, port: int) -> List[str]:
+    """Peer URLs for every address ``name`` resolves to, e.g. the machines behind ``<app>.internal`` on Fly."""
+    addresses = {info[4][0] for info in socket.getaddrinfo(name, port, proto=socket.IPPROTO_TCP)}
+    return [peer_url(address, port) for address in addresses]
+
+
+def peer_url(address: str, port: int) -> str:
+    host = f"[{address}]" if ":" in address else address
+    return f"http://{host}:{port}"
+
+
+class PeerRouter:
+    """
+    Routes transcript cache misses to the instance that owns the video.
+
+    Every instance builds the same consistent hash ring over the current peers,
+    so each video ID is fetched and cached by one owner and the fleet's caches
+    add up instead of holding copies of the same hot videos. Non-owners forward
+    the miss to the owner's ``/peer/transcript`` route over the private network.
+
+    Peers come from a static URL list, or are re-resolved every
+    ``refresh_interval`` seconds from a DNS name. A peer that keeps failing is
+    skipped by its circuit breaker, and any forwarding failure falls back to a
+    local fetch, so a stopped or unreachable owner only costs a cache miss.
+    """
+
+    def __init__(
+        self,
+        self_url: str,
+        static_peers: Sequence[str] = (),
+        dns_name: Optional[str] = None,
+        port: int = 8080,
+        api_key: Optional[str] = None,
+        timeout: float = 30,
+        refresh_interval: float = 30,
+        pool_size: int = 8
+    ):
+        self.self_url = self_url
+        self.static_peers = tuple(static_peers)
+        self.dns_name = dns_name
+        self.port = port
+        self.timeout = timeout
+        self.refresh_interval = refresh_interval
+        self._headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=pool_size))
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._ring = HashRing([self_url, *self.static_peers])
+        self._refreshed_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        REGISTRY.collect(
+            "peer_ring_members", "gauge", "Instances on the peer hash ring, including this one",
+            lambda: [({}, len(self._ring.members))]
+        )
+
+    def start(self) -> None:
+        """Start re-resolving DNS peers on a daemon thread (no-op for a static peer list)."""
+        if not self.dns_name or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="peer-discovery", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._session.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.refresh_interval)
+
+    def refresh(self) -> None:
+        """Rebuild the ring from DNS; keeps the previous ring if the lookup fails."""
+        try:
+            members = resolve_dns_peers(self.dns_name, self.port)
+        except OSError as e:
+            self._last_error = str(e)
+            logger.warning(f"⚠️ Peer discovery for {self.dns_name} failed: {e}")
+            return
+        ring = HashRing([self.self_url, *members])
+        with self._lock:
+            previous = self._ring.members
+            self._ring = ring
+            self._refreshed_at = time.time()
+            self._last_error = None
+        if ring.members != previous:
+            logger.info(f"🔗 Peer ring now has {len(ring.members)} members: {', '.join(ring.members)}")
+
+    def owner(self, video_id: str) -> str:
+        return self._ring.owner(video_id) or self.self_url
+
+    def owns(self, video_id: str) -> bool:
+        """True if this instance owns ``video_id`` on the current ring, so it fetches it itself."""
+        return self.owner(video_id) == self.self_url
+
+    def would_forward(self, video_id: str) -> bool:
+        """True if ``route`` would currently forward ``video_id``; no side effects, no I/O."""
+        owner = self.owner(video_id)
+        return owner != self.self_url and not self._breaker(owner).is_open()
+
+    def _breaker(self, peer: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(peer)
+            if breaker is None:
+                breaker = self._breakers[peer] = CircuitBreaker(
+                    f"peer {peer}", PEER_FAILURE_THRESHOLD, self.refresh_interval
+                )
+            return breaker
+
+    def route(self, video_id: str) -> Optional[str]:
+        """The peer to forward ``video_id`` to, or None if this instance should fetch it."""
+        owner = self.owner(video_id)
+        if owner == self.self_url:
+            peer_requests.inc(outcome="owned")
+            return None
+        if not self._breaker(owner).allow():
+            peer_requests.inc(outcome="fallback")
+            return None
+        return owner
+
+    def fetch(self, peer: str, video_id: str, languages: Tuple[str, ...], translate: bool) -> Dict[str, Any]:
+        """
+        Resolve a transcript on ``peer``.
+
+        Raises:
+            ApiError: the owner's verdict on the video (no transcript, unavailable, invalid ID)
+            PeerUnavailable: when the peer cannot answer; the caller fetches locally
+        """
+        breaker = self._breaker(peer)
+        try:
+            response = self._session.get(
+                peer + PEER_TRANSCRIPT_PATH,
+                params={"videoId": video_id, "languages": ",".join(languages), "translate": str(translate).lower()},
+                headers=self._headers,
+                timeout=self.timeout,
+            )
+            body = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            breaker.record_failure()
+            peer_requests.inc(outcome="fallback")
+            logger.warning("⚠️ Peer %s failed for %s, fetching locally: %s", peer, video_id, e)
+            raise PeerUnavailable(str(e)) from e
+
+        if response.status_code == 200:
+            breaker.record_success()
+            peer_requests.inc(outcome="forwarded")
+            return body
+        error = body.get("detail") if isinstance(body, dict) else None
+        if not isinstance(error, dict) or "error" not in error:
+            # Not an answer from the app, e.g. an error page from something in between
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+            if error["error"] in PEER_FINAL_CODES:
+                peer_requests.inc(outcome="forwarded")
+                raise ApiError(response.status_code, error["error"], error.get("message", ""), video_id)
+        peer_requests.inc(outcome="fallback")
+        logger.warning("⚠️ Peer %s answered %s for %s, fetching locally", peer, response.status_code, video_id)
+        raise PeerUnavailable(f"HTTP {response.status_code}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            breakers = dict(self._breakers)
+            members = self._ring.members
+            refreshed_at = self._refreshed_at
+            last_error = self._last_error
+        return {
+            "enabled": True,
+            "self": self.self_url,
+            "discovery": self.dns_name or "static",
+            "members": [
+                {"url": member, "self": member == self.self_url,
+                 "circuit": breakers[member].stats()["state"] if member in breakers else "closed"}
+                for member in members
+            ],
+            "last_refreshed": refreshed_at,
+            "last_error": last_error,
+        }
@@ -0,0 +1,97 @@
+import random
+import threading
+import time
+from typing import Any, Dict
+
+# Smoothing factor for the rolling block rate (weight of the newest outcome)
+BLOCK_RATE_ALPHA = 0.1
+
+
+class UpstreamThrottled(Exception):
+    """Raised when no upstream request token becomes available in time."""
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AdaptiveRateLimiter:
+    """
+    Thread-safe token bucket for outbound YouTube fetches with AIMD rate control.
+
+    Tokens refill at ``rate`` per second up to ``burst``. Each block reported by
+    YouTube halves the rate (down to ``min_rate``), and each successful fetch adds
+    back ``max_rate / 20`` (up to ``max_rate``), so sustained blocking slows the
+    whole process down instead of failing requests in bursts. A ``max_rate`` of 0
+    disables limiting.
+    """
+
+    def __init__(self, max_rate: float, min_rate: float, burst: float):
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.burst = max(burst, 1.0)
+        self.rate = max_rate
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._block_rate = 0.0
+        self._stats = {"acquired": 0, "waited": 0, "throttled": 0, "blocks": 0, "successes": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_rate > 0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: float) -> bool:
+        """Take one token, waiting up to ``timeout`` seconds; False if none arrived."""
+        if not self.enabled:
+            return True
+        deadline = time.monotonic() + timeout
+        waited = False
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self._stats["acquired"] += 1
+                    self._stats["waited"] += int(waited)
+                    return True
+                wait = (1 - self._tokens) / self.rate
+                if now + wait > deadline:
+                    self._stats["throttled"] += 1
+                    return False
+                waited = True
+                self._cond.wait(wait)
+
+    def record_success(self) -> None:
+        with self._cond:
+            self._stats["successes"] += 1
+            self._block_rate *= 1 - BLOCK_RATE_ALPHA
+            if self.enabled:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def record_block(self) -> None:
+        with self._cond:
+            self._stats["blocks"] += 1
+            self._block_rate = self._block_rate * (1 - BLOCK_RATE_ALPHA) + BLOCK_RATE_ALPHA
+            if self.enabled:
+                self._refill(time.monotonic())
+                self.rate = max(self.min_rate, self.rate / 2)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "enabled": self.enabled,
+                "rate_per_second": round(self.rate, 3),
+                "max_rate_per_second": self.max_rate,
+                "min_rate_per_second": self.min_rate,
+                "burst": self.burst,
+                "block_rate": round(self._block_rate, 4),
+                **self._stats,
+            }
@@ -0,0 +1,139 @@
+import contextvars
+import json
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+_current: "contextvars.ContextVar[Optional[RequestTrace]]" = contextvars.ContextVar("request_trace", default=None)
+
+
+class RequestTrace:
+    """
+    Fields and stage timings collected while handling one request.
+
+    The trace lives in a context variable, so it follows the request into
+    coalesced fetch tasks and worker threads started with a copied context.
+    Stages may be recorded from worker threads; repeated stages (e.g. several
+    backoff sleeps) are summed.
+    """
+
+    def __init__(self, sampled: bool):
+        self.sampled = sampled
+        self.fields: Dict[str, Any] = {}
+        self.stages: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, **fields: Any) -> None:
+        with self._lock:
+            self.fields.update(fields)
+
+    def count(self, field: str, key: str) -> None:
+        """Increment ``fields[field][key]``, e.g. batch outcomes by error code."""
+        with self._lock:
+            counts = self.fields.setdefault(field, {})
+            counts[key] = counts.get(key, 0) + 1
+
+    def add_stage(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds * 1000
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            summary = dict(self.fields)
+            if self.stages:
+                summary["stages_ms"] = {stage: round(ms, 1) for stage, ms in self.stages.items()}
+            return summary
+
+
+def start_trace(sample_rate: float) -> RequestTrace:
+    """Begin a trace for the current request; detail logs are kept for ``sample_rate`` of requests."""
+    trace = RequestTrace(sample_rate > 0 and random.random() < sample_rate)
+    _current.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current.get()
+
+
+def annotate(**fields: Any) -> None:
+    """Add fields to the current request's summary event (no-op outside a request)."""
+    trace = _current.get()
+    if trace is not None:
+        trace.set(**fields)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; summary fields passed as ``extra={"fields": ...}`` become top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            event.update(fields)
+        if record.exc_info:
+            event["exception"] = self.formatException(record.exc_info)
+        return json.dumps(event, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """The default ``LEVEL:logger:message`` format with summary fields appended as key=value."""
+
+    def __init__(self):
+        super().__init__(logging.BASIC_FORMAT)
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={json.dumps(value, default=str)}" for key, value in fields.items())
+        return line
+
+
+class DetailSampler(logging.Filter):
+    """Drop records below ``level`` unless they belong to a sampled request."""
+
+    def __init__(self, level: int):
+        super().__init__()
+        self.level = level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.level:
+            return True
+        trace = _current.get()
+        return trace is not None and trace.sampled
+
+
+def configure_logging(log_format: str, level: str, detail_sample_rate: float, detail_loggers: Sequence[str]) -> None:
+    """
+    Install the root handler.
+
+    ``detail_loggers`` are lowered to DEBUG when ``detail_sample_rate`` is set, and
+    the DetailSampler then keeps their debug records only for sampled requests.
+    Otherwise records below ``level`` are rejected by the logger before any
+    message formatting happens.
+    """
+    threshold = logging.getLevelName(level.upper())
+    if not isinstance(threshold, int):
+        threshold = logging.INFO
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if log_format == "json" else TextFormatter())
+    handler.addFilter(DetailSampler(threshold))
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(threshold)
+    if detail_sample_rate > 0 and threshold > logging.DEBUG:
+        for name in detail_loggers:
+            logging.getLogger(name).setLevel(logging.DEBUG)
+
+
+def elapsed_ms(started: float) -> float:
+    """Milliseconds since a ``time.perf_counter()`` reading."""
+    return round((time.perf_counter() - started) * 1000, 1)
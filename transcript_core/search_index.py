@@ -0,0 +1,412 @@
+import logging
+import queue
+import re
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Words are runs of letters and digits; longer tokens are mostly URLs and noise
+TOKEN_PATTERN = re.compile(r"\w+")
+MAX_TOKEN_CHARS = 32
+
+# Approximate bookkeeping cost of one vocabulary entry (the term string, its
+# postings bytearray and the dict slot), on top of the term and posting bytes
+TERM_OVERHEAD_BYTES = 110
+# Approximate cost of one document slot (key tuple, dedup entry, deleted flag)
+DOCUMENT_OVERHEAD_BYTES = 200
+# Approximate cost of each further cache key that resolves to the same document
+KEY_OVERHEAD_BYTES = 150
+
+# Each postings bytearray starts with the last document ID as a fixed-width
+# integer, followed by the varint-encoded gaps between ascending document IDs
+LAST_ID_BYTES = 4
+
+# Segments of context shown on each side of a matching caption segment
+SNIPPET_CONTEXT_SEGMENTS = 1
+
+# Transcripts waiting to be indexed off the request path; more are dropped
+INDEX_QUEUE_LIMIT = 10000
+
+# Removed documents keep their postings until the index is compacted, which
+# happens once this fraction of documents is removed and either at least
+# COMPACT_MIN_REMOVED are, or the index is full. Each compaction rewrites every
+# postings list, so it must free a good share of the index to be worth it
+COMPACT_REMOVED_FRACTION = 0.1
+COMPACT_MIN_REMOVED = 100
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens of ``text``."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) <= MAX_TOKEN_CHARS]
+
+
+def _append_varint(data: bytearray, value: int) -> int:
+    """Append ``value`` as a little-endian base-128 varint and return the bytes written."""
+    written = 1
+    while value >= 0x80:
+        data.append((value & 0x7F) | 0x80)
+        value >>= 7
+        written += 1
+    data.append(value)
+    return written
+
+
+def _decode_postings(data: bytearray) -> List[int]:
+    """The ascending document IDs in a postings bytearray."""
+    ids = []
+    doc_id = 0
+    value = 0
+    shift = 0
+    for byte in memoryview(data)[LAST_ID_BYTES:]:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        doc_id += value
+        ids.append(doc_id)
+        value = 0
+        shift = 0
+    return ids
+
+
+def _encode_postings(ids: List[int]) -> bytearray:
+    """A postings bytearray for ascending document IDs."""
+    data = bytearray(LAST_ID_BYTES)
+    previous = 0
+    for doc_id in ids:
+        _append_varint(data, doc_id - previous)
+        previous = doc_id
+    data[:LAST_ID_BYTES] = previous.to_bytes(LAST_ID_BYTES, "little")
+    return data
+
+
+def _term_bytes(term: str, postings: bytearray) -> int:
+    return TERM_OVERHEAD_BYTES + sys.getsizeof(term) + len(postings)
+
+
+def segment_texts(result: Dict[str, Any]) -> List[str]:
+    """Caption segment texts of a result, cut from the transcript by their offsets."""
+    transcript = result["transcript"]
+    offsets = result["segments"]["offset"]
+    ends = [offset - 1 for offset in offsets[1:]] + [len(transcript)]
+    return [transcript[start:end] for start, end in zip(offsets, ends)]
+
+
+def snippets(result: Dict[str, Any], terms: Set[str], limit: int) -> List[Dict[str, Any]]:
+    """
+    Up to ``limit`` timestamped snippets in transcript order.
+
+    Segments are picked greedily: first those adding query terms not shown yet,
+    then those matching the most terms, skipping any whose context would
+    overlap a snippet already picked.
+    """
+    texts = segment_texts(result)
+    matches = []
+    for index, text in enumerate(texts):
+        matched = terms.intersection(tokenize(text))
+        if matched:
+            matches.append((index, matched))
+    chosen: List[int] = []
+    covered: Set[str] = set()
+    while matches and len(chosen) < limit:
+        index, matched = max(matches, key=lambda match: (len(match[1] - covered), len(match[1]), -match[0]))
+        chosen.append(index)
+        covered |= matched
+        span = 2 * SNIPPET_CONTEXT_SEGMENTS
+        matches = [match for match in matches if abs(match[0] - index) > span]
+    segments = result["segments"]
+    found = []
+    for index in sorted(chosen):
+        first = max(0, index - SNIPPET_CONTEXT_SEGMENTS)
+        last = min(len(texts) - 1, index + SNIPPET_CONTEXT_SEGMENTS)
+        start_ms = segments["start_ms"][first]
+        end_ms = segments["start_ms"][last] + segments["duration_ms"][last]
+        found.append({
+            "start_ms": segments["start_ms"][index],
+            "duration_ms": segments["duration_ms"][index],
+            "context_start_ms": start_ms,
+            "context_duration_ms": end_ms - start_ms,
+            "text": " ".join(texts[first:last + 1]),
+        })
+    return found
+
+
+class SearchIndex:
+    """
+    In-memory inverted index over transcripts, answering "which videos say all
+    of these words, and where".
+
+    The index only records which documents contain each term. Postings are
+    ascending document IDs stored as varint gaps in one bytearray per term, so
+    a common word costs about a byte per transcript it appears in. Timestamps
+    and snippet text are not indexed; they are cut from the matching results,
+    loaded from the transcript cache or store, at query time.
+
+    A document is one video in one resulting language. Every cache key that
+    resolved to it (e.g. ``("en",)`` and ``("de", "en")`` for an English-only
+    video) is registered with it, and it stays searchable until the last of
+    those keys is removed.
+
+    Documents are added incrementally on a background thread (``submit``), so
+    indexing never delays a response. Once the approximate size reaches
+    ``max_bytes`` new documents are skipped. Documents are removed when their
+    transcript leaves the cache or store (``discard``), or when a query finds
+    it missing. Removed documents only stop matching at first; their postings
+    are reclaimed by ``compact``, which runs on the indexing path once enough
+    of the index is dead. All methods are thread-safe.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._terms: Dict[str, bytearray] = {}
+        # Live cache keys of each document, oldest first (a dict used as an ordered set)
+        self._keys: List[Dict[Hashable, None]] = []
+        self._doc_ids: Dict[Tuple[str, str, bool], int] = {}
+        self._key_ids: Dict[Hashable, int] = {}
+        self._deleted = bytearray()
+        self._removed = 0
+        self._bytes = 0
+        self._full_logged = False
+        self._stats = {
+            "indexed": 0, "skipped_full": 0, "dropped": 0, "removed": 0, "compactions": 0, "queries": 0
+        }
+        self._queue: "queue.Queue[Tuple[Hashable, Dict[str, Any]]]" = queue.Queue(INDEX_QUEUE_LIMIT)
+        self._thread: Optional[threading.Thread] = None
+        REGISTRY.collect(
+            "search_index_documents", "gauge", "Transcripts in the search index",
+            lambda: [({}, self.stats()["documents"])]
+        )
+        REGISTRY.collect(
+            "search_index_bytes", "gauge", "Approximate memory held by the search index",
+            lambda: [({}, self._bytes)]
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def start(self) -> None:
+        """Start the background indexing thread (no-op if already running)."""
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._thread = threading.Thread(target=self._run, name="search-indexer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            key, result = self._queue.get()
+            try:
+                self.add(key, result)
+            except Exception as e:
+                logger.warning(f"⚠️ Indexing {key[0]} for search failed: {e}")
+
+    def submit(self, key: Tuple[str, Tuple[str, ...], bool], result: Dict[str, Any]) -> None:
+        """Queue a cached transcript for indexing without blocking the caller."""
+        if not self.enabled or "segments" not in result:
+            return
+        try:
+            self._queue.put_nowait((key, result))
+        except queue.Full:
+            with self._lock:
+                self._stats["dropped"] += 1
+
+    def add(self, key: Tuple[str, Tuple[str, ...], bool], result: Dict[str, Any]) -> bool:
+        """
+        Index one transcript result under its cache key ``(video_id, languages, translate)``.
+
+        The same video and resulting language is indexed once, however many
+        language preferences led to it; further keys are registered with the
+        existing document. Returns True if a new document was added.
+        """
+        if not self.enabled or "segments" not in result:
+            return False
+        identity = (key[0], result.get("language", ""), key[2])
+        terms = set(tokenize(result["transcript"]))
+        with self._lock:
+            existing = self._doc_ids.get(identity)
+            if existing is not None and not self._deleted[existing]:
+                if self._key_ids.get(key) != existing:
+                    self._unlink(key)
+                    self._keys[existing][key] = None
+                    self._key_ids[key] = existing
+                    self._bytes += KEY_OVERHEAD_BYTES
+                return False
+            if self._removed and self._removed >= COMPACT_REMOVED_FRACTION * len(self._keys) and (
+                self._bytes >= self.max_bytes or self._removed >= COMPACT_MIN_REMOVED
+            ):
+                self._compact()
+            if self._bytes >= self.max_bytes:
+                self._stats["skipped_full"] += 1
+                if not self._full_logged:
+                    self._full_logged = True
+                    logger.warning(f"⚠️ Search index reached {self.max_bytes} bytes; new transcripts are not indexed")
+                return False
+            # The key may have resolved to another language before
+            self._unlink(key)
+            doc_id = len(self._keys)
+            self._keys.append({key: None})
+            self._doc_ids[identity] = doc_id
+            self._key_ids[key] = doc_id
+            self._deleted.append(0)
+            added = DOCUMENT_OVERHEAD_BYTES
+            for term in terms:
+                postings = self._terms.get(term)
+                if postings is None:
+                    postings = self._terms[term] = bytearray(LAST_ID_BYTES)
+                    added += TERM_OVERHEAD_BYTES + sys.getsizeof(term) + LAST_ID_BYTES
+                    gap = doc_id
+                else:
+                    gap = doc_id - int.from_bytes(postings[:LAST_ID_BYTES], "little")
+                postings[:LAST_ID_BYTES] = doc_id.to_bytes(LAST_ID_BYTES, "little")
+                added += _append_varint(postings, gap)
+            self._bytes += added
+            self._stats["indexed"] += 1
+        return True
+
+    def _candidates(self, terms: List[str]) -> List[Tuple[Hashable, ...]]:
+        """Cache keys of each live document containing every term, newest first."""
+        with self._lock:
+            self._stats["queries"] += 1
+            postings = [self._terms.get(term) for term in terms]
+            if not terms or any(data is None for data in postings):
+                return []
+            # Start from the shortest postings list, the rarest term
+            postings.sort(key=len)
+            matches = _decode_postings(postings[0])
+            for data in postings[1:]:
+                if not matches:
+                    break
+                matches = sorted(set(matches).intersection(_decode_postings(data)))
+            deleted = self._deleted
+            return [tuple(self._keys[doc_id]) for doc_id in reversed(matches) if not deleted[doc_id]]
+
+    def _unlink(self, key: Hashable) -> None:
+        """Unregister ``key`` from its document, removing the document if it was its last key."""
+        doc_id = self._key_ids.pop(key, None)
+        if doc_id is None or self._deleted[doc_id]:
+            return
+        keys = self._keys[doc_id]
+        del keys[key]
+        if keys:
+            self._bytes -= KEY_OVERHEAD_BYTES
+            return
+        self._deleted[doc_id] = 1
+        self._removed += 1
+        self._stats["removed"] += 1
+
+    def discard(self, key: Hashable) -> None:
+        """
+        Unregister cache key ``key``. Its document stops matching once no other
+        key that resolved to it is left.
+        """
+        with self._lock:
+            self._unlink(key)
+
+    def compact(self) -> None:
+        """Drop removed documents from the postings and renumber the rest."""
+        with self._lock:
+            self._compact()
+
+    def _compact(self) -> None:
+        started = time.monotonic()
+        removed = self._removed
+        remap = []
+        keys = []
+        for doc_id, doc_keys in enumerate(self._keys):
+            if self._deleted[doc_id]:
+                remap.append(-1)
+            else:
+                remap.append(len(keys))
+                keys.append(doc_keys)
+        terms = {}
+        total = DOCUMENT_OVERHEAD_BYTES * len(keys) + KEY_OVERHEAD_BYTES * (len(self._key_ids) - len(keys))
+        for term, data in self._terms.items():
+            ids = [remap[doc_id] for doc_id in _decode_postings(data) if remap[doc_id] >= 0]
+            if ids:
+                postings = terms[term] = _encode_postings(ids)
+                total += _term_bytes(term, postings)
+        self._terms = terms
+        self._keys = keys
+        self._doc_ids = {identity: remap[doc_id] for identity, doc_id in self._doc_ids.items() if remap[doc_id] >= 0}
+        self._key_ids = {key: remap[doc_id] for key, doc_id in self._key_ids.items() if remap[doc_id] >= 0}
+        self._deleted = bytearray(len(keys))
+        self._removed = 0
+        self._bytes = total
+        self._stats["compactions"] += 1
+        logger.info(
+            f"🔎 Search index compacted in {time.monotonic() - started:.2f}s: {removed} removed transcripts dropped, "
+            f"{len(keys)} remain in {total} bytes"
+        )
+
+    def search(
+        self,
+        query: str,
+        loader: Callable[[Hashable], Optional[Dict[str, Any]]],
+        limit: int = 20,
+        offset: int = 0,
+        snippet_limit: int = 3
+    ) -> Dict[str, Any]:
+        """
+        Videos whose transcript contains every word of ``query``, most recently
+        indexed first, each with up to ``snippet_limit`` timestamped snippets.
+
+        ``loader`` returns the cached or stored result for a cache key, or None
+        when it is gone, in which case the key is dropped from the index and the
+        document's other keys, if any, are tried.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        candidates = self._candidates(terms)
+        term_set = set(terms)
+        results = []
+        skipped = 0
+        position = 0
+        for keys in candidates:
+            if len(results) >= limit:
+                break
+            for key in keys:
+                result = loader(key)
+                if result is not None and "segments" in result:
+                    break
+                self.discard(key)
+            else:
+                skipped += 1
+                continue
+            position += 1
+            if position <= offset:
+                continue
+            results.append({
+                "videoId": key[0],
+                "language": result.get("language"),
+                "title": result.get("title"),
+                "channel": result.get("channel"),
+                "snippets": snippets(result, term_set, snippet_limit),
+            })
+        return {
+            "query": query,
+            "terms": terms,
+            "total": len(candidates) - skipped,
+            "offset": offset,
+            "limit": limit,
+            "results": results,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            documents = len(self._keys) - self._removed
+            return {
+                "enabled": self.enabled,
+                "documents": documents,
+                "keys": len(self._key_ids),
+                "terms": len(self._terms),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "pending_removal": self._removed,
+                "queued": self._queue.qsize(),
+                **self._stats,
+            }
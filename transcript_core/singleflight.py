@@ -0,0 +1,57 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent async calls that share a key into one execution.
+
+    The first caller for a key starts ``func()`` as a task; callers arriving while
+    it is still running await the same task and receive the same result or
+    exception. The key is released as soon as the task finishes, so later calls
+    start a fresh execution (caching is left to TranscriptCache).
+
+    Must only be used from the event loop thread.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self._stats = {"calls": 0, "deduplicated": 0, "max_waiters": 0}
+
+    def _finished(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        self._inflight.pop(key, None)
+        # Mark the exception as retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        self._stats["calls"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finished(key, t))
+        else:
+            self._stats["deduplicated"] += 1
+
+        waiters = self._waiters.get(key, 0) + 1
+        self._waiters[key] = waiters
+        self._stats["max_waiters"] = max(self._stats["max_waiters"], waiters)
+        try:
+            # Shield so one caller timing out or disconnecting does not cancel the
+            # shared fetch for everyone else
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[key] -= 1
+            if self._waiters[key] == 0:
+                del self._waiters[key]
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self._stats["calls"]
+        return {
+            "in_flight": len(self._inflight),
+            "waiters": sum(self._waiters.values()),
+            "dedup_rate": round(self._stats["deduplicated"] / calls, 4) if calls else 0.0,
+            **self._stats,
+        }
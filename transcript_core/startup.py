@@ -0,0 +1,68 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Startup phases, in the order they normally complete
+STARTUP_PHASES = ("imported", "ready", "warm", "first_transcript")
+
+
+def process_started_at() -> float:
+    """
+    Wall-clock time this process started.
+
+    Read from /proc on Linux so interpreter startup and imports are included;
+    elsewhere this falls back to the time this module was imported.
+    """
+    try:
+        with open("/proc/self/stat") as stat:
+            # Fields after the parenthesised command name start at field 3; starttime is field 22
+            fields = stat.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as uptime:
+            seconds_since_boot = float(uptime.read().split()[0])
+        age = seconds_since_boot - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+        return time.time() - max(0.0, age)
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+
+class StartupClock:
+    """
+    Seconds from process start to each startup phase, recorded once per process.
+
+    Adapters mark ``imported`` and ``ready``; the engine marks ``warm`` after
+    warmup and ``first_transcript`` when it first returns a transcript, which is
+    the time-to-first-transcript after a cold start.
+    """
+
+    def __init__(self):
+        self.started_at = process_started_at()
+        self._phases: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, phase: str) -> None:
+        if phase in self._phases:
+            return
+        with self._lock:
+            if phase in self._phases:
+                return
+            seconds = max(0.0, time.time() - self.started_at)
+            self._phases[phase] = seconds
+        logger.info("⏱️ Startup phase '%s' reached %.3fs after process start", phase, seconds)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {phase: round(seconds, 3) for phase, seconds in self._phases.items()}
+
+
+STARTUP = StartupClock()
+
+REGISTRY.collect(
+    "process_startup_seconds", "gauge", "Seconds from process start until each startup phase was reached",
+    lambda: [({"phase": phase}, seconds) for phase, seconds in STARTUP.stats().items()]
+)
@@ -0,0 +1,167 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+# Approximate bookkeeping cost of a negative entry (key, reason and slot overhead)
+NEGATIVE_ENTRY_SIZE = 256
+
+
+@dataclass
+class CacheEntry:
+    """A cached transcript result, or a negative entry recording why none exists."""
+    value: Any
+    size: int
+    expires_at: float
+    negative: bool = False
+    reason: Optional[str] = None
+    digest: Optional[str] = None
+
+
+class TranscriptCache:
+    """
+    In-memory LRU cache for transcript results with a byte-size cap and TTL.
+
+    Positive entries hold the response dict returned by ``get_video_transcript``
+    and live for ``ttl`` seconds. Negative entries record videos that are known to
+    have no transcript (disabled, not found, unavailable) and expire after the much
+    shorter ``negative_ttl`` so captions added later are picked up. When the total
+    size exceeds ``max_bytes`` the least recently used entries are evicted.
+
+    All methods are thread-safe; the cache is read from the event loop and written
+    from worker threads. ``on_remove`` is called with the key of every positive
+    entry that is evicted or expires, outside the cache lock.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: float,
+        negative_ttl: float,
+        on_remove: Optional[Callable[[Hashable], None]] = None
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.on_remove = on_remove
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._stats = {
+            "hits": 0,
+            "negative_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: Hashable, allow_stale: bool = False) -> Optional[CacheEntry]:
+        """
+        Return the live entry for ``key`` (marking it recently used), or None.
+
+        With ``allow_stale`` an expired positive entry is returned instead of being
+        dropped, for use while upstream is unavailable.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            expired = entry.expires_at <= time.monotonic()
+            if not expired:
+                self._entries.move_to_end(key)
+                self._stats["negative_hits" if entry.negative else "hits"] += 1
+                return entry
+            if allow_stale and not entry.negative:
+                self._entries.move_to_end(key)
+                self._stats["stale_hits"] += 1
+                return entry
+            self._remove(key)
+            self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+        if not entry.negative:
+            self._removed([key])
+        return None
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """The live positive value for ``key``, without marking it used or counting a lookup."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.negative or entry.expires_at <= time.monotonic():
+                return None
+            return entry.value
+
+    def digest(self, key: Hashable, value: Any) -> Optional[str]:
+        """The digest stored with ``key``, if its entry still holds this very ``value``; else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.value is not value:
+                return None
+            return entry.digest
+
+    def set(self, key: Hashable, value: Any, size: int, digest: Optional[str] = None) -> None:
+        """Cache a successful result of approximately ``size`` bytes, with an optional content ``digest``."""
+        if not self.enabled or size > self.max_bytes:
+            return
+        self._store(key, CacheEntry(value, size, time.monotonic() + self.ttl, digest=digest))
+
+    def set_negative(self, key: Hashable, reason: str) -> None:
+        """Remember that ``key`` has no transcript, e.g. ``reason="TranscriptsDisabled"``."""
+        if not self.enabled or self.negative_ttl <= 0:
+            return
+        entry = CacheEntry(None, NEGATIVE_ENTRY_SIZE, time.monotonic() + self.negative_ttl, True, reason)
+        self._store(key, entry)
+
+    def _store(self, key: Hashable, entry: CacheEntry) -> None:
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                if not self._remove(oldest).negative:
+                    evicted.append(oldest)
+                self._stats["evictions"] += 1
+        self._removed(evicted)
+
+    def _remove(self, key: Hashable) -> CacheEntry:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        return entry
+
+    def _removed(self, keys: List[Hashable]) -> None:
+        if self.on_remove is not None:
+            for key in keys:
+                self.on_remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["negative_hits"] + self._stats["misses"]
+            hit_rate = (self._stats["hits"] + self._stats["negative_hits"]) / lookups if lookups else 0.0
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "negative_ttl_seconds": self.negative_ttl,
+                "hit_rate": round(hit_rate, 4),
+                **self._stats,
+            }
@@ -0,0 +1,256 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Compaction trims the store down to this fraction of max_bytes so it does not
+# run again on the very next write
+COMPACTION_TARGET_RATIO = 0.9
+
+# How long a statement waits for another process's write lock before failing
+BUSY_TIMEOUT_MS = 5000
+
+
+class TranscriptStore:
+    """
+    Persistent SQLite store for transcript results.
+
+    Sits behind the in-memory TranscriptCache so fetched transcripts survive Fly
+    machine stop/start. Results are stored as zlib-compressed JSON keyed by video
+    ID and language preference. When the total compressed size exceeds
+    ``max_bytes``, the least recently read rows are deleted and the freed pages are
+    returned to the filesystem; rows older than ``ttl`` are treated as missing and
+    removed during compaction.
+
+    Several processes may open the same file (multi-worker mode). The total size
+    is kept in ``store_size`` by triggers, so every process sees writes made by
+    the others when deciding whether to compact.
+
+    ``on_remove`` is called with (video_id, languages, translate) for every row
+    a compaction in this process deletes, outside the store lock.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int,
+        ttl: float,
+        on_remove: Optional[Callable[[Tuple[str, Tuple[str, ...], bool]], None]] = None
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.on_remove = on_remove
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        # auto_vacuum must be set before the first table is created to take effect
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS transcripts (
+                video_id TEXT NOT NULL,
+                languages TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (video_id, languages)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS transcripts_accessed_at ON transcripts (accessed_at)")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS store_size (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL);
+            CREATE TRIGGER IF NOT EXISTS transcripts_size_insert AFTER INSERT ON transcripts
+                BEGIN UPDATE store_size SET bytes = bytes + NEW.size; END;
+            CREATE TRIGGER IF NOT EXISTS transcripts_size_update AFTER UPDATE OF size ON transcripts
+                BEGIN UPDATE store_size SET bytes = bytes - OLD.size + NEW.size; END;
+            CREATE TRIGGER IF NOT EXISTS transcripts_size_delete AFTER DELETE ON transcripts
+                BEGIN UPDATE store_size SET bytes = bytes - OLD.size; END;
+            INSERT OR IGNORE INTO store_size VALUES (0, (SELECT COALESCE(SUM(size), 0) FROM transcripts));
+            """
+        )
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "compactions": 0, "compacted_rows": 0}
+        logger.info(f"💾 Transcript store opened at {path} ({self._size()} bytes)")
+
+    def _size(self) -> int:
+        return self._conn.execute("SELECT bytes FROM store_size").fetchone()[0]
+
+    @staticmethod
+    def _languages_key(languages: Sequence[str], translate: bool) -> str:
+        return ",".join(languages) + ("+translate" if translate else "")
+
+    @staticmethod
+    def _parse_languages_key(key: str) -> Tuple[Tuple[str, ...], bool]:
+        translate = key.endswith("+translate")
+        if translate:
+            key = key[:-len("+translate")]
+        return tuple(key.split(",")), translate
+
+    def get(
+        self, video_id: str, languages: Sequence[str], translate: bool = False, allow_expired: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the stored result for this video and language preference, or None.
+
+        ``allow_expired`` also returns rows past the TTL that have not been
+        compacted away yet, for use while upstream is unavailable.
+        """
+        key = (video_id, self._languages_key(languages, translate))
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, stored_at FROM transcripts WHERE video_id = ? AND languages = ?", key
+            ).fetchone()
+            if row is None or (not allow_expired and self.ttl > 0 and row[1] + self.ttl <= now):
+                self._stats["misses"] += 1
+                return None
+            self._conn.execute(
+                "UPDATE transcripts SET accessed_at = ? WHERE video_id = ? AND languages = ?", (now, *key)
+            )
+            self._stats["hits"] += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, video_id: str, languages: Sequence[str], translate: bool, value: Dict[str, Any]) -> None:
+        """Store a result, compacting afterwards if the size cap is exceeded."""
+        payload = zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+        if len(payload) > self.max_bytes:
+            return
+        key = (video_id, self._languages_key(languages, translate))
+        now = time.time()
+        removed = []
+        with self._lock:
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete would skip the size trigger
+            self._conn.execute(
+                """
+                INSERT INTO transcripts VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (video_id, languages) DO UPDATE SET
+                    payload = excluded.payload, size = excluded.size,
+                    stored_at = excluded.stored_at, accessed_at = excluded.accessed_at
+                """,
+                (*key, payload, len(payload), now, now),
+            )
+            self._stats["writes"] += 1
+            if self._size() > self.max_bytes:
+                removed = self._compact()
+        self._removed(removed)
+
+    def recent(self, limit: int) -> List[Tuple[str, Tuple[str, ...], bool, Dict[str, Any]]]:
+        """
+        The ``limit`` most recently read unexpired results, newest first, as
+        (video_id, languages, translate, result) tuples.
+
+        Used to warm the in-memory cache at startup, so these reads do not count
+        as hits or refresh ``accessed_at``.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT video_id, languages, payload FROM transcripts WHERE ? <= 0 OR stored_at > ? "
+                "ORDER BY accessed_at DESC LIMIT ?",
+                (self.ttl, time.time() - self.ttl, limit),
+            ).fetchall()
+        return [
+            (video_id, *self._parse_languages_key(key), json.loads(zlib.decompress(payload)))
+            for video_id, key, payload in rows
+        ]
+
+    def peek(self, video_id: str, languages: Sequence[str], translate: bool = False) -> Optional[Dict[str, Any]]:
+        """Like ``get`` for unexpired rows, but without refreshing ``accessed_at`` or counting a lookup."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM transcripts WHERE video_id = ? AND languages = ? AND (? <= 0 OR stored_at > ?)",
+                (video_id, self._languages_key(languages, translate), self.ttl, time.time() - self.ttl),
+            ).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row is not None else None
+
+    def scan(self, after: int, limit: int) -> List[Tuple[int, str, Tuple[str, ...], bool, Dict[str, Any]]]:
+        """
+        Up to ``limit`` unexpired rows after row number ``after``, in storage order,
+        as (row number, video_id, languages, translate, result) tuples.
+
+        Pages through the whole store for bulk readers such as the search index
+        build, without holding the lock between pages.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT rowid, video_id, languages, payload FROM transcripts "
+                "WHERE rowid > ? AND (? <= 0 OR stored_at > ?) ORDER BY rowid LIMIT ?",
+                (after, self.ttl, time.time() - self.ttl, limit),
+            ).fetchall()
+        return [
+            (rowid, video_id, *self._parse_languages_key(key), json.loads(zlib.decompress(payload)))
+            for rowid, video_id, key, payload in rows
+        ]
+
+    def _compact(self) -> List[Tuple[str, str]]:
+        """
+        Drop expired rows, then least recently read rows, until under target size.
+
+        Returns the (video_id, languages key) of every deleted row.
+        """
+        victims = []
+        if self.ttl > 0:
+            expired_before = time.time() - self.ttl
+            victims = self._conn.execute(
+                "SELECT video_id, languages FROM transcripts WHERE stored_at <= ?", (expired_before,)
+            ).fetchall()
+            self._conn.execute("DELETE FROM transcripts WHERE stored_at <= ?", (expired_before,))
+        size = self._size()
+
+        target = self.max_bytes * COMPACTION_TARGET_RATIO
+        if size > target:
+            rows = self._conn.execute("SELECT video_id, languages, size FROM transcripts ORDER BY accessed_at")
+            evicted = []
+            excess = size - target
+            for video_id, languages, row_size in rows:
+                if excess <= 0:
+                    break
+                evicted.append((video_id, languages))
+                excess -= row_size
+            self._conn.executemany("DELETE FROM transcripts WHERE video_id = ? AND languages = ?", evicted)
+            victims += evicted
+
+        self._conn.execute("PRAGMA incremental_vacuum")
+        self._stats["compactions"] += 1
+        self._stats["compacted_rows"] += len(victims)
+        logger.info(f"💾 Transcript store compacted: removed {len(victims)} rows, {self._size()} bytes remain")
+        return victims
+
+    def compact(self) -> None:
+        with self._lock:
+            removed = self._compact()
+        self._removed(removed)
+
+    def _removed(self, rows: List[Tuple[str, str]]) -> None:
+        if self.on_remove is not None:
+            for video_id, key in rows:
+                self.on_remove((video_id, *self._parse_languages_key(key)))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+            return {
+                "path": self.path,
+                "entries": entries,
+                "bytes": self._size(),
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                **self._stats,
+            }
@@ -0,0 +1,117 @@
+import math
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .errors import ApiError
+from .payload_encoding import CHARS_PER_TOKEN, TRANSCRIPT_FORMATS, msgpack, wants_msgpack
+
+# Language preference used when the caller does not supply one
+DEFAULT_LANGUAGES = ("en",)
+MAX_LANGUAGES = 10
+LANGUAGE_CODE_PATTERN = re.compile(r"^[A-Za-z]{2,3}(-[A-Za-z0-9]{1,8})*$")
+# Smallest chunk budget accepted; smaller ones would split almost every caption line
+MIN_CHUNK_CHARS = 100
+# Largest chunk budget accepted (about 250k tokens); a larger one is one chunk anyway
+MAX_CHUNK_CHARS = 1_000_000
+# Latest accepted range bound, far beyond any YouTube video (about 115 days)
+MAX_RANGE_SECONDS = 10_000_000
+VIDEO_ID_CHARS = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_')
+
+
+def validate_video_id(video_id: str) -> bool:
+    """Validate YouTube video ID format."""
+    if not video_id or not isinstance(video_id, str) or len(video_id) != 11:
+        return False
+    # YouTube video IDs are 11 characters of alphanumerics, hyphens and underscores
+    return all(c in VIDEO_ID_CHARS for c in video_id)
+
+
+def parse_languages(languages: Optional[List[str]]) -> Tuple[str, ...]:
+    """Validate a caller-supplied language priority list, defaulting to DEFAULT_LANGUAGES."""
+    if not languages:
+        return DEFAULT_LANGUAGES
+    codes = tuple(code.strip() for code in languages if code.strip())
+    if not codes:
+        return DEFAULT_LANGUAGES
+    if len(codes) > MAX_LANGUAGES or not all(LANGUAGE_CODE_PATTERN.match(code) for code in codes):
+        raise ApiError(
+            400, "INVALID_LANGUAGE", f"languages must be up to {MAX_LANGUAGES} language codes such as en, de or pt-BR"
+        )
+    return codes
+
+
+def parse_body_fields(data: Any) -> Tuple[Optional[str], Optional[List[str]], bool]:
+    """
+    Read videoId, languages and translate from a decoded JSON request body.
+
+    Values of the wrong JSON type are rejected rather than coerced, so the string
+    "false" is not taken as true and a languages string is not split into letters.
+    A field that is missing or null takes its default.
+
+    Raises:
+        ApiError: 400 INVALID_REQUEST if the body is not an object, videoId is not
+            a string, languages is not a list of strings or translate is not a boolean
+    """
+    if not isinstance(data, dict):
+        raise ApiError(400, "INVALID_REQUEST", "POST body must be a JSON object")
+    video_id = data.get("videoId")
+    if video_id is not None and not isinstance(video_id, str):
+        raise ApiError(400, "INVALID_REQUEST", "videoId must be a string")
+    languages = data.get("languages")
+    if languages is not None and (
+        not isinstance(languages, list) or not all(isinstance(code, str) for code in languages)
+    ):
+        raise ApiError(400, "INVALID_REQUEST", "languages must be a list of language code strings")
+    translate = data.get("translate")
+    if translate is None:
+        translate = False
+    elif not isinstance(translate, bool):
+        raise ApiError(400, "INVALID_REQUEST", "translate must be true or false")
+    return video_id, languages, translate
+
+
+def validate_format(transcript_format: str) -> None:
+    """Reject unknown ``format`` values before any work is done."""
+    if transcript_format not in TRANSCRIPT_FORMATS:
+        raise ApiError(400, "INVALID_FORMAT", f"format must be one of: {', '.join(TRANSCRIPT_FORMATS)}")
+
+
+def validate_encoding(accept: str) -> None:
+    """Reject a MessagePack Accept header up front when msgpack is not installed."""
+    if wants_msgpack(accept) and msgpack is None:
+        raise ApiError(406, "UNSUPPORTED_ENCODING", "MessagePack responses are not available on this server")
+
+
+def parse_window(
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    chunk_chars: Optional[int] = None,
+    chunk_tokens: Optional[int] = None
+) -> Dict[str, Optional[int]]:
+    """
+    Validate a time range in seconds and a chunk budget in characters or tokens.
+
+    Returns:
+        ``start_ms``, ``end_ms`` and ``chunk_chars`` keyword arguments for shape_result
+    """
+    bounds = [value for value in (start, end) if value is not None]
+    if not all(math.isfinite(value) and 0 <= value <= MAX_RANGE_SECONDS for value in bounds) or (
+        (end is not None and end <= 0) or (start is not None and end is not None and end <= start)
+    ):
+        raise ApiError(
+            400, "INVALID_RANGE", f"start and end are seconds with 0 <= start < end <= {MAX_RANGE_SECONDS}"
+        )
+    if chunk_chars is not None and chunk_tokens is not None:
+        raise ApiError(400, "INVALID_CHUNK", "Pass either chunkChars or chunkTokens, not both")
+    if chunk_tokens is not None:
+        chunk_chars = chunk_tokens * CHARS_PER_TOKEN
+    if chunk_chars is not None and not MIN_CHUNK_CHARS <= chunk_chars <= MAX_CHUNK_CHARS:
+        raise ApiError(
+            400, "INVALID_CHUNK", f"Chunk budget must be {MIN_CHUNK_CHARS} to {MAX_CHUNK_CHARS} characters "
+            f"({-(-MIN_CHUNK_CHARS // CHARS_PER_TOKEN)} to {MAX_CHUNK_CHARS // CHARS_PER_TOKEN} tokens)"
+        )
+    return {
+        "start_ms": None if start is None else round(start * 1000),
+        "end_ms": None if end is None else round(end * 1000),
+        "chunk_chars": chunk_chars,
+    }
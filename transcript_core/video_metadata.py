@@ -0,0 +1,74 @@
+import sys
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+
+# Innertube endpoint the transcript library calls to list caption tracks; its
+# response also carries the video's title, channel and length
+PLAYER_API_PATH = "/youtubei/v1/player"
+
+_captured = threading.local()
+
+
+def parse_player_metadata(player_response: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Pick the fields we expose from a player response's ``videoDetails``, or None."""
+    details = player_response.get("videoDetails")
+    if not isinstance(details, dict) or not details.get("videoId"):
+        return None
+    length = details.get("lengthSeconds")
+    return {
+        "videoId": details["videoId"],
+        "title": details.get("title"),
+        "channel": details.get("author"),
+        "channelId": details.get("channelId"),
+        "durationSeconds": int(length) if str(length or "").isdigit() else None,
+    }
+
+
+def capture_player_metadata(response: requests.Response, *args: Any, **kwargs: Any) -> None:
+    """
+    Session response hook: remember the video metadata in a player response.
+
+    The transcript library already requests the player data for every listing,
+    so metadata comes for free; it is kept per thread until the caller collects
+    it with take_captured_metadata.
+    """
+    if PLAYER_API_PATH not in response.url or not response.ok:
+        return
+    try:
+        metadata = parse_player_metadata(response.json())
+    except ValueError:
+        return
+    if metadata is not None:
+        _captured.metadata = metadata
+
+
+def take_captured_metadata(video_id: str) -> Optional[Dict[str, Any]]:
+    """Return and clear the metadata captured on this thread, if it is for ``video_id``."""
+    metadata = getattr(_captured, "metadata", None)
+    _captured.metadata = None
+    if metadata is None or metadata["videoId"] != video_id:
+        return None
+    return metadata
+
+
+def metadata_size(metadata: Dict[str, Any]) -> int:
+    """Approximate in-memory size of a metadata entry for the cache byte cap."""
+    return 512 + sum(sys.getsizeof(value) for value in metadata.values() if isinstance(value, str))
+
+
+def video_fields(video_id: str, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Title and channel fields for a response.
+
+    Falls back to the historical placeholders when YouTube returned no metadata,
+    so ``title`` and ``channel`` are always strings.
+    """
+    metadata = metadata or {}
+    return {
+        "title": metadata.get("title") or f"Video {video_id}",
+        "channel": metadata.get("channel") or "Unknown Channel",
+        "channelId": metadata.get("channelId"),
+        "durationSeconds": metadata.get("durationSeconds"),
+    }